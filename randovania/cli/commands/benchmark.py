@@ -0,0 +1,75 @@
+import multiprocessing
+from argparse import ArgumentParser
+from pathlib import Path
+
+from randovania.generator import benchmark
+from randovania.interface_common import sleep_inhibitor
+
+
+def benchmark_command_logic(args):
+    seed_numbers = range(args.first_seed, args.first_seed + args.seed_count)
+    cases = benchmark.benchmark_corpus(args.preset, seed_numbers)
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = benchmark.read_report_file(args.baseline)
+
+    results = []
+
+    # Each case runs in a new process, so the peak memory usage is only of that case
+    with multiprocessing.Pool(args.process_count, maxtasksperchild=1) as pool, sleep_inhibitor.get_inhibitor():
+        pending = [
+            pool.apply_async(benchmark.run_benchmark_case, (case, args.timeout, not args.skip_resolve))
+            for case in cases
+        ]
+        for i, result_async in enumerate(pending):
+            result: benchmark.BenchmarkResult = result_async.get()
+            results.append(result)
+            status = result.error or "generated in {:.2f}s, resolved in {}".format(
+                result.generation_seconds,
+                "-" if result.resolve_seconds is None else "{:.2f}s".format(result.resolve_seconds),
+            )
+            print("[{}/{}] {} (seed {}): {}".format(i + 1, len(cases), result.preset_name, result.seed_number,
+                                                   status))
+
+    if args.output is not None:
+        benchmark.write_report(args.output, results)
+        print(f"Report written to {args.output}")
+
+    if baseline is not None:
+        regressions = benchmark.compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions compared to the baseline.")
+
+
+def add_benchmark_command(sub_parsers):
+    parser: ArgumentParser = sub_parsers.add_parser(
+        "benchmark",
+        help="Measure generation and validation of a fixed set of permalinks for the included presets"
+    )
+
+    parser.add_argument("--preset", type=str, action="append",
+                        help="Name of an included preset to use. Can be used multiple times. Defaults to all.")
+    parser.add_argument("--first-seed", type=int, default=benchmark.DEFAULT_SEED_NUMBERS[0],
+                        help="The seed number of the first permalink for each preset.")
+    parser.add_argument("--seed-count", type=int, default=len(benchmark.DEFAULT_SEED_NUMBERS),
+                        help="How many permalinks to use for each preset.")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=600,
+        help="How many seconds to wait before timing out a generation.")
+    parser.add_argument("--skip-resolve", action="store_true", default=False,
+                        help="Don't resolve the generated seeds.")
+    parser.add_argument("--process-count", type=int, default=1,
+                        help="How many cases to run at the same time. More than one affects the timings.")
+    parser.add_argument("--output", type=Path, help="Where to write the report, as JSON.")
+    parser.add_argument("--baseline", type=Path,
+                        help="A previous report to compare against. Exits with an error if any regression is found.")
+    parser.add_argument("--threshold", type=float, default=benchmark.DEFAULT_THRESHOLD,
+                        help="How much bigger than the baseline a value may be, as a fraction of the baseline.")
+    parser.set_defaults(func=benchmark_command_logic)
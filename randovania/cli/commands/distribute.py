@@ -34,6 +34,8 @@ def distribute_command_logic(args):
     extra_args = {}
     if args.no_retry:
         extra_args["attempts"] = 0
+    if args.evaluation_workers:
+        extra_args["evaluation_workers"] = args.evaluation_workers
 
     before = time.perf_counter()
     layout_description = generator.generate_description(permalink=permalink, status_update=status_update,
@@ -54,6 +56,9 @@ def add_distribute_command(sub_parsers):
     echoes_lib.add_debug_argument(parser)
     echoes_lib.add_validate_argument(parser)
     parser.add_argument("--no-retry", default=False, action="store_true", help="Disable retries in the generation.")
+    parser.add_argument("--evaluation-workers", type=int, default=0,
+                        help="Number of processes used to evaluate actions during generation. Defaults to 0, "
+                             "which evaluates everything in the main process.")
 
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--permalink", type=str, help="The permalink to use")
@@ -1,10 +1,14 @@
+import asyncio
+import json
+import tempfile
 from argparse import ArgumentParser
+from pathlib import Path
 
 
 def server_command_logic(args):
     from randovania.server import app
     server_app = app.create_app()
-    server_app.sio.sio.run(server_app, host="0.0.0.0")
+    server_app.sio.sio.run(server_app, host=args.host, port=args.port)
 
 
 def add_server_command(sub_parsers):
@@ -12,9 +16,59 @@ def add_server_command(sub_parsers):
         "server",
         help="Hosts a multiworld server."
     )
+    parser.add_argument("--host", default="0.0.0.0", help="The address to listen on.")
+    parser.add_argument("--port", type=int, default=5000, help="The port to listen on.")
     parser.set_defaults(func=server_command_logic)
 
 
+def load_test_command_logic(args):
+    from randovania.layout.layout_description import LayoutDescription
+    from randovania.server import load_test
+
+    configuration = load_test.LoadTestConfiguration(
+        num_sessions=args.sessions,
+        rounds=args.rounds,
+        locations_per_round=args.locations_per_round,
+        seed=args.seed,
+    )
+
+    if args.layout is not None:
+        description = LayoutDescription.from_file(args.layout)
+    else:
+        print(f"Generating a layout for {args.players} players...")
+        description = load_test.generate_layout(args.players, args.seed)
+
+    with tempfile.TemporaryDirectory() as user_data_dir, load_test.local_server(args.port, args.database) as client:
+        report = asyncio.run(load_test.run_load_test(client, description, configuration, Path(user_data_dir)))
+
+    print(load_test.format_report(report))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=4))
+        print(f"Report written to {args.output}")
+
+
+def add_load_test_command(sub_parsers):
+    parser: ArgumentParser = sub_parsers.add_parser(
+        "load-test",
+        help="Measures a local server with many simulated clients playing multiworld sessions at the same time."
+    )
+    parser.add_argument("--sessions", type=int, default=10, help="How many sessions to run at the same time.")
+    parser.add_argument("--players", type=int, default=2,
+                        help="How many players each session has. Ignored when using --layout.")
+    parser.add_argument("--layout", type=Path, help="An existing multiworld rdvgame to use instead of generating one.")
+    parser.add_argument("--rounds", type=int, default=20,
+                        help="How many times each player collects locations, requests pickups and updates itself.")
+    parser.add_argument("--locations-per-round", type=int, default=3,
+                        help="How many locations each player collects per round.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generating the layout and choosing locations.")
+    parser.add_argument("--port", type=int, default=5050, help="The port the local server listens on.")
+    parser.add_argument("--database", type=str,
+                        help="The SQLite database for the local server. Defaults to a temporary file. "
+                             "Use ':memory:' for an in-memory database.")
+    parser.add_argument("--output", type=Path, help="Where to write the report, as JSON.")
+    parser.set_defaults(func=load_test_command_logic)
+
+
 def create_subparsers(sub_parsers):
     parser: ArgumentParser = sub_parsers.add_parser(
         "multiworld",
@@ -22,6 +76,7 @@ def create_subparsers(sub_parsers):
     )
     sub_parsers = parser.add_subparsers(dest="command")
     add_server_command(sub_parsers)
+    add_load_test_command(sub_parsers)
 
     def check_command(args):
         if args.command is None:
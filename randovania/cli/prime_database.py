@@ -10,7 +10,7 @@ from randovania.game_description.game_description import GameDescription
 from randovania.game_description.resources.resource_database import find_resource_info_with_long_name, MissingResource
 from randovania.game_description.resources.resource_info import ResourceInfo
 from randovania.games.game import RandovaniaGame
-from randovania.games.prime import binary_data, default_data
+from randovania.games.prime import binary_data, default_data, compiled_data
 from randovania.interface_common.enum_lib import iterate_enum
 from randovania.resolver import debug
 
@@ -34,6 +34,10 @@ def export_as_binary(data: dict, output_binary: Path):
         binary_data.encode(data, x)
 
 
+def export_as_compiled(data: dict, output_compiled: Path):
+    compiled_data.encode_file_path(data, output_compiled)
+
+
 def convert_database_command_logic(args):
     data = decode_data_file(args)
 
@@ -42,10 +46,14 @@ def convert_database_command_logic(args):
 
     output_binary: Optional[Path] = args.output_binary
     output_json: Optional[Path] = args.output_json
+    output_compiled: Optional[Path] = args.output_compiled
 
     if output_binary is not None:
         export_as_binary(data, output_binary)
 
+    elif output_compiled is not None:
+        export_as_compiled(data, output_compiled)
+
     elif output_json is not None:
         with output_json.open("w") as x:  # type: TextIO
             json.dump(data, x, indent=4)
@@ -56,7 +64,7 @@ def convert_database_command_logic(args):
 def create_convert_database_command(sub_parsers):
     parser: ArgumentParser = sub_parsers.add_parser(
         "convert-database",
-        help="Converts a database file between JSON and binary encoded formats. Input defaults to embedded database.",
+        help="Converts a database file between JSON, binary and compiled formats. Input defaults to embedded database.",
         formatter_class=argparse.MetavarTypeHelpFormatter
     )
     parser.add_argument(
@@ -77,12 +85,38 @@ def create_convert_database_command(sub_parsers):
         type=Path,
         help="Export as a JSON file.",
     )
+    group.add_argument(
+        "--output-compiled",
+        type=Path,
+        help="Export as a compiled file, which can be loaded lazily.",
+    )
 
     parser.set_defaults(func=convert_database_command_logic)
 
 
+def _load_game_description_for_area(args) -> GameDescription:
+    """
+    With a compiled database, only decodes the requested area and the areas it connects to.
+    """
+    compiled_database = None
+    if args.json_database is None:
+        compiled_database = default_data.read_compiled_database(RandovaniaGame(args.game))
+
+    if compiled_database is not None:
+        try:
+            area_index = compiled_database.find_area(args.world, args.area)
+        except KeyError:
+            # Decode everything so the possible names can be listed
+            return load_game_description(args)
+
+        data = compiled_database.data_with_areas(compiled_database.connected_areas(area_index))
+        return data_reader.decode_data(data)
+
+    return load_game_description(args)
+
+
 def view_area_command_logic(args):
-    game = load_game_description(args)
+    game = _load_game_description_for_area(args)
     world_list = game.world_list
 
     try:
@@ -2,17 +2,19 @@ import copy
 import dataclasses
 import logging
 import struct
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 from randovania.game_connection.backend_choice import GameBackendChoice
 from randovania.game_connection.connection_base import ConnectionBase, InventoryItem, GameConnectionStatus
-from randovania.game_description import data_reader
+from randovania.game_connection.connection_statistics import ConnectionStatistics
+from randovania.game_description import default_database
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.pickup_entry import PickupEntry
 from randovania.game_description.resources.resource_info import CurrentResources, add_resource_gain_to_current_resources
+from randovania.game_description.world import World
 from randovania.games.game import RandovaniaGame
-from randovania.games.prime import dol_patcher, default_data
+from randovania.games.prime import dol_patcher
 from randovania.games.prime.dol_patcher import PatchesForVersion
 
 
@@ -51,6 +53,128 @@ class MemoryOperation:
         return f"At {address_text}, {' and '.join(operation_pretty)}"
 
 
+# Reads this close to each other are merged, even if it means reading bytes nobody asked for
+MAX_READ_GAP = 0x10
+
+# Seconds between inventory reads, when nothing indicates the inventory changed
+INVENTORY_SCAN_INTERVAL = 10.0
+
+
+@dataclasses.dataclass()
+class _OperationGroup:
+    index: int
+    address: Optional[int]
+    start: int
+    end: int
+    ops: List[MemoryOperation]
+    write_bytes: Optional[bytes]
+
+    @property
+    def reads(self) -> bool:
+        return self.ops[0].read_byte_count is not None
+
+    def create_operation(self) -> MemoryOperation:
+        if len(self.ops) == 1:
+            return self.ops[0]
+
+        if self.address is None:
+            address, offset = self.start, None
+        else:
+            address, offset = self.address, self.start
+
+        return MemoryOperation(
+            address=address,
+            offset=offset,
+            read_byte_count=self.end - self.start if self.reads else None,
+            write_bytes=self.write_bytes,
+        )
+
+
+def _operation_range(op: MemoryOperation) -> Tuple[Optional[int], int, int]:
+    if op.offset is None:
+        return None, op.address, op.address + op.byte_count
+    else:
+        return op.address, op.offset, op.offset + op.byte_count
+
+
+class MemoryOperationPlan:
+    """
+    Merges operations into fewer operations, so backends pay the per-operation cost less often.
+
+    Reads on the same pointer (or both on absolute addresses) are merged when they overlap or are at most `max_gap`
+    bytes apart. Writes are only merged with the write right before them, when they continue exactly where it ends.
+    Reads are never moved across writes, so the order the operations are applied in doesn't change.
+    """
+    merged_ops: List[MemoryOperation]
+    _groups: List[_OperationGroup]
+    _placements: List[Tuple[MemoryOperation, int, int]]
+
+    def __init__(self, ops: List[MemoryOperation], max_gap: int = MAX_READ_GAP,
+                 max_read_size: Optional[int] = None):
+        groups: List[_OperationGroup] = []
+        read_groups: Dict[Optional[int], List[_OperationGroup]] = {}
+        self._placements = []
+
+        def fits(group: _OperationGroup, start: int, end: int) -> bool:
+            return (max_read_size is None or not group.reads
+                    or max(group.end, end) - min(group.start, start) <= max_read_size)
+
+        for op in ops:
+            op.validate_byte_sizes()
+            address, start, end = _operation_range(op)
+            group = None
+
+            if op.write_bytes is None:
+                if op.read_byte_count is not None:
+                    group = next((existing for existing in read_groups.get(address, [])
+                                  if existing.start - max_gap <= end and start <= existing.end + max_gap
+                                  and fits(existing, start, end)), None)
+                if group is not None:
+                    group.start = min(group.start, start)
+                    group.end = max(group.end, end)
+                    group.ops.append(op)
+
+            else:
+                # Reads from before a write can't be merged with reads after it
+                read_groups.clear()
+                last = groups[-1] if groups else None
+                if (last is not None and last.write_bytes is not None and last.address == address
+                        and last.end == start and last.reads == (op.read_byte_count is not None)
+                        and fits(last, start, end)):
+                    group = last
+                    group.end = end
+                    group.write_bytes += op.write_bytes
+                    group.ops.append(op)
+
+            if group is None:
+                group = _OperationGroup(len(groups), address, start, end, [op], op.write_bytes)
+                groups.append(group)
+                if op.write_bytes is None and op.read_byte_count is not None:
+                    read_groups.setdefault(address, []).append(group)
+
+            self._placements.append((op, group.index, start))
+
+        self._groups = groups
+        self.merged_ops = [group.create_operation() for group in groups]
+
+    def split_results(self, results: List[Optional[bytes]]) -> List[Optional[bytes]]:
+        """
+        Converts the results of `merged_ops` into what each of the original operations would have returned.
+        """
+        split = []
+        for op, group_index, start in self._placements:
+            group = self._groups[group_index]
+            result = results[group_index]
+            if len(group.ops) == 1:
+                split.append(result)
+            elif result is None or op.read_byte_count is None:
+                split.append(None)
+            else:
+                begin = start - group.start
+                split.append(result[begin:begin + op.read_byte_count])
+        return split
+
+
 def _powerup_offset(item_index: int) -> int:
     powerups_offset = 0x58
     vector_data_offset = 0x4
@@ -82,6 +206,14 @@ class ConnectionBackend(ConnectionBase):
     _games: Dict[RandovaniaGame, GameDescription]
     _inventory: Dict[ItemResourceInfo, InventoryItem]
     _enabled: bool = True
+    _world: Optional[World] = None
+    statistics: ConnectionStatistics
+
+    # Change detection
+    _change_markers: Optional[Tuple[Optional[bytes], ...]] = None
+    _game_state_changed: bool = True
+    _magic_item: Optional[InventoryItem] = None
+    _time_since_inventory_scan: float = 0.0
 
     # Messages
     message_queue: List[str]
@@ -102,6 +234,7 @@ class ConnectionBackend(ConnectionBase):
         self.message_queue = []
         self._pickups_to_give = []
         self._permanent_pickups = []
+        self.statistics = ConnectionStatistics()
 
     @property
     def current_status(self) -> GameConnectionStatus:
@@ -142,6 +275,7 @@ class ConnectionBackend(ConnectionBase):
         self._enabled = value
         if not value:
             self.patches = None
+            self._clear_pointer_cache()
 
     # Game Backend Stuff
     async def _perform_memory_operations(self, ops: List[MemoryOperation]) -> List[Optional[bytes]]:
@@ -151,11 +285,34 @@ class ConnectionBackend(ConnectionBase):
         result = await self._perform_memory_operations([op])
         return result[0]
 
+    def _clear_pointer_cache(self):
+        """
+        Called when pointers the backend resolved before might have changed, like when the world changes.
+        """
+        pass
+
+    @property
+    def _max_read_size(self) -> Optional[int]:
+        """
+        The most bytes a single read operation can have, or None if there's no limit.
+        """
+        return None
+
+    async def _perform_planned_memory_operations(self, ops: List[MemoryOperation]) -> List[Optional[bytes]]:
+        """
+        Same as `_perform_memory_operations`, but merges nearby operations first.
+        """
+        plan = MemoryOperationPlan(ops, max_read_size=self._max_read_size)
+        if len(plan.merged_ops) < len(ops):
+            self.logger.debug(f"_perform_planned_memory_operations: merged {len(ops)} ops "
+                              f"into {len(plan.merged_ops)}")
+        return plan.split_results(await self._perform_memory_operations(plan.merged_ops))
+
     @property
     def game(self) -> GameDescription:
         game_enum = self.patches.game
         if game_enum not in self._games:
-            self._games[game_enum] = data_reader.decode_data(default_data.read_json_then_binary(game_enum)[1])
+            self._games[game_enum] = default_database.game_description_for(game_enum)
         return self._games[game_enum]
 
     async def _identify_game(self) -> bool:
@@ -179,18 +336,44 @@ class ConnectionBackend(ConnectionBase):
         return False
 
     async def _update_current_world(self):
+        """
+        Reads the current world, together with a few items that change when the inventory does:
+        the multiworld magic item and the item percentage. Sets `_game_state_changed` if any of these changed.
+        """
+        resource_database = self.game.resource_database
+        player_state_pointer = self._get_player_state_pointer()
         try:
-            world_asset_id = await self._perform_single_memory_operations(
+            world_asset_id, *markers = await self._perform_memory_operations([
                 MemoryOperation(self.patches.game_state_pointer,
                                 offset=4,
-                                read_byte_count=4)
-            )
+                                read_byte_count=4),
+                MemoryOperation(player_state_pointer,
+                                offset=_powerup_offset(resource_database.multiworld_magic_item.index),
+                                read_byte_count=8),
+                MemoryOperation(player_state_pointer,
+                                offset=_powerup_offset(resource_database.item_percentage.index),
+                                read_byte_count=8),
+            ])
             if world_asset_id is None:
                 raise KeyError()
-            self._world = self.game.world_list.world_by_asset_id(struct.unpack(">I", world_asset_id)[0])
+            world = self.game.world_list.world_by_asset_id(struct.unpack(">I", world_asset_id)[0])
 
         except (KeyError, RuntimeError):
-            self._world = None
+            world = None
+            markers = None
+
+        if world is None or world is not self._world:
+            self._clear_pointer_cache()
+
+        markers = tuple(markers) if markers is not None else None
+        self._game_state_changed = (world is not self._world or markers is None or None in markers
+                                    or markers != self._change_markers)
+        self._change_markers = markers
+        if markers is not None and markers[0] is not None:
+            self._magic_item = InventoryItem(*struct.unpack(">II", markers[0]))
+        else:
+            self._magic_item = None
+        self._world = world
 
     def _get_player_state_pointer(self) -> int:
         cstate_manager = self.patches.string_display.cstate_manager_global
@@ -222,7 +405,7 @@ class ConnectionBackend(ConnectionBase):
             for item in self.game.resource_database.item
         ]
 
-        ops_result = await self._perform_memory_operations(memory_ops)
+        ops_result = await self._perform_planned_memory_operations(memory_ops)
 
         inventory = {}
         for item, memory_result in zip(self.game.resource_database.item, ops_result):
@@ -265,7 +448,7 @@ class ConnectionBackend(ConnectionBase):
 
         energy_tank = self.game.resource_database.energy_tank
         if energy_tank in changed_items:
-            health_data = await self._perform_memory_operations([
+            health_data = await self._perform_planned_memory_operations([
                 MemoryOperation(player_state_pointer, read_byte_count=4, offset=20),
                 MemoryOperation(self.patches.health_capacity.base_health_capacity, read_byte_count=4),
                 MemoryOperation(self.patches.health_capacity.energy_tank_capacity, read_byte_count=4),
@@ -283,7 +466,7 @@ class ConnectionBackend(ConnectionBase):
             self.logger.debug(f"Setting health to {new_health}. ({memory_ops[-1].write_bytes.hex()})")
 
         # FIXME: check if the value read is what we expected, and then re-writes if needed
-        result = await self._perform_memory_operations(memory_ops)
+        result = await self._perform_planned_memory_operations(memory_ops)
         return changed_items
 
     async def _write_item(self, item: ItemResourceInfo, value: InventoryItem):
@@ -432,13 +615,28 @@ class ConnectionBackend(ConnectionBase):
 
     async def update_current_inventory(self):
         self._inventory = await self._get_inventory()
+        self._time_since_inventory_scan = 0.0
+
+    def _needs_collected_index_check(self) -> bool:
+        """
+        If `_check_for_collected_index` would do anything, based on the magic item read by `_update_current_world`.
+        """
+        if self._magic_item is None:
+            return True
+        return (self._magic_item.amount > 0
+                or bool(self._pickups_to_give)
+                or self._magic_item.capacity < len(self._permanent_pickups))
 
     async def _interact_with_game(self, dt):
         await self._update_current_world()
         if self._world is not None:
             await self._send_message_from_queue(dt)
-            if self._tracking_inventory:
+
+            self._time_since_inventory_scan += dt
+            check_collected_index = self.checking_for_collected_index and self._needs_collected_index_check()
+            if self._tracking_inventory and (self._game_state_changed or check_collected_index
+                                             or self._time_since_inventory_scan >= INVENTORY_SCAN_INTERVAL):
                 await self.update_current_inventory()
 
-            if self.checking_for_collected_index:
+            if check_collected_index:
                 await self._check_for_collected_index()
@@ -0,0 +1,85 @@
+import collections
+import time
+from typing import Callable, Deque, List, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from randovania.game_connection.connection_backend import MemoryOperation
+
+DEFAULT_WINDOW = 10.0
+
+
+class _Sample(NamedTuple):
+    time: float
+    requests: int
+    reads: int
+    num_bytes: int
+
+
+class ConnectionStatistics:
+    """
+    Counts the memory operations a backend performed, so the cost of each backend can be compared.
+    Totals are kept since creation, while rates only consider the last `window` seconds.
+    """
+    window: float
+    requests: int
+    reads: int
+    writes: int
+    bytes_read: int
+    bytes_written: int
+    _samples: Deque[_Sample]
+
+    def __init__(self, window: float = DEFAULT_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        self.requests = 0
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._samples = collections.deque()
+
+    def record(self, ops: List["MemoryOperation"], results: List[Optional[bytes]], requests: int = 1):
+        """
+        Registers operations that were sent to the game.
+        :param ops:
+        :param results:
+        :param requests: How many round trips to the game were needed for these operations.
+        """
+        reads = sum(1 for op in ops if op.read_byte_count is not None)
+        writes = sum(1 for op in ops if op.write_bytes is not None)
+        bytes_read = sum(len(result) for result in results if result is not None)
+        bytes_written = sum(len(op.write_bytes) for op in ops if op.write_bytes is not None)
+
+        self.requests += requests
+        self.reads += reads
+        self.writes += writes
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+        self._samples.append(_Sample(self._clock(), requests, reads, bytes_read + bytes_written))
+        self._discard_old_samples()
+
+    def _discard_old_samples(self):
+        limit = self._clock() - self.window
+        while self._samples and self._samples[0].time < limit:
+            self._samples.popleft()
+
+    def _rate(self, field: str) -> float:
+        self._discard_old_samples()
+        return sum(getattr(sample, field) for sample in self._samples) / self.window
+
+    @property
+    def requests_per_second(self) -> float:
+        return self._rate("requests")
+
+    @property
+    def reads_per_second(self) -> float:
+        return self._rate("reads")
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self._rate("num_bytes")
+
+    def __str__(self):
+        return (f"{self.requests_per_second:.1f} requests/s, {self.reads_per_second:.1f} reads/s, "
+                f"{self.bytes_per_second:.0f} bytes/s")
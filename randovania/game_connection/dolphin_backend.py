@@ -5,7 +5,6 @@ import dolphin_memory_engine
 from randovania.game_connection.backend_choice import GameBackendChoice
 from randovania.game_connection.connection_backend import ConnectionBackend, MemoryOperation
 from randovania.game_connection.connection_base import GameConnectionStatus
-from randovania.game_description.world import World
 
 MEM1_START = 0x80000000
 MEM1_END = 0x81800000
@@ -17,11 +16,13 @@ def _validate_range(address: int, size: int):
 
 
 class DolphinBackend(ConnectionBackend):
-    _world: Optional[World] = None
+    _pointer_cache: Dict[int, int]
+    _game_state_address: Optional[int] = None
 
     def __init__(self):
         super().__init__()
         self.dolphin = dolphin_memory_engine
+        self._pointer_cache = {}
 
     @property
     def lock_identifier(self) -> Optional[str]:
@@ -45,6 +46,8 @@ class DolphinBackend(ConnectionBackend):
             _validate_range(address, op.byte_count)
         except RuntimeError as e:
             self.logger.exception(f"Invalid operation: {e}")
+            if op.offset is not None:
+                self._pointer_cache.pop(op.address, None)
             return None
 
         result = None
@@ -63,24 +66,52 @@ class DolphinBackend(ConnectionBackend):
                 pointers_to_read.add(op.address)
 
         pointers = {}
+        game_state_pointer = self.patches.game_state_pointer if self.patches is not None else None
+        if game_state_pointer in pointers_to_read:
+            # Never cached: loading a save moves the game state without changing the world, so it's resolved on
+            # every call and any change invalidates everything that was resolved with the old one.
+            pointers_to_read.remove(game_state_pointer)
+            address = self._follow_pointer(game_state_pointer)
+            if address is not None:
+                if address != self._game_state_address:
+                    self._clear_pointer_cache()
+                    self._game_state_address = address
+                pointers[game_state_pointer] = address
+
         for pointer in pointers_to_read:
-            try:
-                pointers[pointer] = self.dolphin.follow_pointers(pointer, [0])
-            except RuntimeError:
-                self.logger.debug(f"Failed to read a valid pointer from {pointer:x}")
-                self._test_still_hooked()
+            if pointer not in self._pointer_cache:
+                address = self._follow_pointer(pointer)
+                if address is None:
+                    continue
+                self._pointer_cache[pointer] = address
+            pointers[pointer] = self._pointer_cache[pointer]
 
         if not self.dolphin.is_hooked():
             raise RuntimeError("Lost connection do Dolphin")
 
-        return [
+        result = [
             self._memory_operation(op, pointers)
             for op in ops
         ]
+        self.statistics.record(ops, result)
+        return result
+
+    def _follow_pointer(self, pointer: int) -> Optional[int]:
+        try:
+            return self.dolphin.follow_pointers(pointer, [0])
+        except RuntimeError:
+            self.logger.debug(f"Failed to read a valid pointer from {pointer:x}")
+            self._test_still_hooked()
+            return None
+
+    def _clear_pointer_cache(self):
+        self._pointer_cache.clear()
+        self._game_state_address = None
 
     def _ensure_hooked(self) -> bool:
         if not self.dolphin.is_hooked():
             self.patches = None
+            self._clear_pointer_cache()
             self.dolphin.hook()
 
         return not self.dolphin.is_hooked()
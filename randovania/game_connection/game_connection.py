@@ -5,6 +5,8 @@ from asyncqt import asyncSlot
 
 from randovania.game_connection.connection_backend import ConnectionBackend
 from randovania.game_connection.connection_base import GameConnectionStatus, ConnectionBase, InventoryItem
+from randovania.game_connection.connection_statistics import ConnectionStatistics
+from randovania.game_connection.polling_scheduler import PollingScheduler
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.pickup_entry import PickupEntry
 
@@ -12,18 +14,20 @@ from randovania.game_description.resources.pickup_entry import PickupEntry
 class GameConnection(QObject, ConnectionBase):
     Updated = Signal()
 
-    _dt: float = 2.5
+    _dt: float = 1.0
     _last_status: Any = None
     backend: ConnectionBackend
+    scheduler: PollingScheduler
     _permanent_pickups: List[PickupEntry]
 
     def __init__(self, backend: ConnectionBackend):
         super().__init__()
         self._permanent_pickups = []
+        self.scheduler = PollingScheduler(interval=self._dt)
 
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._update)
-        self._timer.setInterval(self._dt * 1000)
+        self._timer.setInterval(int(self._dt * 1000))
         self._timer.setSingleShot(True)
 
         self.set_backend(backend)
@@ -40,6 +44,9 @@ class GameConnection(QObject, ConnectionBase):
         self._notify_status()
 
     async def start(self):
+        self.scheduler.reset()
+        self._dt = self.scheduler.interval
+        self._timer.setInterval(int(self._dt * 1000))
         self._timer.start()
 
     async def stop(self):
@@ -51,6 +58,8 @@ class GameConnection(QObject, ConnectionBase):
             await self.backend.update(self._dt)
             self._notify_status()
         finally:
+            self._dt = self.scheduler.next_interval(self.current_status)
+            self._timer.setInterval(int(self._dt * 1000))
             self._timer.start()
 
     def _notify_status(self):
@@ -67,6 +76,10 @@ class GameConnection(QObject, ConnectionBase):
     def current_status(self) -> GameConnectionStatus:
         return self.backend.current_status
 
+    @property
+    def statistics(self) -> ConnectionStatistics:
+        return self.backend.statistics
+
     def display_message(self, message: str):
         return self.backend.display_message(message)
 
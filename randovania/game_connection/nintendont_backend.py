@@ -1,13 +1,19 @@
 import asyncio
+import collections
 import dataclasses
 import struct
 from asyncio import StreamReader, StreamWriter
-from typing import List, Optional
+from typing import List, Optional, Dict
 
 from randovania.game_connection.backend_choice import GameBackendChoice
 from randovania.game_connection.connection_backend import ConnectionBackend, MemoryOperation
 from randovania.game_connection.connection_base import GameConnectionStatus
-from randovania.game_description.world import World
+
+# How many requests are sent before waiting for the response of the first one
+DEFAULT_MAX_IN_FLIGHT_REQUESTS = 4
+
+# The number of operations is sent as a single byte
+MAX_OPS_PER_REQUEST = 255
 
 
 @dataclasses.dataclass(frozen=True)
@@ -20,20 +26,34 @@ class SocketHolder:
     max_addresses: int
 
 
+def _num_validator_bytes(num_ops: int) -> int:
+    return 1 + (num_ops - 1) // 8 if num_ops else 0
+
+
+def _encoded_op_size(op: MemoryOperation) -> int:
+    size = 1
+    if op.byte_count != 4:
+        size += 1
+    if op.offset is not None:
+        size += 2
+    if op.write_bytes is not None:
+        size += len(op.write_bytes)
+    return size
+
+
 class RequestBatch:
+    data: bytearray
+    ops: List[MemoryOperation]
+    num_read_bytes: int
+    addresses: List[int]
+    _address_slots: Dict[int, int]
+
     def __init__(self):
-        self.data = b""
+        self.data = bytearray()
         self.ops = []
         self.num_read_bytes = 0
         self.addresses = []
-
-    def copy(self) -> "RequestBatch":
-        new = RequestBatch()
-        new.data = self.data
-        new.ops = list(self.ops)
-        new.num_read_bytes = self.num_read_bytes
-        new.addresses.extend(self.addresses)
-        return new
+        self._address_slots = {}
 
     def build_request_data(self):
         header = struct.pack(f">BBBB{len(self.addresses)}I", 0, len(self.ops), len(self.addresses), 1, *self.addresses)
@@ -45,26 +65,43 @@ class RequestBatch:
 
     @property
     def num_validator_bytes(self):
-        return 1 + (len(self.ops) - 1) // 8 if self.ops else 0
+        return _num_validator_bytes(len(self.ops))
 
     @property
     def output_bytes(self):
         return self.num_read_bytes + self.num_validator_bytes
 
+    @staticmethod
+    def _fits(holder: SocketHolder, num_ops: int, num_addresses: int, input_bytes: int, output_bytes: int) -> bool:
+        return (num_ops <= MAX_OPS_PER_REQUEST
+                and num_addresses < holder.max_addresses
+                and output_bytes <= holder.max_output
+                and input_bytes <= holder.max_input)
+
     def is_compatible_with(self, holder: SocketHolder):
-        return (len(self.addresses) < holder.max_addresses
-                and self.output_bytes <= holder.max_output
-                and self.input_bytes <= holder.max_input)
+        return self._fits(holder, len(self.ops), len(self.addresses), self.input_bytes, self.output_bytes)
+
+    def can_add_op(self, op: MemoryOperation, holder: SocketHolder) -> bool:
+        """
+        Checks if this batch would still be compatible with the given server after adding the given op,
+        without adding it.
+        """
+        num_addresses = len(self.addresses) + (op.address not in self._address_slots)
+        num_ops = len(self.ops) + 1
+        return self._fits(
+            holder, num_ops, num_addresses,
+            input_bytes=len(self.data) + _encoded_op_size(op) + 4 * num_addresses,
+            output_bytes=self.num_read_bytes + (op.read_byte_count or 0) + _num_validator_bytes(num_ops),
+        )
 
     def add_op(self, op: MemoryOperation):
-        if op.address not in self.addresses:
+        op_byte = self._address_slots.get(op.address)
+        if op_byte is None:
+            op_byte = self._address_slots[op.address] = len(self.addresses)
             self.addresses.append(op.address)
 
         if op.read_byte_count is not None:
             self.num_read_bytes += op.read_byte_count
-
-        op_byte = self.addresses.index(op.address)
-        if op.read_byte_count is not None:
             op_byte = op_byte | 0x80
         if op.write_bytes is not None:
             op_byte = op_byte | 0x40
@@ -73,9 +110,9 @@ class RequestBatch:
         if op.offset is not None:
             op_byte = op_byte | 0x10
 
-        self.data += struct.pack(">B", op_byte)
+        self.data.append(op_byte)
         if op.byte_count != 4:
-            self.data += struct.pack(">B", op.byte_count)
+            self.data.append(op.byte_count)
         if op.offset is not None:
             self.data += struct.pack(">h", op.offset)
         if op.write_bytes is not None:
@@ -89,13 +126,13 @@ def _was_invalid_address(response: bytes, i: int) -> bool:
 
 
 class NintendontBackend(ConnectionBackend):
-    _world: Optional[World] = None
     _port = 43673
     _socket: Optional[SocketHolder] = None
 
-    def __init__(self, ip: str):
+    def __init__(self, ip: str, max_in_flight_requests: int = DEFAULT_MAX_IN_FLIGHT_REQUESTS):
         super().__init__()
         self._ip = ip
+        self.max_in_flight_requests = max_in_flight_requests
 
     @property
     def ip(self):
@@ -122,17 +159,24 @@ class NintendontBackend(ConnectionBackend):
             writer.write(struct.pack(f">BBBB", 1, 0, 0, 1))
             await writer.drain()
 
-            response = await reader.read(1024)
+            response = await reader.readexactly(16)
             api_version, max_input, max_output, max_addresses = struct.unpack_from(">IIII", response, 0)
 
             self._socket = SocketHolder(reader, writer, api_version, max_input, max_output, max_addresses)
             return True
 
-        except OSError as e:
+        except (OSError, asyncio.IncompleteReadError) as e:
             self._socket = None
             self.logger.info(f"Unable to connect to {self._ip}:{self._port}: {e}")
             self._socket_error = e
 
+    @property
+    def _max_read_size(self) -> Optional[int]:
+        if self._socket is None:
+            return None
+        # One byte is needed to tell if the address was valid, and the size of each op is sent as a single byte
+        return min(self._socket.max_output - 1, 255)
+
     def _prepare_requests_for(self, ops: List[MemoryOperation]) -> List[RequestBatch]:
         requests: List[RequestBatch] = []
         current_batch = RequestBatch()
@@ -169,37 +213,57 @@ class NintendontBackend(ConnectionBackend):
                 processes_ops.append(op)
 
         for op in processes_ops:
-            experimental = current_batch.copy()
-            experimental.add_op(op)
-
-            if not experimental.is_compatible_with(self._socket):
-                _new_request()
-
+            if not current_batch.can_add_op(op, self._socket):
+                if current_batch.ops:
+                    _new_request()
+                if not current_batch.can_add_op(op, self._socket):
+                    raise ValueError(f"Request {op} is not compatible with current server.")
             current_batch.add_op(op)
-            if not current_batch.is_compatible_with(self._socket):
-                raise ValueError(f"Request {op} is not compatible with current server.")
 
         # Finish the last batch
         _new_request()
 
         return requests
 
+    async def _read_response(self, request: RequestBatch) -> bytes:
+        """
+        Reads the entire response to the given request. The response has the validator bytes, followed by the
+        bytes of each read to a valid address.
+        """
+        if request.output_bytes == 0:
+            return b""
+
+        response = await self._socket.reader.readexactly(request.num_validator_bytes)
+        read_size = sum(op.read_byte_count for i, op in enumerate(request.ops)
+                        if op.read_byte_count is not None and not _was_invalid_address(response, i))
+        if read_size > 0:
+            response += await self._socket.reader.readexactly(read_size)
+
+        self.logger.debug(f"Received {response.hex()}.")
+        return response
+
     async def _send_requests_to_socket(self, requests: List[RequestBatch]) -> List[bytes]:
+        """
+        Sends the requests without waiting for the previous responses, keeping at most `max_in_flight_requests`
+        requests without a response.
+        """
         all_responses = []
+        in_flight = collections.deque()
         try:
             for request in requests:
+                if len(in_flight) >= self.max_in_flight_requests:
+                    all_responses.append(await self._read_response(in_flight.popleft()))
+
                 data = request.build_request_data()
                 self.logger.debug(f"Sending {data.hex()} to {self._ip, self._port}.")
                 self._socket.writer.write(data)
                 await self._socket.writer.drain()
-                if request.output_bytes > 0:
-                    response = await self._socket.reader.read(1024)
-                    self.logger.debug(f"Received {response.hex()}.")
-                    all_responses.append(response)
-                else:
-                    all_responses.append(b"")
+                in_flight.append(request)
+
+            while in_flight:
+                all_responses.append(await self._read_response(in_flight.popleft()))
 
-        except OSError as e:
+        except (OSError, asyncio.IncompleteReadError) as e:
             self.logger.warning(f"Unable to connect to {self._ip}:{self._port}: {e}")
             self._socket = None
             self._socket_error = e
@@ -228,6 +292,7 @@ class NintendontBackend(ConnectionBackend):
                     result.append(response[read_index:read_index + op.read_byte_count])
                     read_index += op.read_byte_count
 
+        self.statistics.record(ops, result, requests=len(requests))
         return result
 
     async def update(self, dt: float):
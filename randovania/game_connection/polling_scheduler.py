@@ -0,0 +1,44 @@
+from typing import Optional
+
+from randovania.game_connection.connection_base import GameConnectionStatus
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_MIN_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 30.0
+
+
+class PollingScheduler:
+    """
+    Decides how long to wait before the next update of a backend.
+
+    While connected, updates happen every `interval` seconds, as backends only do cheap reads unless something
+    changed. While disconnected, the wait doubles after each failed attempt, up to `max_backoff` seconds.
+    """
+    interval: float
+    min_backoff: float
+    max_backoff: float
+    _backoff: Optional[float]
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, min_backoff: float = DEFAULT_MIN_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._backoff = None
+
+    def next_interval(self, status: GameConnectionStatus) -> float:
+        """
+        The seconds to wait before the next update, given the status after the last update.
+        """
+        if status == GameConnectionStatus.Disconnected:
+            if self._backoff is None:
+                self._backoff = self.min_backoff
+            else:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            return self._backoff
+
+        self._backoff = None
+        return self.interval
+
+    def reset(self):
+        self._backoff = None
@@ -22,6 +22,14 @@ class Area:
     def __hash__(self):
         return self.area_asset_id
 
+    def __deepcopy__(self, memodict):
+        # Nodes and requirements are immutable, so only the containers that can be modified need to be copied
+        return dataclasses.replace(
+            self,
+            nodes=list(self.nodes),
+            connections={source: dict(targets) for source, targets in self.connections.items()},
+        )
+
     def node_with_dock_index(self, dock_index: int) -> DockNode:
         for node in self.nodes:
             if isinstance(node, DockNode) and node.dock_index == dock_index:
@@ -1,4 +1,4 @@
-from typing import List, Callable, TypeVar, Tuple, Dict
+from typing import List, Callable, TypeVar, Tuple, Dict, Optional
 
 from randovania.game_description.area import Area
 from randovania.game_description.area_location import AreaLocation
@@ -8,7 +8,7 @@ from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import GenericNode, DockNode, TeleporterNode, PickupNode, EventNode, Node, \
     TranslatorGateNode, LogbookNode, LoreType, NodeLocation, PlayerShipNode
 from randovania.game_description.requirements import ResourceRequirement, Requirement, \
-    RequirementOr, RequirementAnd, RequirementTemplate
+    RequirementOr, RequirementAnd, RequirementTemplate, RequirementInterner
 from randovania.game_description.resources.damage_resource_info import DamageReduction, DamageResourceInfo
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.pickup_index import PickupIndex
@@ -85,17 +85,20 @@ def read_resource_requirement(data: Dict, resource_database: ResourceDatabase
 
 def read_requirement_and(data: Dict,
                          resource_database: ResourceDatabase,
+                         interner: Optional[RequirementInterner] = None,
                          ) -> RequirementAnd:
     return RequirementAnd([
-        read_requirement(item, resource_database)
+        read_requirement(item, resource_database, interner)
         for item in data["data"]
     ])
 
 
 def read_requirement_or(data: Dict,
-                        resource_database: ResourceDatabase) -> RequirementOr:
+                        resource_database: ResourceDatabase,
+                        interner: Optional[RequirementInterner] = None,
+                        ) -> RequirementOr:
     return RequirementOr([
-        read_requirement(item, resource_database)
+        read_requirement(item, resource_database, interner)
         for item in data["data"]
     ])
 
@@ -104,23 +107,31 @@ def read_requirement_template(data: Dict, resource_database: ResourceDatabase) -
     return RequirementTemplate(resource_database, data["data"])
 
 
-def read_requirement(data: Dict, resource_database: ResourceDatabase) -> Requirement:
+def read_requirement(data: Dict, resource_database: ResourceDatabase,
+                     interner: Optional[RequirementInterner] = None) -> Requirement:
+    """
+    Reads a requirement. When given an interner, the requirement and all nested in it are interned with it.
+    """
     req_type = data["type"]
     if req_type == "resource":
-        return read_resource_requirement(data, resource_database)
+        result = read_resource_requirement(data, resource_database)
 
     elif req_type == "and":
-        return read_requirement_and(data, resource_database)
+        result = read_requirement_and(data, resource_database, interner)
 
     elif req_type == "or":
-        return read_requirement_or(data, resource_database)
+        result = read_requirement_or(data, resource_database, interner)
 
     elif req_type == "template":
-        return read_requirement_template(data, resource_database)
+        result = read_requirement_template(data, resource_database)
 
     else:
         raise ValueError(f"Unknown requirement type: {req_type}")
 
+    if interner is not None:
+        result = interner.intern(result)
+    return result
+
 
 # Resource Gain
 
@@ -141,21 +152,25 @@ def read_resource_gain_tuple(data: List[Dict], database: "ResourceDatabase") ->
 
 # Dock Weakness
 
-def read_dock_weakness(item: Dict, resource_database: ResourceDatabase, dock_type: DockType) -> DockWeakness:
+def read_dock_weakness(item: Dict, resource_database: ResourceDatabase, dock_type: DockType,
+                       interner: Optional[RequirementInterner] = None) -> DockWeakness:
     return DockWeakness(item["index"],
                         item["name"],
                         item["is_blast_door"],
-                        read_requirement(item["requirement"], resource_database),
+                        read_requirement(item["requirement"], resource_database, interner),
                         dock_type)
 
 
 def read_dock_weakness_database(data: Dict,
                                 resource_database: ResourceDatabase,
+                                interner: Optional[RequirementInterner] = None,
                                 ) -> DockWeaknessDatabase:
-    door_types = read_array(data["door"], lambda item: read_dock_weakness(item, resource_database, DockType.DOOR))
-    portal_types = read_array(data["portal"], lambda item: read_dock_weakness(item, resource_database, DockType.PORTAL))
-    morph_ball_types = read_array(data["morph_ball"], lambda item: read_dock_weakness(item, resource_database,
-                                                                                      DockType.MORPH_BALL_DOOR))
+    def reader(dock_type: DockType):
+        return lambda item: read_dock_weakness(item, resource_database, dock_type, interner)
+
+    door_types = read_array(data["door"], reader(DockType.DOOR))
+    portal_types = read_array(data["portal"], reader(DockType.PORTAL))
+    morph_ball_types = read_array(data["morph_ball"], reader(DockType.MORPH_BALL_DOOR))
 
     return DockWeaknessDatabase(
         door=door_types,
@@ -198,15 +213,18 @@ def location_from_json(location: Dict[str, float]) -> NodeLocation:
 class WorldReader:
     resource_database: ResourceDatabase
     dock_weakness_database: DockWeaknessDatabase
+    interner: Optional[RequirementInterner]
     generic_index: int = -1
 
     def __init__(self,
                  resource_database: ResourceDatabase,
                  dock_weakness_database: DockWeaknessDatabase,
+                 interner: Optional[RequirementInterner] = None,
                  ):
 
         self.resource_database = resource_database
         self.dock_weakness_database = dock_weakness_database
+        self.interner = interner
 
     def _get_scan_visor(self) -> ItemResourceInfo:
         return find_resource_info_with_long_name(
@@ -280,7 +298,8 @@ class WorldReader:
 
             elif node_type == "player_ship":
                 return PlayerShipNode(name, heal, location, self.generic_index,
-                                      read_requirement(data["is_unlocked"], self.resource_database))
+                                      read_requirement(data["is_unlocked"], self.resource_database,
+                                                       self.interner))
 
             else:
                 raise Exception(f"Unknown type: {node_type}")
@@ -299,7 +318,7 @@ class WorldReader:
 
             for target_name, target_requirement in origin_data["connections"].items():
                 try:
-                    the_set = read_requirement(target_requirement, self.resource_database)
+                    the_set = read_requirement(target_requirement, self.resource_database, self.interner)
                 except MissingResource as e:
                     raise MissingResource(
                         f"In area {data['name']}, connection from {origin.name} to {target_name} got error: {e}")
@@ -326,14 +345,15 @@ class WorldReader:
         return WorldList(read_array(data, self.read_world))
 
 
-def read_requirement_templates(data: Dict, database: ResourceDatabase) -> Dict[str, Requirement]:
+def read_requirement_templates(data: Dict, database: ResourceDatabase,
+                               interner: Optional[RequirementInterner] = None) -> Dict[str, Requirement]:
     return {
-        name: read_requirement(item, database)
+        name: read_requirement(item, database, interner)
         for name, item in data.items()
     }
 
 
-def read_resource_database(data: Dict) -> ResourceDatabase:
+def read_resource_database(data: Dict, interner: Optional[RequirementInterner] = None) -> ResourceDatabase:
     item = read_array(data["items"], read_item_resource_info)
     db = ResourceDatabase(
         item=item,
@@ -344,7 +364,7 @@ def read_resource_database(data: Dict) -> ResourceDatabase:
         misc=read_resource_info_array(data["misc"], ResourceType.MISC),
         requirement_template={},
     )
-    db.requirement_template.update(read_requirement_templates(data["requirement_template"], db))
+    db.requirement_template.update(read_requirement_templates(data["requirement_template"], db, interner))
     return db
 
 
@@ -357,18 +377,21 @@ def read_initial_states(data: Dict[str, List], resource_database: ResourceDataba
 
 def decode_data_with_world_reader(data: Dict) -> Tuple[WorldReader, GameDescription]:
     game = RandovaniaGame(data["game"])
+    # Equal requirements repeat a lot, so they're shared to save memory and work when patching them
+    interner = RequirementInterner()
 
-    resource_database = read_resource_database(data["resource_database"])
-    dock_weakness_database = read_dock_weakness_database(data["dock_weakness_database"], resource_database)
+    resource_database = read_resource_database(data["resource_database"], interner)
+    dock_weakness_database = read_dock_weakness_database(data["dock_weakness_database"], resource_database,
+                                                         interner)
     if game == RandovaniaGame.PRIME2:
         game_specific = read_game_specific(data["game_specific"], resource_database)
     else:
         game_specific = None
 
-    world_reader = WorldReader(resource_database, dock_weakness_database)
+    world_reader = WorldReader(resource_database, dock_weakness_database, interner)
     world_list = world_reader.read_world_list(data["worlds"])
 
-    victory_condition = read_requirement(data["victory_condition"], resource_database)
+    victory_condition = read_requirement(data["victory_condition"], resource_database, interner)
     starting_location = AreaLocation.from_json(data["starting_location"])
     initial_states = read_initial_states(data["initial_states"], resource_database)
 
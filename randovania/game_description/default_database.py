@@ -1,6 +1,10 @@
+import collections
+import copy
 import functools
+import hashlib
 import json
 from pathlib import Path
+from typing import Tuple
 
 from randovania import get_data_path
 from randovania.game_description import data_reader
@@ -18,11 +22,58 @@ def default_prime2_game_description() -> GameDescription:
 
 @functools.lru_cache()
 def resource_database_for(game: RandovaniaGame) -> ResourceDatabase:
+    compiled_database = default_data.read_compiled_database(game)
+    if compiled_database is not None:
+        # Avoids decoding all areas when only the resources are needed
+        return read_resource_database(compiled_database.resource_database_data())
+
     return read_resource_database(default_data.read_json_then_binary(game)[1]["resource_database"])
 
 
+_MAX_DECODED_GAMES = 8
+_database_hashes: "collections.OrderedDict[int, Tuple[dict, str]]" = collections.OrderedDict()
+_decoded_games: "collections.OrderedDict[Tuple[RandovaniaGame, str], GameDescription]" = collections.OrderedDict()
+
+
+def _database_hash(data: dict) -> str:
+    """
+    Hashes the contents of the given database. The same dict is usually used many times, so it's only hashed once.
+    """
+    key = id(data)
+    cached = _database_hashes.get(key)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+
+    result = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # The dict is kept alive by the cache, so its id can't be reused while in it
+    _database_hashes[key] = (data, result)
+    if len(_database_hashes) > _MAX_DECODED_GAMES:
+        _database_hashes.popitem(last=False)
+    return result
+
+
+def decode_data_with_cache(data: dict) -> GameDescription:
+    """
+    Same as data_reader.decode_data, but each database is only decoded once per process.
+    The result is a copy of the decoded GameDescription that can be modified freely, but the given data must not be
+    modified afterwards.
+    """
+    key = (RandovaniaGame(data["game"]), _database_hash(data))
+    game = _decoded_games.get(key)
+    if game is None:
+        game = data_reader.decode_data(data)
+        _decoded_games[key] = game
+        if len(_decoded_games) > _MAX_DECODED_GAMES:
+            _decoded_games.popitem(last=False)
+    else:
+        _decoded_games.move_to_end(key)
+
+    return copy.deepcopy(game)
+
+
 def game_description_for(game: RandovaniaGame) -> GameDescription:
-    return data_reader.decode_data(default_data.read_json_then_binary(game)[1])
+    return decode_data_with_cache(default_data.read_json_then_binary(game)[1])
 
 
 def _read_database_in_path(path: Path) -> item_database.ItemDatabase:
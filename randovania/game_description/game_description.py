@@ -7,11 +7,12 @@ from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.dock import DockWeaknessDatabase
 from randovania.game_description.echoes_game_specific import EchoesGameSpecific
 from randovania.game_description.game_patches import GamePatches
-from randovania.game_description.node import TeleporterNode
+from randovania.game_description.node import TeleporterNode, ResourceNode
 from randovania.game_description.requirements import SatisfiableRequirements, Requirement
 from randovania.game_description.resources.damage_resource_info import DamageResourceInfo
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, ResourceGainTuple, CurrentResources
+from randovania.game_description.resources.resource_vector import ResourceVectorLayout
 from randovania.game_description.world_list import WorldList
 from randovania.games.game import RandovaniaGame
 
@@ -39,6 +40,7 @@ class GameDescription:
     starting_location: AreaLocation
     initial_states: Dict[str, ResourceGainTuple]
     _dangerous_resources: Optional[FrozenSet[ResourceInfo]] = None
+    _resource_layout: Optional[ResourceVectorLayout] = None
     world_list: WorldList
 
     def __deepcopy__(self, memodict):
@@ -53,6 +55,7 @@ class GameDescription:
             initial_states=copy.copy(self.initial_states),
         )
         new_game._dangerous_resources = self._dangerous_resources
+        new_game._resource_layout = self._resource_layout
         return new_game
 
     def __init__(self,
@@ -79,6 +82,21 @@ class GameDescription:
     def patch_requirements(self, resources, damage_multiplier: float):
         self.world_list.patch_requirements(resources, damage_multiplier)
         self._dangerous_resources = None
+        self.compile_requirements()
+
+    def compile_requirements(self):
+        """
+        Compiles the requirements of all connections for the resource_layout, so evaluating these later is cheaper.
+        """
+        layout = self.resource_layout
+        for area in self.world_list.all_areas:
+            for connections in area.connections.values():
+                for requirement in connections.values():
+                    requirement.compiled(layout)
+
+        for list_by_type in self.dock_weakness_database:
+            for dock_weakness in list_by_type:
+                dock_weakness.requirement.compiled(layout)
 
     def create_game_patches(self) -> GamePatches:
         elevator_connection = {
@@ -91,6 +109,19 @@ class GameDescription:
         return GamePatches(None, {}, elevator_connection, {}, {}, {}, {}, self.starting_location, {},
                            game_specific=self.game_specific)
 
+    @property
+    def resource_layout(self) -> ResourceVectorLayout:
+        """
+        The layout shared with the States of this game, including the resources of every ResourceNode.
+        """
+        if self._resource_layout is None:
+            layout = ResourceVectorLayout.for_database(self.resource_database)
+            for node in self.world_list.all_nodes:
+                if isinstance(node, ResourceNode):
+                    layout.slot(node.resource())
+            self._resource_layout = layout
+        return self._resource_layout
+
     @property
     def dangerous_resources(self) -> FrozenSet[ResourceInfo]:
         if self._dangerous_resources is None:
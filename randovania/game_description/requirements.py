@@ -1,16 +1,62 @@
 from functools import lru_cache
 from math import ceil
-from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple, List, Type, Union
+from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple, List, Type, Union, Callable, Sequence, \
+    TYPE_CHECKING, Dict, TypeVar
 
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources
 from randovania.game_description.resources.resource_type import ResourceType
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
 
+if TYPE_CHECKING:
+    from randovania.game_description.resources.resource_vector import ResourceVectorLayout
+
 MAX_DAMAGE = 9999999
 
 
+def _min_damage(*damages: Optional[int]) -> int:
+    valid = [damage for damage in damages if damage is not None]
+    if valid:
+        return min(valid)
+    else:
+        return MAX_DAMAGE
+
+
+_COMPILED_NAMESPACE = {
+    "_ceil": ceil,
+    "_min_damage": _min_damage,
+    "_MAX_DAMAGE": MAX_DAMAGE,
+}
+
+
+class CompiledRequirement:
+    """
+    A Requirement lowered into single Python expressions, for a given ResourceVectorLayout.
+    `satisfied` and `damage` behave exactly like the Requirement methods of same name, but read the resources from the
+    list created by `ResourceVectorLayout.dense_quantities` and don't walk the requirement tree.
+    """
+    satisfied: Callable[[Sequence[int], int], bool]
+    damage: Callable[[Sequence[int]], int]
+
+    def __init__(self, satisfied_expression: str, damage_expression: str):
+        self._expressions = satisfied_expression, damage_expression
+        self.satisfied = eval(f"lambda vector, energy: {satisfied_expression}", _COMPILED_NAMESPACE)
+        self.damage = eval(f"lambda vector: {damage_expression}", _COMPILED_NAMESPACE)
+
+    def __reduce__(self):
+        # The lambdas can't be pickled, so compile them again instead
+        return CompiledRequirement, self._expressions
+
+    def __deepcopy__(self, memodict):
+        return self
+
+    def __repr__(self):
+        return "CompiledRequirement({!r}, {!r})".format(*self._expressions)
+
+
 class Requirement:
+    _compiled: Optional[Tuple["ResourceVectorLayout", "CompiledRequirement"]] = None
+
     def damage(self, current_resources: CurrentResources) -> int:
         raise NotImplementedError()
 
@@ -60,10 +106,36 @@ class Requirement:
     def iterate_resource_requirements(self):
         raise NotImplementedError()
 
+    def compiled(self, layout: "ResourceVectorLayout") -> CompiledRequirement:
+        """
+        Gets a CompiledRequirement equivalent to this requirement, for quantities using the given layout.
+        """
+        if self._compiled is not None and self._compiled[0] is layout:
+            return self._compiled[1]
+
+        result = layout.compile(self)
+        self._compiled = layout, result
+        return result
+
+    def satisfied_expression(self, layout: "ResourceVectorLayout", energy: str) -> str:
+        """
+        Creates a Python expression equivalent to `satisfied`, with the quantities in a list named `vector` and the
+        energy given by the `energy` expression.
+        """
+        raise NotImplementedError()
+
+    def damage_expression(self, layout: "ResourceVectorLayout") -> str:
+        """
+        Creates a Python expression equivalent to `damage`, with the quantities in a list named `vector`.
+        """
+        raise NotImplementedError()
+
 
 class RequirementAnd(Requirement):
     items: Tuple[Requirement, ...]
     _cached_hash = None
+    _cached_simplify: Optional[Requirement] = None
+    _cached_as_set: Optional["RequirementSet"] = None
 
     def __init__(self, items: Iterable[Requirement]):
         self.items = tuple(items)
@@ -90,6 +162,11 @@ class RequirementAnd(Requirement):
         )
 
     def simplify(self) -> Requirement:
+        if self._cached_simplify is None:
+            self._cached_simplify = self._simplify()
+        return self._cached_simplify
+
+    def _simplify(self) -> Requirement:
         new_items = _expand_items(self.items, RequirementAnd, Requirement.trivial())
         if Requirement.impossible() in new_items:
             return Requirement.impossible()
@@ -101,10 +178,12 @@ class RequirementAnd(Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        result = RequirementSet.trivial()
-        for item in self.items:
-            result = result.union(item.as_set)
-        return result
+        if self._cached_as_set is None:
+            result = RequirementSet.trivial()
+            for item in self.items:
+                result = result.union(item.as_set)
+            self._cached_as_set = result
+        return self._cached_as_set
 
     @property
     def sorted(self) -> Tuple[Requirement]:
@@ -132,10 +211,25 @@ class RequirementAnd(Requirement):
         for item in self.items:
             yield from item.iterate_resource_requirements()
 
+    def satisfied_expression(self, layout: "ResourceVectorLayout", energy: str) -> str:
+        if not self.items:
+            return "True"
+        return "({})".format(" and ".join(item.satisfied_expression(layout, energy) for item in self.items))
+
+    def damage_expression(self, layout: "ResourceVectorLayout") -> str:
+        if not self.items:
+            return "0"
+        return "(({}) if {} else _MAX_DAMAGE)".format(
+            " + ".join(item.damage_expression(layout) for item in self.items),
+            self.satisfied_expression(layout, "_MAX_DAMAGE"),
+        )
+
 
 class RequirementOr(Requirement):
     items: Tuple[Requirement, ...]
     _cached_hash = None
+    _cached_simplify: Optional[Requirement] = None
+    _cached_as_set: Optional["RequirementSet"] = None
 
     def __init__(self, items: Iterable[Requirement]):
         self.items = tuple(items)
@@ -163,6 +257,11 @@ class RequirementOr(Requirement):
         )
 
     def simplify(self) -> Requirement:
+        if self._cached_simplify is None:
+            self._cached_simplify = self._simplify()
+        return self._cached_simplify
+
+    def _simplify(self) -> Requirement:
         new_items = _expand_items(self.items, RequirementOr, Requirement.impossible())
         if Requirement.trivial() in new_items:
             return Requirement.trivial()
@@ -210,10 +309,16 @@ class RequirementOr(Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        alternatives = set()
-        for item in self.items:
-            alternatives |= item.as_set.alternatives
-        return RequirementSet(alternatives)
+        if self._cached_as_set is None:
+            if len(self.items) == 1:
+                result = self.items[0].as_set
+            else:
+                alternatives = set()
+                for item in self.items:
+                    alternatives |= item.as_set.alternatives
+                result = RequirementSet(alternatives)
+            self._cached_as_set = result
+        return self._cached_as_set
 
     @property
     def sorted(self) -> Tuple[Requirement]:
@@ -241,6 +346,18 @@ class RequirementOr(Requirement):
         for item in self.items:
             yield from item.iterate_resource_requirements()
 
+    def satisfied_expression(self, layout: "ResourceVectorLayout", energy: str) -> str:
+        if not self.items:
+            return "False"
+        return "({})".format(" or ".join(item.satisfied_expression(layout, energy) for item in self.items))
+
+    def damage_expression(self, layout: "ResourceVectorLayout") -> str:
+        return "_min_damage({})".format("".join(
+            "({} if {} else None), ".format(item.damage_expression(layout),
+                                            item.satisfied_expression(layout, "_MAX_DAMAGE"))
+            for item in self.items
+        ))
+
 
 def _expand_items(items: Tuple[Requirement, ...],
                   cls: Type[Union[RequirementAnd, RequirementOr]],
@@ -349,15 +466,34 @@ class ResourceRequirement(NamedTuple, Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        return RequirementSet([
-            RequirementList([
-                self
-            ])
-        ])
+        return _resource_requirement_as_set(self)
 
     def iterate_resource_requirements(self):
         yield self
 
+    def compiled(self, layout: "ResourceVectorLayout") -> CompiledRequirement:
+        return layout.compile(self)
+
+    def satisfied_expression(self, layout: "ResourceVectorLayout", energy: str) -> str:
+        if self.is_damage:
+            return "({} > {})".format(energy, self.damage_expression(layout))
+
+        return "(vector[{}] {} {!r})".format(layout.slot(self.resource), "<" if self.negate else ">=", self.amount)
+
+    def damage_expression(self, layout: "ResourceVectorLayout") -> str:
+        if not self.is_damage:
+            return "0"
+
+        if not self.resource.reductions:
+            return repr(self.damage({}))
+
+        # Same operations as DamageResourceInfo.damage_reduction, so the result is exactly the same
+        multiplier = "1"
+        for reduction in self.resource.reductions:
+            multiplier = "({} * ({!r} if vector[{}] > 0 else 1))".format(
+                multiplier, reduction.damage_multiplier, layout.slot(reduction.inventory_item))
+        return "_ceil({} * {!r})".format(multiplier, self.amount)
+
 
 class RequirementTemplate(Requirement):
     database: ResourceDatabase
@@ -400,10 +536,39 @@ class RequirementTemplate(Requirement):
     def iterate_resource_requirements(self):
         yield from self.template_requirement.iterate_resource_requirements()
 
+    def satisfied_expression(self, layout: "ResourceVectorLayout", energy: str) -> str:
+        return self.template_requirement.satisfied_expression(layout, energy)
+
+    def damage_expression(self, layout: "ResourceVectorLayout") -> str:
+        return self.template_requirement.damage_expression(layout)
+
+
+R = TypeVar("R", bound=Requirement)
+
+
+class RequirementInterner:
+    """
+    Keeps a single instance of each distinct requirement, so structurally equal requirements are the same object.
+    Work done for one of them, like patching or compiling, is then shared by all.
+    """
+    _requirements: Dict[Requirement, Requirement]
+
+    def __init__(self):
+        self._requirements = {}
+        self.intern(Requirement.trivial())
+        self.intern(Requirement.impossible())
+
+    def __len__(self) -> int:
+        return len(self._requirements)
+
+    def intern(self, requirement: R) -> R:
+        return self._requirements.setdefault(requirement, requirement)
+
 
 class RequirementList:
     items: FrozenSet[ResourceRequirement]
     _cached_hash: Optional[int] = None
+    _cached_dangerous_resources: Optional[FrozenSet[ResourceInfo]] = None
 
     def __deepcopy__(self, memodict):
         return self
@@ -462,14 +627,18 @@ class RequirementList:
         return None
 
     @property
-    def dangerous_resources(self) -> Iterator[ResourceInfo]:
+    def dangerous_resources(self) -> FrozenSet[ResourceInfo]:
         """
-        Return an iterator of all SimpleResourceInfo in this list that have the negate flag
+        Return all SimpleResourceInfo in this list that have the negate flag
         :return:
         """
-        for individual in self.values():
-            if individual.negate:
-                yield individual.resource
+        if self._cached_dangerous_resources is None:
+            self._cached_dangerous_resources = frozenset(
+                individual.resource
+                for individual in self.values()
+                if individual.negate
+            )
+        return self._cached_dangerous_resources
 
     def values(self) -> FrozenSet[ResourceRequirement]:
         return self.items
@@ -485,6 +654,7 @@ class RequirementSet:
     """
     alternatives: FrozenSet[RequirementList]
     _cached_hash: Optional[int] = None
+    _cached_dangerous_resources: Optional[FrozenSet[ResourceInfo]] = None
 
     def __init__(self, alternatives: Iterable[RequirementList]):
         """
@@ -493,11 +663,31 @@ class RequirementSet:
         :param alternatives:
         """
         input_set = frozenset(alternatives)
-        self.alternatives = frozenset(
-            requirement
-            for requirement in input_set
-            if not any(other < requirement for other in input_set)
-        )
+        if len(input_set) <= 1:
+            self.alternatives = input_set
+            return
+
+        # A redundant alternative always has a minimal one that is a subset of it, and only smaller lists can be
+        # subsets. So checking against the minimal ones found so far, from smallest to biggest, is enough.
+        minimal = []
+        for requirement in sorted(input_set, key=lambda it: len(it.items)):
+            if not any(other < requirement for other in minimal):
+                minimal.append(requirement)
+
+        if len(minimal) == len(input_set):
+            self.alternatives = input_set
+        else:
+            minimal = set(minimal)
+            self.alternatives = frozenset(requirement for requirement in input_set if requirement in minimal)
+
+    @classmethod
+    def from_minimal_alternatives(cls, alternatives: Iterable[RequirementList]) -> "RequirementSet":
+        """
+        Constructs a RequirementSet from alternatives that are known to have no redundancies, skipping the check.
+        """
+        result = cls.__new__(cls)
+        result.alternatives = frozenset(alternatives)
+        return result
 
     def __deepcopy__(self, memodict):
         return self
@@ -554,6 +744,10 @@ class RequirementSet:
 
     def union(self, other: "RequirementSet") -> "RequirementSet":
         """Create a new RequirementSet that is only satisfied when both are satisfied"""
+        if self == RequirementSet.trivial():
+            return other
+        if other == RequirementSet.trivial():
+            return self
         return RequirementSet(
             a.union(b)
             for a in self.alternatives
@@ -564,13 +758,18 @@ class RequirementSet:
         return RequirementSet(self.alternatives | other.alternatives)
 
     @property
-    def dangerous_resources(self) -> Iterator[ResourceInfo]:
+    def dangerous_resources(self) -> FrozenSet[ResourceInfo]:
         """
-        Return an iterator of all SimpleResourceInfo in all alternatives that have the negate flag
+        Return all SimpleResourceInfo in all alternatives that have the negate flag
         :return:
         """
-        for alternative in self.alternatives:
-            yield from alternative.dangerous_resources
+        if self._cached_dangerous_resources is None:
+            self._cached_dangerous_resources = frozenset(
+                resource
+                for alternative in self.alternatives
+                for resource in alternative.dangerous_resources
+            )
+        return self._cached_dangerous_resources
 
     @property
     def all_individual(self) -> Iterator[ResourceRequirement]:
@@ -584,3 +783,9 @@ class RequirementSet:
 
 
 SatisfiableRequirements = FrozenSet[RequirementList]
+
+
+@lru_cache(maxsize=4096)
+def _resource_requirement_as_set(requirement: ResourceRequirement) -> RequirementSet:
+    # ResourceRequirement is a NamedTuple, so it can't keep the result itself
+    return RequirementSet.from_minimal_alternatives([RequirementList([requirement])])
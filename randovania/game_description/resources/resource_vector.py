@@ -0,0 +1,274 @@
+import collections
+import collections.abc
+from array import array
+from typing import Dict, Iterable, List, Tuple, Iterator, Optional, Mapping, Any, Sequence, FrozenSet
+
+from randovania.game_description.requirements import Requirement, CompiledRequirement
+from randovania.game_description.resources.logbook_asset import LogbookAsset
+from randovania.game_description.resources.resource_database import ResourceDatabase
+from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources
+from randovania.game_description.resources.resource_type import ResourceType
+
+_DATABASE_RESOURCE_TYPES = (
+    ResourceType.ITEM,
+    ResourceType.EVENT,
+    ResourceType.TRICK,
+    ResourceType.DAMAGE,
+    ResourceType.VERSION,
+    ResourceType.MISC,
+)
+_MAX_CACHED_LAYOUTS = 16
+
+
+def _resource_sort_key(resource: ResourceInfo) -> Tuple[int, int]:
+    if isinstance(resource, LogbookAsset):
+        return resource.resource_type.value, resource.asset_id
+    return resource.resource_type.value, resource.index
+
+
+class ResourceVectorLayout:
+    """
+    Assigns each resource of a game a position in a dense list of quantities. The resources it's created with are
+    sorted by (ResourceType, index), with any other resource being appended as they're first used.
+    Slots are never removed, but compiling a requirement can add resources, and requirements compiled afterwards read
+    slots that lists created before don't have. Create the list again when the layout grew.
+
+    Requirements can be compiled for a layout, in order to be checked against these lists instead of a CurrentResources.
+    """
+    resources: List[ResourceInfo]
+    compiled_requirements: Dict[Requirement, CompiledRequirement]
+    _slots: Dict[ResourceInfo, int]
+    _slots_by_type: Dict[ResourceType, List[int]]
+
+    _for_database: "collections.OrderedDict[int, Tuple[ResourceDatabase, ResourceVectorLayout]]" = \
+        collections.OrderedDict()
+
+    def __init__(self, resources: Iterable[ResourceInfo] = ()):
+        self.resources = []
+        self.compiled_requirements = {}
+        self._slots = {}
+        self._slots_by_type = collections.defaultdict(list)
+        for resource in sorted(set(resources), key=_resource_sort_key):
+            self.slot(resource)
+
+    @classmethod
+    def for_database(cls, database: ResourceDatabase) -> "ResourceVectorLayout":
+        """
+        Gets the layout shared by everything using the given database, creating one with all of its resources if
+        needed. Resources that exist only in the world, such as PickupIndex, are added once used.
+        """
+        cache = cls._for_database
+        key = id(database)
+        cached = cache.get(key)
+        if cached is not None and cached[0] is database:
+            cache.move_to_end(key)
+            return cached[1]
+
+        resources = []
+        if isinstance(database, ResourceDatabase):
+            for resource_type in _DATABASE_RESOURCE_TYPES:
+                resources.extend(database.get_by_type(resource_type))
+
+        result = cls(resources)
+        # The database is kept alive by the cache, so its id can't be reused while in it
+        cache[key] = (database, result)
+        if len(cache) > _MAX_CACHED_LAYOUTS:
+            cache.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def __deepcopy__(self, memodict):
+        return self
+
+    def compile(self, requirement: Requirement) -> CompiledRequirement:
+        """
+        Compiles the given requirement for this layout. Equal requirements share the same result.
+        """
+        result = self.compiled_requirements.get(requirement)
+        if result is None:
+            result = CompiledRequirement(requirement.satisfied_expression(self, "energy"),
+                                         requirement.damage_expression(self))
+            self.compiled_requirements[requirement] = result
+        return result
+
+    def slot(self, resource: ResourceInfo) -> int:
+        """
+        Gets the position of the given resource, adding it to the end of the layout if it's not part of it yet.
+        """
+        result = self._slots.get(resource)
+        if result is None:
+            result = len(self.resources)
+            self.resources.append(resource)
+            self._slots[resource] = result
+            self._slots_by_type[resource.resource_type].append(result)
+        return result
+
+    def slots_of_type(self, resource_type: ResourceType) -> Sequence[int]:
+        return self._slots_by_type.get(resource_type, ())
+
+    def dense_quantities(self, resources: CurrentResources) -> Sequence[int]:
+        """
+        Creates the list of quantities for the given resources. Keys that aren't resources are ignored.
+        """
+        if isinstance(resources, ResourceVector) and resources.layout is self:
+            return resources.dense_quantities()
+
+        result = [0] * len(self.resources)
+        for resource, quantity in resources.items():
+            if not isinstance(resource, str):
+                slot = self.slot(resource)
+                if slot >= len(result):
+                    result.extend([0] * (slot + 1 - len(result)))
+                result[slot] = quantity
+        return result
+
+
+class ResourceVector(collections.abc.MutableMapping):
+    """
+    A CurrentResources that stores quantities in an array following a ResourceVectorLayout, so it's cheap to copy
+    and can be used directly with requirements compiled for that layout.
+
+    Like a dict, a resource can be present with quantity 0. Keys that aren't resources, like flags used by the
+    resolver, are kept in a regular dict.
+    """
+    layout: ResourceVectorLayout
+    _quantities: array
+    _present: bytearray
+    _extra: Dict[Any, int]
+
+    def __init__(self, layout: ResourceVectorLayout, resources: Optional[Mapping[ResourceInfo, int]] = None):
+        self.layout = layout
+        self._quantities = array("q", bytes(8 * len(layout)))
+        self._present = bytearray(len(layout))
+        self._extra = {}
+        if resources is not None:
+            for resource, quantity in resources.items():
+                self[resource] = quantity
+
+    def copy(self) -> "ResourceVector":
+        result = ResourceVector.__new__(ResourceVector)
+        result.layout = self.layout
+        result._quantities = array("q", self._quantities)
+        result._present = bytearray(self._present)
+        result._extra = dict(self._extra)
+        return result
+
+    __copy__ = copy
+
+    def _grow(self):
+        missing = len(self.layout) - len(self._present)
+        self._quantities.frombytes(bytes(8 * missing))
+        self._present.extend(bytes(missing))
+
+    def dense_quantities(self) -> Sequence[int]:
+        """
+        The quantities of all resources of the layout, with 0 for the ones not present.
+        """
+        if len(self._present) < len(self.layout):
+            self._grow()
+        return self._quantities
+
+    def __getitem__(self, key) -> int:
+        slot = self.layout._slots.get(key) if not isinstance(key, str) else None
+        if slot is None:
+            return self._extra[key]
+        if slot < len(self._present) and self._present[slot]:
+            return self._quantities[slot]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        slot = self.layout._slots.get(key) if not isinstance(key, str) else None
+        if slot is None:
+            return self._extra.get(key, default)
+        if slot < len(self._present) and self._present[slot]:
+            return self._quantities[slot]
+        return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __setitem__(self, key, quantity: int):
+        if isinstance(key, str):
+            self._extra[key] = quantity
+            return
+
+        slot = self.layout.slot(key)
+        if slot >= len(self._present):
+            self._grow()
+        self._quantities[slot] = quantity
+        self._present[slot] = 1
+
+    def __delitem__(self, key):
+        slot = self.layout._slots.get(key) if not isinstance(key, str) else None
+        if slot is None:
+            del self._extra[key]
+        elif slot < len(self._present) and self._present[slot]:
+            self._present[slot] = 0
+            self._quantities[slot] = 0
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        resources = self.layout.resources
+        for slot, present in enumerate(self._present):
+            if present:
+                yield resources[slot]
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return self._present.count(1) + len(self._extra)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ResourceVector) and other.layout is self.layout:
+            return (self.dense_quantities() == other.dense_quantities()
+                    and self._present == other._present
+                    and self._extra == other._extra)
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def canonical_key(self) -> Tuple[bytes, bytes, FrozenSet]:
+        """
+        A hashable value that's equal for vectors of the same layout with the same resources.
+        """
+        return self.dense_quantities().tobytes(), bytes(self._present), frozenset(self._extra.items())
+
+    def resources_of_type(self, resource_type: ResourceType) -> Iterator[Tuple[ResourceInfo, int]]:
+        """
+        Iterates over the present resources of the given type and their quantities, in layout order.
+        """
+        resources = self.layout.resources
+        quantities = self._quantities
+        present = self._present
+        size = len(present)
+        for slot in self.layout.slots_of_type(resource_type):
+            if slot < size and present[slot]:
+                yield resources[slot], quantities[slot]
+
+    def changed_resources(self, other: "ResourceVector") -> Iterator[ResourceInfo]:
+        """
+        Iterates over the resources whose quantity or presence differs from the given vector, which must use the
+        same layout. Keys that aren't resources are ignored.
+        """
+        resources = self.layout.resources
+        own_quantities, other_quantities = self.dense_quantities(), other.dense_quantities()
+        own_present, other_present = self._present, other._present
+        if own_quantities == other_quantities and own_present == other_present:
+            return
+
+        for slot, (a, b) in enumerate(zip(own_quantities, other_quantities)):
+            if a != b or own_present[slot] != other_present[slot]:
+                yield resources[slot]
+
+
+def resource_vector_for(database: ResourceDatabase, resources: CurrentResources) -> ResourceVector:
+    """
+    Gets a ResourceVector with the given resources, using the layout of the given database.
+    Returns the same object when it's already one.
+    """
+    if isinstance(resources, ResourceVector):
+        return resources
+    return ResourceVector(ResourceVectorLayout.for_database(database), resources)
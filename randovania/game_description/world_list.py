@@ -7,7 +7,7 @@ from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.dock import DockConnection
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import Node, DockNode, TeleporterNode, PickupNode, PlayerShipNode
-from randovania.game_description.requirements import Requirement
+from randovania.game_description.requirements import Requirement, RequirementInterner
 from randovania.game_description.resources.resource_info import CurrentResources
 from randovania.game_description.world import World
 
@@ -208,15 +208,24 @@ class WorldList:
         Patches all Node connections, assuming the given resources will never change their quantity.
         This is removes all checking for tricks and difficulties in runtime since these never change.
         All damage requirements are multiplied by the given multiplier.
+        Each distinct requirement is only patched once, and equal results are the same object.
         :param static_resources:
         :param damage_multiplier:
         :return:
         """
+        interner = RequirementInterner()
+        patched: Dict[Requirement, Requirement] = {}
+
         for world in self.worlds:
             for area in world.areas:
                 for connections in area.connections.values():
                     for target, value in connections.items():
-                        connections[target] = value.patch_requirements(static_resources, damage_multiplier).simplify()
+                        result = patched.get(value)
+                        if result is None:
+                            result = interner.intern(
+                                value.patch_requirements(static_resources, damage_multiplier).simplify())
+                            patched[value] = result
+                        connections[target] = result
 
     def area_by_area_location(self, location: AreaLocation) -> Area:
         return self.world_by_asset_id(location.world_asset_id).area_by_asset_id(location.area_asset_id)
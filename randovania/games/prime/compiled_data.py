@@ -0,0 +1,390 @@
+"""
+A precompiled format for the game databases, made to be memory-mapped and decoded only as needed.
+
+All integers are little-endian. The file is made of:
+- a header, with the magic, format version and the offset of each section;
+- a string table, with every string used by the database stored once;
+- a requirement table, with every distinct requirement stored once. Requirements nested in another reference the
+  earlier entry, so the table is a DAG and equal requirements decode to the same object;
+- the common data, which is everything but the areas. Each world has an empty list of areas;
+- an area index, with the world, name and asset id of each area and the position of its block;
+- the area blocks, each with the nodes and connections of one area.
+"""
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple, NamedTuple
+
+MAGIC = b"RDVDB\x00"
+current_format_version = 1
+
+_HEADER = struct.Struct("<6sH5I")
+_UINT = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_UINT64 = struct.Struct("<Q")
+_FLOAT = struct.Struct("<d")
+_AREA_ENTRY = struct.Struct("<IIQII")
+
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_FLOAT = 4
+_TAG_STRING = 5
+_TAG_LIST = 6
+_TAG_DICT = 7
+_TAG_REQUIREMENT = 8
+_TAG_UINT64 = 9
+
+_REQUIREMENT_TYPES = {"and", "or", "resource", "template"}
+
+
+def _is_requirement(value: dict) -> bool:
+    return len(value) == 2 and value.get("type") in _REQUIREMENT_TYPES and "data" in value
+
+
+class _Encoder:
+    strings: List[str]
+    requirements: List[bytes]
+    _string_ids: Dict[str, int]
+    _requirement_ids: Dict[bytes, int]
+
+    def __init__(self):
+        self.strings = []
+        self.requirements = []
+        self._string_ids = {}
+        self._requirement_ids = {}
+
+    def string_id(self, value: str) -> int:
+        result = self._string_ids.get(value)
+        if result is None:
+            result = len(self.strings)
+            self.strings.append(value)
+            self._string_ids[value] = result
+        return result
+
+    def requirement_id(self, requirement: dict) -> int:
+        body = bytearray()
+        self.encode_dict(requirement, body)
+        # Nested requirements are references, so the body is the same only for equal requirements
+        body = bytes(body)
+
+        result = self._requirement_ids.get(body)
+        if result is None:
+            result = len(self.requirements)
+            self.requirements.append(body)
+            self._requirement_ids[body] = result
+        return result
+
+    def encode_dict(self, value: dict, output: bytearray):
+        output.append(_TAG_DICT)
+        output += _UINT.pack(len(value))
+        for key, item in value.items():
+            output += _UINT.pack(self.string_id(key))
+            self.encode(item, output)
+
+    def encode(self, value: Any, output: bytearray):
+        if value is None:
+            output.append(_TAG_NONE)
+
+        elif isinstance(value, bool):
+            output.append(_TAG_TRUE if value else _TAG_FALSE)
+
+        elif isinstance(value, int):
+            # Asset ids of some games use all 64 bits
+            if value < 0:
+                output.append(_TAG_INT)
+                output += _INT.pack(value)
+            else:
+                output.append(_TAG_UINT64)
+                output += _UINT64.pack(value)
+
+        elif isinstance(value, float):
+            output.append(_TAG_FLOAT)
+            output += _FLOAT.pack(value)
+
+        elif isinstance(value, str):
+            output.append(_TAG_STRING)
+            output += _UINT.pack(self.string_id(value))
+
+        elif isinstance(value, (list, tuple)):
+            output.append(_TAG_LIST)
+            output += _UINT.pack(len(value))
+            for item in value:
+                self.encode(item, output)
+
+        elif isinstance(value, dict):
+            if _is_requirement(value):
+                output.append(_TAG_REQUIREMENT)
+                output += _UINT.pack(self.requirement_id(value))
+            else:
+                self.encode_dict(value, output)
+
+        else:
+            raise ValueError(f"Unsupported value in database: {value!r}")
+
+
+def _table(entries: Iterable[bytes]) -> bytes:
+    """
+    Encodes the given entries with a count and the offset of each, relative to the end of the offsets.
+    """
+    entries = list(entries)
+    offsets = array("I")
+    position = 0
+    for entry in entries:
+        offsets.append(position)
+        position += len(entry)
+    offsets.append(position)
+    if offsets.itemsize != 4:
+        raise RuntimeError("Unsupported platform: array of unsigned int is not 4 bytes")
+
+    return b"".join([_UINT.pack(len(entries)), offsets.tobytes()] + entries)
+
+
+def encode(data: Dict) -> bytes:
+    encoder = _Encoder()
+
+    common = dict(data)
+    common["worlds"] = []
+    area_entries = []
+    area_blocks = []
+    for world_index, world in enumerate(data["worlds"]):
+        common["worlds"].append(dict(world))
+        common["worlds"][-1]["areas"] = []
+
+        for area in world["areas"]:
+            block = bytearray()
+            encoder.encode(area, block)
+            area_entries.append((world_index, encoder.string_id(area["name"]), area["asset_id"]))
+            area_blocks.append(bytes(block))
+
+    common_block = bytearray()
+    encoder.encode(common, common_block)
+
+    area_index = bytearray(_UINT.pack(len(area_entries)))
+    position = 0
+    for (world_index, name_id, asset_id), block in zip(area_entries, area_blocks):
+        area_index += _AREA_ENTRY.pack(world_index, name_id, asset_id, position, len(block))
+        position += len(block)
+
+    sections = [
+        _table(value.encode("utf-8") for value in encoder.strings),
+        _table(encoder.requirements),
+        bytes(common_block),
+        bytes(area_index),
+        b"".join(area_blocks),
+    ]
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    return b"".join([_HEADER.pack(MAGIC, current_format_version, *offsets)] + sections)
+
+
+def encode_file_path(data: Dict, output_path: Path):
+    output_path.write_bytes(encode(data))
+
+
+class AreaEntry(NamedTuple):
+    world_index: int
+    name: str
+    asset_id: int
+    offset: int
+    size: int
+
+
+class CompiledDatabase:
+    """
+    Reads a database in the precompiled format. Strings, requirements and areas are only decoded when first used,
+    so getting the resource database or a single area doesn't decode the entire game.
+
+    The returned data is shared between calls, so it must not be modified.
+    """
+    _buffer: Any
+    _string_offsets: array
+    _string_data: int
+    _strings: List[Optional[str]]
+    _requirement_offsets: array
+    _requirement_data: int
+    _requirements: List[Optional[dict]]
+    _common: Optional[dict] = None
+    _areas: List[Optional[dict]]
+    area_entries: List[AreaEntry]
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+        magic, version, strings, requirements, common, area_index, areas = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Data is not a compiled game database")
+        if version != current_format_version:
+            raise ValueError(f"Unsupported compiled database version {version}, expected {current_format_version}")
+
+        self._string_offsets, self._string_data = self._read_table(strings)
+        self._strings = [None] * (len(self._string_offsets) - 1)
+        self._requirement_offsets, self._requirement_data = self._read_table(requirements)
+        self._requirements = [None] * (len(self._requirement_offsets) - 1)
+        self._common_offset = common
+
+        count = _UINT.unpack_from(buffer, area_index)[0]
+        self.area_entries = []
+        for world_index, name_id, asset_id, offset, size in _AREA_ENTRY.iter_unpack(
+                buffer[area_index + _UINT.size:area_index + _UINT.size + count * _AREA_ENTRY.size]):
+            self.area_entries.append(AreaEntry(world_index, self.string(name_id), asset_id, areas + offset, size))
+        self._areas = [None] * count
+
+    @classmethod
+    def open(cls, path: Path) -> "CompiledDatabase":
+        with path.open("rb") as database_file:
+            return cls(mmap.mmap(database_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _read_table(self, offset: int) -> Tuple[array, int]:
+        count = _UINT.unpack_from(self._buffer, offset)[0]
+        start = offset + _UINT.size
+        offsets = array("I")
+        offsets.frombytes(self._buffer[start:start + (count + 1) * offsets.itemsize])
+        return offsets, start + (count + 1) * offsets.itemsize
+
+    def string(self, string_id: int) -> str:
+        result = self._strings[string_id]
+        if result is None:
+            start = self._string_data + self._string_offsets[string_id]
+            end = self._string_data + self._string_offsets[string_id + 1]
+            result = self._buffer[start:end].decode("utf-8")
+            self._strings[string_id] = result
+        return result
+
+    def requirement(self, requirement_id: int) -> dict:
+        result = self._requirements[requirement_id]
+        if result is None:
+            result = self._read_value(self._requirement_data + self._requirement_offsets[requirement_id])[0]
+            self._requirements[requirement_id] = result
+        return result
+
+    def _read_value(self, offset: int) -> Tuple[Any, int]:
+        buffer = self._buffer
+        tag = buffer[offset]
+        offset += 1
+
+        if tag == _TAG_STRING:
+            return self.string(_UINT.unpack_from(buffer, offset)[0]), offset + 4
+
+        elif tag == _TAG_DICT:
+            count = _UINT.unpack_from(buffer, offset)[0]
+            offset += 4
+            result = {}
+            for _ in range(count):
+                key = self.string(_UINT.unpack_from(buffer, offset)[0])
+                result[key], offset = self._read_value(offset + 4)
+            return result, offset
+
+        elif tag == _TAG_LIST:
+            count = _UINT.unpack_from(buffer, offset)[0]
+            offset += 4
+            result = []
+            for _ in range(count):
+                item, offset = self._read_value(offset)
+                result.append(item)
+            return result, offset
+
+        elif tag == _TAG_REQUIREMENT:
+            return self.requirement(_UINT.unpack_from(buffer, offset)[0]), offset + 4
+
+        elif tag == _TAG_UINT64:
+            return _UINT64.unpack_from(buffer, offset)[0], offset + 8
+
+        elif tag == _TAG_INT:
+            return _INT.unpack_from(buffer, offset)[0], offset + 8
+
+        elif tag == _TAG_FLOAT:
+            return _FLOAT.unpack_from(buffer, offset)[0], offset + 8
+
+        elif tag == _TAG_NONE:
+            return None, offset
+
+        elif tag == _TAG_TRUE:
+            return True, offset
+
+        elif tag == _TAG_FALSE:
+            return False, offset
+
+        raise ValueError(f"Unknown tag {tag} at offset {offset - 1}")
+
+    @property
+    def common(self) -> dict:
+        """
+        All the data except for the areas. Each world has an empty list of areas.
+        """
+        if self._common is None:
+            self._common = self._read_value(self._common_offset)[0]
+        return self._common
+
+    def resource_database_data(self) -> dict:
+        return self.common["resource_database"]
+
+    def area_data(self, area_index: int) -> dict:
+        result = self._areas[area_index]
+        if result is None:
+            result = self._read_value(self.area_entries[area_index].offset)[0]
+            self._areas[area_index] = result
+        return result
+
+    def find_area(self, world_name: str, area_name: str) -> int:
+        """
+        Gets the index of the area with the given name, in the world with the given name.
+        :raises KeyError: if there's no such area.
+        """
+        worlds = self.common["worlds"]
+        for i, entry in enumerate(self.area_entries):
+            if entry.name == area_name and worlds[entry.world_index]["name"] == world_name:
+                return i
+        raise KeyError(f"{world_name}/{area_name}")
+
+    def connected_areas(self, area_index: int) -> Set[int]:
+        """
+        Gets the given area and every area its docks and teleporters lead to.
+        """
+        worlds = self.common["worlds"]
+        world_index = self.area_entries[area_index].world_index
+        targets = set()
+
+        for node in self.area_data(area_index)["nodes"]:
+            if node["node_type"] == "dock":
+                targets.add((world_index, node["connected_area_asset_id"]))
+            elif node["node_type"] == "teleporter":
+                for i, world in enumerate(worlds):
+                    if world["asset_id"] == node["destination_world_asset_id"]:
+                        targets.add((i, node["destination_area_asset_id"]))
+
+        result = {area_index}
+        for i, entry in enumerate(self.area_entries):
+            if (entry.world_index, entry.asset_id) in targets:
+                result.add(i)
+        return result
+
+    def data_with_areas(self, area_indices: Iterable[int]) -> dict:
+        """
+        Creates the data of the database, but with only the given areas.
+        """
+        result = dict(self.common)
+        result["worlds"] = [dict(world) for world in result["worlds"]]
+        for world in result["worlds"]:
+            world["areas"] = []
+
+        for i in sorted(area_indices):
+            result["worlds"][self.area_entries[i].world_index]["areas"].append(self.area_data(i))
+
+        return result
+
+    def as_dict(self) -> dict:
+        """
+        Decodes the entire database, in the same format as the JSON.
+        """
+        return self.data_with_areas(range(len(self.area_entries)))
+
+
+def decode_file_path(path: Path) -> Dict:
+    return CompiledDatabase.open(path).as_dict()
@@ -1,20 +1,44 @@
 import functools
 import json
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Optional
 
 from randovania import get_data_path
 from randovania.games.game import RandovaniaGame
 from randovania.games.prime.binary_data import decode_file_path
+from randovania.games.prime.compiled_data import CompiledDatabase
+
+
+def _json_path(game: RandovaniaGame) -> Path:
+    return get_data_path().joinpath("json_data", f"{game.value}.json")
+
+
+def compiled_path(game: RandovaniaGame) -> Path:
+    return get_data_path().joinpath("binary_data", f"{game.value}.rdvdb")
+
+
+@functools.lru_cache()
+def read_compiled_database(game: RandovaniaGame) -> Optional[CompiledDatabase]:
+    """
+    Opens the compiled database of the given game, unless it's missing or there's a JSON database to use instead.
+    """
+    path = compiled_path(game)
+    if _json_path(game).exists() or not path.exists():
+        return None
+    return CompiledDatabase.open(path)
 
 
 @functools.lru_cache()
 def read_json_then_binary(game: RandovaniaGame) -> Tuple[Path, dict]:
-    json_path = get_data_path().joinpath("json_data", f"{game.value}.json")
+    json_path = _json_path(game)
     if json_path.exists():
         with json_path.open("r") as open_file:
             return json_path, json.load(open_file)
 
+    compiled_database = read_compiled_database(game)
+    if compiled_database is not None:
+        return compiled_path(game), compiled_database.as_dict()
+
     binary_path = get_data_path().joinpath("binary_data", f"{game.value}.bin")
     return binary_path, decode_file_path(binary_path)
 
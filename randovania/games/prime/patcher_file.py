@@ -2,7 +2,7 @@ from random import Random
 from typing import Dict, List, Iterator
 
 import randovania
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.assignment import GateAssignment, PickupTarget
 from randovania.game_description.default_database import default_prime2_memo_data
@@ -617,7 +617,7 @@ def create_patcher_file(description: LayoutDescription,
     patches = description.all_patches[players_config.player_index]
     rng = Random(description.permalink.seed_number)
 
-    game = data_reader.decode_data(configuration.game_data)
+    game = default_database.decode_data_with_cache(configuration.game_data)
     pickup_count = game.world_list.num_pickup_nodes
     useless_target = PickupTarget(pickup_creator.create_useless_pickup(game.resource_database),
                                   players_config.player_index)
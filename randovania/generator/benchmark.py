@@ -0,0 +1,218 @@
+import dataclasses
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Iterable
+
+from randovania import VERSION
+from randovania.generator import generator
+from randovania.interface_common.preset_manager import PresetManager
+from randovania.layout.permalink import Permalink
+from randovania.resolver import resolver, counters
+
+CURRENT_REPORT_SCHEMA_VERSION = 1
+DEFAULT_SEED_NUMBERS = (1000, 1001, 1002)
+
+# Timings and memory change between runs even with the same code, so only bigger differences are regressions
+DEFAULT_THRESHOLD = 0.25
+
+_COMPARED_FIELDS = (
+    "generation_seconds",
+    "resolve_seconds",
+    "peak_rss_kb",
+    "generation_reach_computations",
+    "resolve_reach_computations",
+    "retcon_steps",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkCase:
+    preset_name: str
+    permalink: Permalink
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.preset_name, self.permalink.seed_number
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkResult:
+    preset_name: str
+    seed_number: int
+    permalink: str
+    generation_seconds: Optional[float]
+    resolve_seconds: Optional[float]
+    peak_rss_kb: Optional[int]
+    generation_reach_computations: int
+    resolve_reach_computations: int
+    retcon_steps: int
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.preset_name, self.seed_number
+
+    @property
+    def as_json(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_json(cls, value: dict) -> "BenchmarkResult":
+        return cls(**value)
+
+
+def benchmark_corpus(preset_names: Optional[Iterable[str]] = None,
+                     seed_numbers: Iterable[int] = DEFAULT_SEED_NUMBERS,
+                     ) -> List[BenchmarkCase]:
+    """
+    Creates the permalinks for each of the given seed numbers and each bundled preset.
+    :param preset_names: Only use the bundled presets with these names. All of them if None.
+    :param seed_numbers:
+    :return:
+    """
+    presets = PresetManager(None).included_presets
+    if preset_names is not None:
+        preset_names = set(preset_names)
+        missing = preset_names - {preset.name for preset in presets}
+        if missing:
+            raise ValueError("Unknown presets: {}".format(", ".join(sorted(missing))))
+        presets = [preset for preset in presets if preset.name in preset_names]
+
+    return [
+        BenchmarkCase(preset.name, Permalink(seed_number=seed_number, spoiler=True,
+                                             presets={0: preset.get_preset()}))
+        for preset in presets
+        for seed_number in seed_numbers
+    ]
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """
+    The peak resident set size of the current process, or None if it's not available in this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset // 1024
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # macOS reports it in bytes
+        peak //= 1024
+    return peak
+
+
+def run_benchmark_case(case: BenchmarkCase, timeout: Optional[int], resolve: bool = True) -> BenchmarkResult:
+    """
+    Generates the case's permalink and then resolves the result, measuring both.
+    Peak RSS is for the entire process, so each case should run in a new process for it to be meaningful.
+    """
+    generation_seconds = None
+    resolve_seconds = None
+    generation_counters = {}
+    resolve_counters = {}
+    error = None
+
+    try:
+        counters.reset()
+        start_time = time.perf_counter()
+        description = generator.generate_description(permalink=case.permalink, status_update=None,
+                                                     validate_after_generation=False, timeout=timeout)
+        generation_seconds = time.perf_counter() - start_time
+        generation_counters = counters.snapshot()
+
+        if resolve:
+            counters.reset()
+            start_time = time.perf_counter()
+            final_state = resolver.resolve(configuration=case.permalink.presets[0].configuration,
+                                           patches=description.all_patches[0])
+            resolve_seconds = time.perf_counter() - start_time
+            resolve_counters = counters.snapshot()
+            if final_state is None:
+                error = "Generated seed was considered impossible by the solver"
+
+    except Exception as e:
+        error = "{}: {}".format(type(e).__name__, e)
+
+    return BenchmarkResult(
+        preset_name=case.preset_name,
+        seed_number=case.permalink.seed_number,
+        permalink=case.permalink.as_base64_str,
+        generation_seconds=generation_seconds,
+        resolve_seconds=resolve_seconds,
+        peak_rss_kb=_peak_rss_kb(),
+        generation_reach_computations=(generation_counters.get(counters.GENERATOR_REACH, 0)
+                                       + generation_counters.get(counters.RESOLVER_REACH, 0)),
+        resolve_reach_computations=resolve_counters.get(counters.RESOLVER_REACH, 0),
+        retcon_steps=generation_counters.get(counters.RETCON_STEP, 0),
+        error=error,
+    )
+
+
+def create_report(results: List[BenchmarkResult]) -> dict:
+    return {
+        "schema_version": CURRENT_REPORT_SCHEMA_VERSION,
+        "randovania_version": VERSION,
+        "results": [result.as_json for result in results],
+    }
+
+
+def read_report(report: dict) -> List[BenchmarkResult]:
+    version = report.get("schema_version")
+    if version != CURRENT_REPORT_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported benchmark report version: {version}")
+
+    return [BenchmarkResult.from_json(result) for result in report["results"]]
+
+
+def write_report(path: Path, results: List[BenchmarkResult]):
+    with path.open("w") as report_file:
+        json.dump(create_report(results), report_file, indent=4)
+
+
+def read_report_file(path: Path) -> List[BenchmarkResult]:
+    with path.open() as report_file:
+        return read_report(json.load(report_file))
+
+
+def compare_results(results: List[BenchmarkResult],
+                    baseline: List[BenchmarkResult],
+                    threshold: float = DEFAULT_THRESHOLD,
+                    ) -> List[str]:
+    """
+    Compares results against a baseline of the same corpus.
+    :param results:
+    :param baseline:
+    :param threshold: How much bigger than the baseline a value can be, as a fraction of it.
+    :return: A description of each regression found.
+    """
+    baseline_by_key: Dict[Tuple[str, int], BenchmarkResult] = {result.key: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        name = "{} (seed {})".format(result.preset_name, result.seed_number)
+        expected = baseline_by_key.get(result.key)
+        if expected is None:
+            continue
+
+        if result.error is not None:
+            if expected.error is None:
+                regressions.append(f"{name}: failed with {result.error}")
+            continue
+
+        for field in _COMPARED_FIELDS:
+            value = getattr(result, field)
+            expected_value = getattr(expected, field)
+            if value is None or expected_value is None:
+                continue
+
+            if value > expected_value * (1 + threshold):
+                regressions.append(f"{name}: {field} is {value}, baseline was {expected_value}")
+
+    return regressions
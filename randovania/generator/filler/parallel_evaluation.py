@@ -0,0 +1,169 @@
+import multiprocessing
+import weakref
+from multiprocessing.connection import Connection
+from typing import List, Tuple, Dict, Union
+
+from randovania.game_description.game_description import GameDescription
+from randovania.game_description.resources.pickup_entry import PickupEntry
+from randovania.generator.filler.retcon import PlayerState, Action, UncollectedState, FillerConfiguration
+from randovania.resolver.state import State
+
+# Nodes are sent as their index, as pickling them separately from their game creates copies
+EncodedAction = Union[int, PickupEntry]
+
+_open_evaluators: "weakref.WeakSet[ParallelActionEvaluator]" = weakref.WeakSet()
+
+
+def _encode_action(action: Action) -> EncodedAction:
+    if isinstance(action, PickupEntry):
+        return action
+    else:
+        return action.index
+
+
+def _decode_action(player_state: PlayerState, action: EncodedAction) -> Action:
+    if isinstance(action, PickupEntry):
+        return action
+    else:
+        return player_state.game.world_list.all_nodes[action]
+
+
+def _evaluation_worker(connection: Connection,
+                       players: List[Tuple[int, GameDescription, State, FillerConfiguration]],
+                       parent_connections: List[Connection],
+                       ):
+    """
+    Keeps a copy of every PlayerState, updated with the changes received with each request.
+    Stops when receiving None or when the parent's end of the pipe is closed.
+    """
+    # When forked, the parent's end of every pipe created so far is inherited. These must be closed, otherwise
+    # the pipes are never closed when the parent dies.
+    for parent_connection in parent_connections:
+        parent_connection.close()
+
+    player_states = {
+        index: PlayerState(index, game, initial_state, [], configuration)
+        for index, game, initial_state, configuration in players
+    }
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        player_index, changes, actions = request
+        try:
+            player_state = player_states[player_index]
+            for change, argument in changes:
+                player_state.change_reach(change, argument)
+
+            current_uncollected = UncollectedState.from_reach(player_state.reach)
+            result = [
+                player_state.calculate_action_weight(_decode_action(player_state, action), current_uncollected)
+                for action in actions
+            ]
+
+        except Exception as e:
+            result = e
+
+        try:
+            connection.send(result)
+        except (BrokenPipeError, OSError):
+            break
+
+
+class ParallelActionEvaluator:
+    """
+    Calculates the weights of potential actions in multiple processes.
+
+    Each worker creates its own PlayerStates and is only sent the changes to the reach it hasn't seen yet,
+    so it's always evaluating actions with the same reach as the main process. Actions are split between
+    workers in order, so results are the same regardless of the number of workers.
+    """
+    _workers: List[Tuple[multiprocessing.Process, Connection]]
+    _changes_sent: List[Dict[int, int]]
+
+    def __init__(self, player_states: List[PlayerState], worker_count: int):
+        players = [
+            (player_state.index, player_state.game, player_state.initial_state, player_state.configuration)
+            for player_state in player_states
+        ]
+
+        self._workers = []
+        self._changes_sent = []
+        for _ in range(worker_count):
+            receiving_connection, worker_connection = multiprocessing.Pipe()
+            parent_connections = [connection for _, connection in self._workers] + [receiving_connection]
+            process = multiprocessing.Process(
+                target=_evaluation_worker,
+                args=(worker_connection, players, parent_connections),
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close()
+            self._workers.append((process, receiving_connection))
+            self._changes_sent.append({player_state.index: 0 for player_state in player_states})
+
+        _open_evaluators.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        workers, self._workers = self._workers, []
+        _open_evaluators.discard(self)
+
+        for process, connection in workers:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+
+    def __call__(self, player_state: PlayerState, actions: List[Action]) -> List[float]:
+        chunk_size, remainder = divmod(len(actions), len(self._workers))
+        requests = []
+
+        start = 0
+        for i, (_, connection) in enumerate(self._workers):
+            end = start + chunk_size + (1 if i < remainder else 0)
+            chunk = actions[start:end]
+            start = end
+            if not chunk:
+                continue
+
+            changes_sent = self._changes_sent[i][player_state.index]
+            connection.send((
+                player_state.index,
+                player_state.reach_changes[changes_sent:],
+                [_encode_action(action) for action in chunk],
+            ))
+            self._changes_sent[i][player_state.index] = len(player_state.reach_changes)
+            requests.append(connection)
+
+        results = [connection.recv() for connection in requests]
+        weights = []
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+            weights.extend(result)
+
+        return weights
+
+
+def close_all_evaluators():
+    """
+    Closes every ParallelActionEvaluator of this process that's still open. Used when generation is cancelled, as it
+    runs in a thread that can't be interrupted.
+    """
+    for evaluator in list(_open_evaluators):
+        evaluator.close()
@@ -3,9 +3,10 @@ import dataclasses
 import itertools
 import math
 import pprint
+from enum import Enum
 from random import Random
 from typing import Tuple, Iterator, NamedTuple, Set, AbstractSet, Union, Dict, \
-    DefaultDict, Mapping, FrozenSet, Callable, List, TypeVar, Any, Optional
+    DefaultDict, Mapping, FrozenSet, Callable, List, TypeVar, Any, Optional, ContextManager
 
 from randovania.game_description.assignment import PickupTarget
 from randovania.game_description.game_description import calculate_interesting_resources, GameDescription
@@ -22,9 +23,9 @@ from randovania.game_description.world_list import WorldList
 from randovania.generator.filler.filler_library import UnableToGenerate, should_have_hint
 from randovania.generator.generator_reach import GeneratorReach, collectable_resource_nodes, \
     advance_reach_with_possible_unsafe_resources, reach_with_all_safe_resources, \
-    get_collectable_resource_nodes_of_reach, advance_to_with_reach_copy
+    get_collectable_resource_nodes_of_reach, advance_to_with_reach_transaction
 from randovania.layout.available_locations import RandomizationMode
-from randovania.resolver import debug
+from randovania.resolver import debug, counters
 from randovania.resolver.random_lib import select_element_with_weight
 from randovania.resolver.state import State
 
@@ -85,11 +86,50 @@ def find_node_with_resource(resource: ResourceInfo,
 
 def _calculate_reach_for_progression(reach: GeneratorReach,
                                      progression: PickupEntry,
-                                     ) -> GeneratorReach:
-    return advance_to_with_reach_copy(reach, reach.state.assign_pickup_resources(progression))
+                                     ) -> ContextManager[GeneratorReach]:
+    return advance_to_with_reach_transaction(reach, reach.state.assign_pickup_resources(progression))
 
 
 Action = Union[ResourceNode, PickupEntry]
+ActionWeightEvaluator = Callable[["PlayerState", List[Action]], List[float]]
+
+
+class ReachChange(Enum):
+    """
+    Changes done to the reach of a PlayerState. These are recorded, so the same reach can be recreated elsewhere.
+    """
+    ASSIGN_PICKUP = "assign-pickup"
+    ASSIGN_HINT = "assign-hint"
+    COLLECT_PICKUP = "collect-pickup"
+    STARTING_ITEM = "starting-item"
+    ACT_ON_NODE = "act-on-node"
+    ADVANCE_WITH_UNSAFE = "advance-with-unsafe"
+
+
+def _apply_reach_change(reach: GeneratorReach, change: ReachChange, argument: Any) -> GeneratorReach:
+    if change == ReachChange.ASSIGN_PICKUP:
+        reach.state.patches = reach.state.patches.assign_new_pickups([argument])
+
+    elif change == ReachChange.ASSIGN_HINT:
+        logbook_asset, hint = argument
+        reach.state.patches = reach.state.patches.assign_hint(logbook_asset, hint)
+
+    elif change == ReachChange.COLLECT_PICKUP:
+        reach.advance_to(reach.state.assign_pickup_resources(argument))
+
+    elif change == ReachChange.STARTING_ITEM:
+        reach.advance_to(reach.state.assign_pickup_to_starting_items(argument))
+
+    elif change == ReachChange.ACT_ON_NODE:
+        reach.act_on(reach.game.world_list.all_nodes[argument])
+
+    elif change == ReachChange.ADVANCE_WITH_UNSAFE:
+        reach = advance_reach_with_possible_unsafe_resources(reach)
+
+    else:
+        raise ValueError(f"Unknown change: {change}")
+
+    return reach
 
 
 def _resources_in_pickup(pickup: PickupEntry, current_resources: CurrentResources) -> FrozenSet[ResourceInfo]:
@@ -141,6 +181,8 @@ def build_available_indices(world_list: WorldList, configuration: FillerConfigur
 class PlayerState:
     index: int
     game: GameDescription
+    initial_state: State
+    reach_changes: List[Tuple[ReachChange, Any]]
     pickups_left: List[PickupEntry]
     configuration: FillerConfiguration
     pickup_index_seen_count: DefaultDict[PickupIndex, int]
@@ -159,7 +201,9 @@ class PlayerState:
                  ):
         self.index = index
         self.game = game
+        self.initial_state = initial_state.copy()
         self.reach = advance_reach_with_possible_unsafe_resources(reach_with_all_safe_resources(game, initial_state))
+        self.reach_changes = []
         self.pickups_left = pickups_left
         self.configuration = configuration
 
@@ -212,15 +256,27 @@ class PlayerState:
         result.extend(uncollected_resource_nodes)
         self.potential_actions = result
 
+    def calculate_action_weight(self, action: Action, current_uncollected: UncollectedState) -> float:
+        if isinstance(action, PickupEntry):
+            with _calculate_reach_for_progression(self.reach, action) as potential_reach:
+                base_weight = _calculate_weights_for(potential_reach, current_uncollected, action.name)
+            return base_weight * action.probability_multiplier + action.probability_offset
+
+        else:
+            with advance_to_with_reach_transaction(self.reach,
+                                                   self.reach.state.act_on_node(action)) as potential_reach:
+                return _calculate_weights_for(potential_reach, current_uncollected, action.name)
+
     def weighted_potential_actions(self, status_update: Callable[[str], None],
+                                   evaluator: Optional[ActionWeightEvaluator] = None,
                                    ) -> Dict[Action, float]:
         """
         Weights all potential actions based on current criteria.
         :param status_update:
+        :param evaluator: If set, used to calculate the weights instead of doing it here.
         :return:
         """
         actions_weights: Dict[Action, float] = {}
-        current_uncollected = UncollectedState.from_reach(self.reach)
 
         total_options = len(self.potential_actions)
         options_considered = 0
@@ -230,21 +286,15 @@ class PlayerState:
             options_considered += 1
             status_update("Checked {} of {} options.".format(options_considered, total_options))
 
-        for action in self.potential_actions:
-            if isinstance(action, PickupEntry):
-                base_weight = _calculate_weights_for(_calculate_reach_for_progression(self.reach, action),
-                                                     current_uncollected,
-                                                     action.name)
-                weight = base_weight * action.probability_multiplier + action.probability_offset
-
-            else:
-                weight = _calculate_weights_for(
-                    advance_to_with_reach_copy(self.reach, self.reach.state.act_on_node(action)),
-                    current_uncollected,
-                    action.name)
+        if evaluator is not None:
+            status_update("Checking {} options.".format(total_options))
+            actions_weights.update(zip(self.potential_actions, evaluator(self, self.potential_actions)))
 
-            actions_weights[action] = weight
-            update_for_option()
+        else:
+            current_uncollected = UncollectedState.from_reach(self.reach)
+            for action in self.potential_actions:
+                actions_weights[action] = self.calculate_action_weight(action, current_uncollected)
+                update_for_option()
 
         if debug.debug_level() > 1:
             for action, weight in actions_weights.items():
@@ -255,11 +305,13 @@ class PlayerState:
     def victory_condition_satisfied(self):
         return self.game.victory_condition.satisfied(self.reach.state.resources, self.reach.state.energy)
 
+    def change_reach(self, change: ReachChange, argument: Any = None):
+        self.reach_changes.append((change, argument))
+        self.reach = _apply_reach_change(self.reach, change, argument)
+
     def assign_pickup(self, pickup_index: PickupIndex, target: PickupTarget):
         self.num_assigned_pickups += 1
-        self.reach.state.patches = self.reach.state.patches.assign_new_pickups([
-            (pickup_index, target),
-        ])
+        self.change_reach(ReachChange.ASSIGN_PICKUP, (pickup_index, target))
 
 
 def _get_next_player(rng: Random, player_states: List[PlayerState]) -> Optional[PlayerState]:
@@ -302,12 +354,14 @@ def _get_next_player(rng: Random, player_states: List[PlayerState]) -> Optional[
 def retcon_playthrough_filler(rng: Random,
                               player_states: List[PlayerState],
                               status_update: Callable[[str], None],
+                              evaluator: Optional[ActionWeightEvaluator] = None,
                               ) -> Tuple[Dict[PlayerState, GamePatches], Tuple[str, ...]]:
     """
     Runs the retcon logic.
     :param rng:
     :param player_states:
     :param status_update:
+    :param evaluator: Optional replacement for calculating the weights of each potential action.
     :return: A GamePatches for each player and a sequence of placed items.
     """
     debug.debug_print("{}\nRetcon filler started with major items:\n{}".format(
@@ -338,7 +392,9 @@ def retcon_playthrough_filler(rng: Random,
         if current_player is None:
             break
 
-        weighted_actions = current_player.weighted_potential_actions(action_report)
+        counters.increment(counters.RETCON_STEP)
+
+        weighted_actions = current_player.weighted_potential_actions(action_report, evaluator)
         try:
             action = select_element_with_weight(weighted_actions, rng=rng)
         except StopIteration:
@@ -365,9 +421,9 @@ def retcon_playthrough_filler(rng: Random,
             debug_print_collect_event(action, current_player.game)
 
             # This action is potentially dangerous. Use `act_on` to remove invalid paths
-            current_player.reach.act_on(action)
+            current_player.change_reach(ReachChange.ACT_ON_NODE, action.index)
 
-        current_player.reach = advance_reach_with_possible_unsafe_resources(current_player.reach)
+        current_player.change_reach(ReachChange.ADVANCE_WITH_UNSAFE)
         current_player.update_for_new_state()
 
     all_patches = {player_state: player_state.reach.state.patches for player_state in player_states}
@@ -405,11 +461,11 @@ def _assign_pickup_somewhere(action: PickupEntry,
             index_owner_state.scan_asset_initial_pickups,
         )
         if hint_location is not None:
-            index_owner_state.reach.state.patches = index_owner_state.reach.state.patches.assign_hint(
-                hint_location, Hint(HintType.LOCATION, None, pickup_index))
+            index_owner_state.change_reach(ReachChange.ASSIGN_HINT,
+                                           (hint_location, Hint(HintType.LOCATION, None, pickup_index)))
 
         if pickup_index in index_owner_state.reach.state.collected_pickup_indices:
-            current_player.reach.advance_to(current_player.reach.state.assign_pickup_resources(action))
+            current_player.change_reach(ReachChange.COLLECT_PICKUP, action)
         else:
             # FIXME: isn't that condition always true?
             pass
@@ -427,7 +483,7 @@ def _assign_pickup_somewhere(action: PickupEntry,
         spoiler_entry = f"{action.name} as starting item"
         if len(player_states) > 1:
             spoiler_entry += f" for Player {current_player.index + 1}"
-        current_player.reach.advance_to(current_player.reach.state.assign_pickup_to_starting_items(action))
+        current_player.change_reach(ReachChange.STARTING_ITEM, action)
 
     return spoiler_entry
 
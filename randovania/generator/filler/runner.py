@@ -17,6 +17,7 @@ from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.world_list import WorldList
 from randovania.games.game import RandovaniaGame
 from randovania.generator.filler.filler_library import should_have_hint
+from randovania.generator.filler.parallel_evaluation import ParallelActionEvaluator
 from randovania.generator.filler.retcon import retcon_playthrough_filler, FillerConfiguration, PlayerState
 from randovania.layout.echoes_configuration import EchoesConfiguration
 from randovania.resolver import bootstrap, debug, random_lib
@@ -311,6 +312,7 @@ class FillerResults:
 def run_filler(rng: Random,
                player_pools: Dict[int, PlayerPool],
                status_update: Callable[[str], None],
+               evaluation_workers: int = 0,
                ) -> FillerResults:
     """
     Runs the filler logic for the given configuration and item pool.
@@ -320,6 +322,7 @@ def run_filler(rng: Random,
     :param player_pools:
     :param rng:
     :param status_update:
+    :param evaluation_workers: If above 0, the weights of potential actions are calculated in this many processes.
     :return:
     """
 
@@ -349,7 +352,13 @@ def run_filler(rng: Random,
             ),
         ))
 
-    filler_result, actions_log = retcon_playthrough_filler(rng, player_states, status_update=status_update)
+    if evaluation_workers > 0:
+        status_update(f"Starting {evaluation_workers} workers")
+        with ParallelActionEvaluator(player_states, evaluation_workers) as evaluator:
+            filler_result, actions_log = retcon_playthrough_filler(rng, player_states, status_update=status_update,
+                                                                   evaluator=evaluator)
+    else:
+        filler_result, actions_log = retcon_playthrough_filler(rng, player_states, status_update=status_update)
 
     results = {}
 
@@ -6,7 +6,7 @@ from typing import Iterator, Optional, Callable, List, Dict
 import tenacity
 
 from randovania import VERSION
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.assignment import PickupAssignment, PickupTarget
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.game_patches import GamePatches
@@ -37,6 +37,7 @@ def generate_description(permalink: Permalink,
                          validate_after_generation: bool,
                          timeout: Optional[int] = 600,
                          attempts: int = 15,
+                         evaluation_workers: int = 0,
                          ) -> LayoutDescription:
     """
     Creates a LayoutDescription for the given Permalink.
@@ -45,6 +46,7 @@ def generate_description(permalink: Permalink,
     :param validate_after_generation:
     :param timeout: Abort generation after this many seconds.
     :param attempts: Attempt this many generations.
+    :param evaluation_workers: Use this many processes for evaluating actions during generation. 0 to disable.
     :return:
     """
     if status_update is None:
@@ -54,6 +56,7 @@ def generate_description(permalink: Permalink,
         "permalink": permalink,
         "status_update": status_update,
         "attempts": attempts,
+        "evaluation_workers": evaluation_workers,
     }
 
     def create_failure(message: str):
@@ -135,10 +138,13 @@ def _distribute_remaining_items(rng: Random,
 def _async_create_description(permalink: Permalink,
                               status_update: Callable[[str], None],
                               attempts: int,
+                              evaluation_workers: int = 0,
                               ) -> LayoutDescription:
     """
     :param permalink:
     :param status_update:
+    :param attempts:
+    :param evaluation_workers:
     :return:
     """
     rng = Random(permalink.as_bytes)
@@ -154,7 +160,7 @@ def _async_create_description(permalink: Permalink,
         reraise=True
     )
 
-    filler_results = retrying(_create_pools_and_fill, rng, presets, status_update)
+    filler_results = retrying(_create_pools_and_fill, rng, presets, status_update, evaluation_workers)
     all_patches = _distribute_remaining_items(rng, filler_results.player_results)
     return LayoutDescription(
         permalink=permalink,
@@ -165,7 +171,7 @@ def _async_create_description(permalink: Permalink,
 
 
 def create_player_pool(rng: Random, configuration: EchoesConfiguration, player_index: int) -> PlayerPool:
-    game = data_reader.decode_data(configuration.game_data)
+    game = default_database.decode_data_with_cache(configuration.game_data)
 
     base_patches = dataclasses.replace(base_patches_factory.create_base_patches(configuration, rng, game),
                                        player_index=player_index)
@@ -189,12 +195,14 @@ def create_player_pool(rng: Random, configuration: EchoesConfiguration, player_i
 def _create_pools_and_fill(rng: Random,
                            presets: Dict[int, Preset],
                            status_update: Callable[[str], None],
+                           evaluation_workers: int = 0,
                            ) -> FillerResults:
     """
     Runs the rng-dependant parts of the generation, with retries
     :param rng:
     :param presets:
     :param status_update:
+    :param evaluation_workers:
     :return:
     """
     player_pools: Dict[int, PlayerPool] = {}
@@ -206,7 +214,7 @@ def _create_pools_and_fill(rng: Random,
     for player_pool in player_pools.values():
         _validate_item_pool_size(player_pool.pickups, player_pool.game)
 
-    return run_filler(rng, player_pools, status_update)
+    return run_filler(rng, player_pools, status_update, evaluation_workers)
 
 
 def _assign_remaining_items(rng: Random,
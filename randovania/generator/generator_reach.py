@@ -1,12 +1,16 @@
+import contextlib
 import copy
 from typing import Iterator, Optional, Set, Dict, List, NamedTuple, Tuple
 
-import networkx
-
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import Node, ResourceNode, PickupNode
 from randovania.game_description.requirements import RequirementSet, Requirement, RequirementAnd, \
     ResourceRequirement
+from randovania.game_description.resources.resource_info import ResourceInfo
+from randovania.game_description.resources.resource_vector import ResourceVector
+from randovania.generator.incremental_reachability import IncrementalReachability
+from randovania.generator.index_graph import IndexGraph
+from randovania.resolver import counters
 from randovania.resolver.state import State
 
 
@@ -15,16 +19,16 @@ class GraphPath(NamedTuple):
     node: Node
     requirement: Requirement
 
-    def is_in_graph(self, digraph: networkx.DiGraph):
+    def is_in_graph(self, digraph: IndexGraph):
         if self.previous_node is None:
             return False
         else:
-            return (self.previous_node.index, self.node.index) in digraph.edges
+            return digraph.has_edge(self.previous_node.index, self.node.index)
 
-    def add_to_graph(self, digraph: networkx.DiGraph):
+    def add_to_graph(self, digraph: IndexGraph):
         digraph.add_node(self.node.index)
         if self.previous_node is not None:
-            digraph.add_edge(self.previous_node.index, self.node.index, requirement=self.requirement)
+            digraph.add_edge(self.previous_node.index, self.node.index, self.requirement)
 
 
 def filter_resource_nodes(nodes: Iterator[Node]) -> Iterator[ResourceNode]:
@@ -60,13 +64,19 @@ def filter_out_dangerous_actions(resource_nodes: Iterator[ResourceNode],
 
 
 class GeneratorReach:
-    _digraph: networkx.DiGraph
+    _digraph: IndexGraph
     _state: State
     _game: GameDescription
-    _reachable_paths: Optional[Dict[int, List[Node]]]
     _reachable_costs: Optional[Dict[int, int]]
+    _incremental: bool
+    _reachability: Optional[IncrementalReachability]
     _node_reachable_cache: Dict[int, bool]
-    _unreachable_paths: Dict[Tuple[Node, Node], Requirement]
+    _unreachable_paths: Dict[Tuple[int, int], Tuple[int, Requirement]]
+    _unreachable_paths_added: int
+    _unreachable_by_resource: Dict[ResourceInfo, Set[Tuple[int, int]]]
+    _unreachable_with_damage: Set[Tuple[int, int]]
+    _checked_resources: ResourceVector
+    _checked_energy: int
     _safe_nodes: Optional[Set[Node]]
     _is_node_safe_cache: Dict[Node, bool]
 
@@ -74,11 +84,19 @@ class GeneratorReach:
         reach = GeneratorReach(
             self._game,
             self._state,
-            self._digraph.copy()
+            self._digraph.copy(),
+            self._incremental,
         )
         reach._unreachable_paths = copy.copy(self._unreachable_paths)
-        reach._reachable_paths = self._reachable_paths
+        reach._unreachable_paths_added = self._unreachable_paths_added
+        # The indices only ever grow and are filtered with _unreachable_paths, so they can be shared
+        reach._unreachable_by_resource = self._unreachable_by_resource
+        reach._unreachable_with_damage = self._unreachable_with_damage
+        reach._checked_resources = self._checked_resources
+        reach._checked_energy = self._checked_energy
         reach._reachable_costs = self._reachable_costs
+        if self._reachability is not None:
+            reach._reachability = self._reachability.copy()
         reach._safe_nodes = self._safe_nodes
 
         reach._node_reachable_cache = copy.copy(self._node_reachable_cache)
@@ -88,24 +106,79 @@ class GeneratorReach:
     def __init__(self,
                  game: GameDescription,
                  state: State,
-                 graph: networkx.DiGraph
+                 graph: IndexGraph,
+                 incremental: bool = True,
                  ):
+        """
+        :param game:
+        :param state:
+        :param graph:
+        :param incremental: If False, reachability is calculated from scratch with a 0/1 shortest path search whenever
+        the graph changes. Only useful as a reference for testing.
+        """
 
         self._game = game
         self._state = state
         self._digraph = graph
+        self._incremental = incremental
         self._unreachable_paths = {}
-        self._reachable_paths = None
+        self._unreachable_paths_added = 0
+        self._unreachable_by_resource = {}
+        self._unreachable_with_damage = set()
+        self._checked_resources = state.resources.copy()
+        self._checked_energy = state.energy
+        self._reachable_costs = None
+        self._reachability = None
         self._node_reachable_cache = {}
         self._is_node_safe_cache = {}
 
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator["GeneratorReach"]:
+        """
+        Undoes all changes made to this reach inside the with block once it exits.
+        Allows evaluating actions without copying the entire reach. Can be nested.
+        """
+        state = self._state
+        digraph = self._digraph
+        unreachable_paths = self._unreachable_paths
+        checked_resources = self._checked_resources
+        checked_energy = self._checked_energy
+        reachable_costs = self._reachable_costs
+        reachability = self._reachability
+        safe_nodes = self._safe_nodes
+        node_reachable_cache = self._node_reachable_cache
+        is_node_safe_cache = self._is_node_safe_cache
+
+        # The graph shares its data with the copy, so only nodes that are modified get copied.
+        # The caches are replaced as soon as the state changes, so anything added to them before is still valid.
+        self._digraph = digraph.copy()
+        self._unreachable_paths = copy.copy(unreachable_paths)
+        if reachability is not None:
+            self._reachability = reachability.copy()
+
+        try:
+            yield self
+
+        finally:
+            self._state = state
+            self._digraph = digraph
+            self._unreachable_paths = unreachable_paths
+            self._checked_resources = checked_resources
+            self._checked_energy = checked_energy
+            self._reachable_costs = reachable_costs
+            self._reachability = reachability
+            self._safe_nodes = safe_nodes
+            self._node_reachable_cache = node_reachable_cache
+            self._is_node_safe_cache = is_node_safe_cache
+
     @classmethod
     def reach_from_state(cls,
                          game: GameDescription,
                          initial_state: State,
+                         incremental: bool = True,
                          ) -> "GeneratorReach":
 
-        reach = cls(game, initial_state, networkx.DiGraph())
+        reach = cls(game, initial_state, IndexGraph(len(game.world_list.all_nodes)), incremental)
         reach._expand_graph([GraphPath(None, initial_state.node, Requirement.trivial())])
         return reach
 
@@ -128,7 +201,8 @@ class GeneratorReach:
 
     def _expand_graph(self, paths_to_check: List[GraphPath]):
         # print("!! _expand_graph", len(paths_to_check))
-        self._reachable_paths = None
+        self._reachable_costs = None
+        new_edges = []
         while paths_to_check:
             path = paths_to_check.pop(0)
 
@@ -136,15 +210,57 @@ class GeneratorReach:
                 continue
 
             path.add_to_graph(self._digraph)
+            if path.previous_node is not None:
+                new_edges.append((path.previous_node.index, path.node.index))
 
             for target_node, requirement, satisfied in self._potential_nodes_from(path.node):
                 if satisfied:
                     paths_to_check.append(GraphPath(path.node, target_node, requirement))
                 else:
-                    self._unreachable_paths[path.node, target_node] = requirement
+                    self._add_unreachable_path((path.node.index, target_node.index), requirement)
+
+        if self._reachability is not None:
+            self._reachability.add_edges(self._digraph, new_edges, self._can_advance_index)
 
         self._safe_nodes = None
 
+    def _add_unreachable_path(self, edge: Tuple[int, int], requirement: Requirement):
+        previous = self._unreachable_paths.get(edge)
+        if previous is not None:
+            # Keep the original position, like re-assigning a key of the dict does
+            order = previous[0]
+        else:
+            order = self._unreachable_paths_added
+            self._unreachable_paths_added += 1
+        self._unreachable_paths[edge] = order, requirement
+
+        for individual in requirement.iterate_resource_requirements():
+            if individual.is_damage:
+                self._unreachable_with_damage.add(edge)
+                for reduction in individual.resource.reductions:
+                    self._unreachable_by_resource.setdefault(reduction.inventory_item, set()).add(edge)
+            else:
+                self._unreachable_by_resource.setdefault(individual.resource, set()).add(edge)
+
+    def _unreachable_paths_to_check(self, state: State) -> List[Tuple[int, int]]:
+        """
+        Lists the unreachable paths that might be satisfied now, in the order they were added.
+        Every path was unsatisfied with the last checked resources and energy, so only the paths that mention
+        resources that changed since then, or damage when the energy changed, need to be checked again.
+        """
+        candidates = set()
+        for resource in state.resources.changed_resources(self._checked_resources):
+            candidates.update(self._unreachable_by_resource.get(resource, ()))
+        if state.energy != self._checked_energy:
+            candidates.update(self._unreachable_with_damage)
+
+        self._checked_resources = state.resources.copy()
+        self._checked_energy = state.energy
+
+        unreachable_paths = self._unreachable_paths
+        return sorted((edge for edge in candidates if edge in unreachable_paths),
+                      key=lambda edge: unreachable_paths[edge][0])
+
     def _can_advance(self,
                      node: Node,
                      ) -> bool:
@@ -159,34 +275,34 @@ class GeneratorReach:
         else:
             return True
 
+    def _can_advance_index(self, index: int) -> bool:
+        return self._can_advance(self.game.world_list.all_nodes[index])
+
     def _calculate_safe_nodes(self):
         if self._safe_nodes is not None:
             return
 
-        connected_components = list(networkx.strongly_connected_components(self._digraph))
-        for component in connected_components:
-            if self._state.node.index in component:
-                assert self._safe_nodes is None
-                self._safe_nodes = component
+        self._safe_nodes = self._digraph.strongly_connected_component(self._state.node.index)
 
-        assert self._safe_nodes is not None
+    def _calculate_reachability(self):
+        if self._reachability is None:
+            counters.increment(counters.GENERATOR_REACH)
+            self._reachability = IncrementalReachability.calculate(self._digraph, self.state.node.index,
+                                                                   self._can_advance_index)
 
-    def _calculate_reachable_paths(self):
-        if self._reachable_paths is not None:
+    def _calculate_reachable_costs(self):
+        if self._reachable_costs is not None:
             return
 
-        all_nodes = self.game.world_list.all_nodes
+        counters.increment(counters.GENERATOR_REACH)
 
-        def weight(source: int, target: int, attributes):
-            if self._can_advance(all_nodes[target]):
+        def weight(target: int):
+            if self._can_advance_index(target):
                 return 0
             else:
                 return 1
 
-        self._reachable_costs, self._reachable_paths = networkx.multi_source_dijkstra(
-            self._digraph,
-            {self.state.node.index},
-            weight=weight)
+        self._reachable_costs = self._digraph.zero_one_shortest_costs(self.state.node.index, weight)
 
     def is_reachable_node(self, node: Node) -> bool:
         index = node.index
@@ -195,7 +311,12 @@ class GeneratorReach:
         if cached_value is not None:
             return cached_value
 
-        self._calculate_reachable_paths()
+        if self._incremental:
+            self._calculate_reachability()
+            self._node_reachable_cache[index] = index in self._reachability.reachable
+            return self._node_reachable_cache[index]
+
+        self._calculate_reachable_costs()
 
         cost = self._reachable_costs.get(index)
         if cost is not None:
@@ -216,9 +337,15 @@ class GeneratorReach:
         An iterator of all nodes there's an path from the reach's starting point. Similar to is_reachable_node
         :return:
         """
-        self._calculate_reachable_paths()
         all_nodes = self.game.world_list.all_nodes
-        for index in self._reachable_paths.keys():
+        if self._incremental:
+            self._calculate_reachability()
+            connected = self._reachability.connected
+        else:
+            self._calculate_reachable_costs()
+            connected = self._reachable_costs.keys()
+
+        for index in connected:
             yield all_nodes[index]
 
     @property
@@ -250,37 +377,34 @@ class GeneratorReach:
         self._is_node_safe_cache[node] = node.index in self._safe_nodes
         return self._is_node_safe_cache[node]
 
-    def advance_to(self, new_state: State,
-                   is_safe: bool = False,
-                   ) -> None:
+    def advance_to(self, new_state: State) -> None:
         assert new_state.previous_state == self.state
         # assert self.is_reachable_node(new_state.node)
 
-        if is_safe or self.is_safe_node(new_state.node):
-            for index, _ in list(filter(lambda x: not x[1], self._node_reachable_cache.items())):
-                del self._node_reachable_cache[index]
-
-            for node, _ in list(filter(lambda x: not x[1], self._is_node_safe_cache.items())):
-                del self._is_node_safe_cache[node]
-        else:
-            self._node_reachable_cache = {}
-            self._is_node_safe_cache = {}
+        # Keeping the values that were True is not always correct when the node changes and makes the answers depend
+        # on which nodes were queried before, so start from scratch
+        self._node_reachable_cache = {}
+        self._is_node_safe_cache = {}
 
         self._state = new_state
 
+        if self._reachability is not None:
+            self._reachability.unblock_nodes(self._digraph, self._can_advance_index)
+            if (self._reachability.source != new_state.node.index
+                    and not self._reachability.move_source(self._digraph, new_state.node.index,
+                                                           self._can_advance_index)):
+                self._reachability = None
+
         paths_to_check: List[GraphPath] = []
+        all_nodes = self.game.world_list.all_nodes
 
-        edges_to_remove = []
         # Check if we can expand the corners of our graph
-        # TODO: check if expensive. We filter by only nodes that depends on a new resource
-        for edge, requirement in self._unreachable_paths.items():
-            if requirement.satisfied(self._state.resources, self._state.energy):
+        for edge in self._unreachable_paths_to_check(new_state):
+            requirement = self._unreachable_paths[edge][1]
+            if requirement.satisfied(new_state.resources, new_state.energy):
                 from_node, to_node = edge
-                paths_to_check.append(GraphPath(from_node, to_node, requirement))
-                edges_to_remove.append(edge)
-
-        for edge in edges_to_remove:
-            del self._unreachable_paths[edge]
+                paths_to_check.append(GraphPath(all_nodes[from_node], all_nodes[to_node], requirement))
+                del self._unreachable_paths[edge]
 
         self._expand_graph(paths_to_check)
 
@@ -294,8 +418,7 @@ class GeneratorReach:
 
         if new_dangerous_resources:
             edges_to_remove = []
-            for source, target, attributes in self._digraph.edges.data():
-                requirement: Requirement = attributes["requirement"]
+            for source, target, requirement in self._digraph.edges_with_requirement():
                 dangerous = requirement.as_set.dangerous_resources
                 if dangerous and new_dangerous_resources.intersection(dangerous):
                     if not requirement.satisfied(new_state.resources, new_state.energy):
@@ -304,17 +427,22 @@ class GeneratorReach:
             for edge in edges_to_remove:
                 self._digraph.remove_edge(*edge)
 
+            if edges_to_remove:
+                self._reachability = None
+
         self.advance_to(new_state)
 
     def shortest_path_from(self, node: Node) -> Dict[Node, Tuple[Node, ...]]:
         if node.index in self._digraph:
-            return networkx.shortest_path(self._digraph, node.index)
+            return self._digraph.shortest_paths(node.index)
         else:
             return {}
 
     def unreachable_nodes_with_requirements(self) -> Dict[Node, RequirementSet]:
+        all_nodes = self.game.world_list.all_nodes
         results = {}
-        for (_, node), requirement in self._unreachable_paths.items():
+        for (_, target), (_, requirement) in self._unreachable_paths.items():
+            node = all_nodes[target]
             if self.is_reachable_node(node):
                 continue
             requirements = requirement.patch_requirements(self.state.resources, 1).simplify().as_set
@@ -372,7 +500,7 @@ def collect_all_safe_resources_in_reach(reach: GeneratorReach) -> None:
         for action in actions:
             if action.can_collect(reach.state.patches, reach.state.resources):
                 # assert reach.is_safe_node(action)
-                reach.advance_to(reach.state.act_on_node(action), is_safe=True)
+                reach.advance_to(reach.state.act_on_node(action))
 
 
 def reach_with_all_safe_resources(game: GameDescription, initial_state: State) -> GeneratorReach:
@@ -445,3 +573,18 @@ def advance_to_with_reach_copy(base_reach: GeneratorReach, state: State) -> Gene
     collect_all_safe_resources_in_reach(potential_reach)
     return potential_reach
     # return advance_reach_with_possible_unsafe_resources(potential_reach)
+
+
+@contextlib.contextmanager
+def advance_to_with_reach_transaction(reach: GeneratorReach, state: State) -> Iterator[GeneratorReach]:
+    """
+    Same as advance_to_with_reach_copy, but changes the given Reach directly and undoes everything once the with
+    block exits.
+    :param reach:
+    :param state:
+    :return:
+    """
+    with reach.transaction():
+        reach.advance_to(state)
+        collect_all_safe_resources_in_reach(reach)
+        yield reach
@@ -0,0 +1,129 @@
+import collections
+from typing import Callable, Iterable, Set, Tuple, Deque
+
+from randovania.generator.index_graph import IndexGraph
+
+
+class IncrementalReachability:
+    """
+    Tracks which nodes of a graph can be reached from a source node.
+
+    A node is reachable when there's a path from the source where every node besides the source and the node
+    itself can be advanced past. This is the same as the 0/1 shortest path cost of the node being 0, or 1 when
+    the node itself is the one that can't be advanced past.
+    All nodes with any path from the source at all are tracked as connected.
+
+    Adding edges and unblocking nodes only ever grows these sets, so both are updated by searching from the
+    affected nodes only. Anything else requires calculating from scratch.
+    """
+    source: int
+    reachable: Set[int]
+    connected: Set[int]
+    blocked: Set[int]
+
+    def __init__(self, source: int, reachable: Set[int], connected: Set[int], blocked: Set[int]):
+        self.source = source
+        self.reachable = reachable
+        self.connected = connected
+        self.blocked = blocked
+
+    @classmethod
+    def calculate(cls, digraph: IndexGraph, source: int,
+                  can_advance: Callable[[int], bool],
+                  ) -> "IncrementalReachability":
+        result = cls(source, {source}, {source}, set())
+        result._expand_connected(digraph, [source])
+        result._expand_reachable(digraph, [source], can_advance)
+        return result
+
+    def copy(self) -> "IncrementalReachability":
+        return IncrementalReachability(self.source, set(self.reachable), set(self.connected), set(self.blocked))
+
+    def _expand_connected(self, digraph: IndexGraph, starting_nodes: Iterable[int]):
+        to_check = list(starting_nodes)
+        connected = self.connected
+
+        while to_check:
+            for target in digraph.successors(to_check.pop()):
+                if target not in connected:
+                    connected.add(target)
+                    to_check.append(target)
+
+    def _expand_reachable(self, digraph: IndexGraph, starting_nodes: Iterable[int],
+                          can_advance: Callable[[int], bool]):
+        """
+        Searches from the given nodes, which must already be reachable and can be advanced past.
+        """
+        to_check: Deque[int] = collections.deque(starting_nodes)
+        reachable = self.reachable
+
+        while to_check:
+            for target in digraph.successors(to_check.popleft()):
+                if target in reachable:
+                    continue
+                reachable.add(target)
+                if can_advance(target):
+                    to_check.append(target)
+                else:
+                    self.blocked.add(target)
+
+    def add_edges(self, digraph: IndexGraph, edges: Iterable[Tuple[int, int]],
+                  can_advance: Callable[[int], bool]):
+        """
+        Updates for edges that were just added to the graph.
+        :param digraph: The graph, already containing all the given edges.
+        :param edges:
+        :param can_advance:
+        :return:
+        """
+        new_connected = []
+        new_reachable = []
+
+        for source, target in edges:
+            if source in self.connected and target not in self.connected:
+                self.connected.add(target)
+                new_connected.append(target)
+
+            if source in self.reachable and source not in self.blocked and target not in self.reachable:
+                self.reachable.add(target)
+                if can_advance(target):
+                    new_reachable.append(target)
+                else:
+                    self.blocked.add(target)
+
+        self._expand_connected(digraph, new_connected)
+        self._expand_reachable(digraph, new_reachable, can_advance)
+
+    def unblock_nodes(self, digraph: IndexGraph, can_advance: Callable[[int], bool]):
+        """
+        Updates for reachable nodes that couldn't be advanced past, but now can.
+        """
+        unblocked = [node for node in self.blocked if can_advance(node)]
+        self.blocked.difference_update(unblocked)
+        self._expand_reachable(digraph, unblocked, can_advance)
+
+    def move_source(self, digraph: IndexGraph, new_source: int, can_advance: Callable[[int], bool]) -> bool:
+        """
+        Attempts to change the source without recalculating everything.
+        That's possible when both sources are reachable from each other and can be advanced past, as then
+        every path from one can be extended into a path from the other.
+        :return: False if the reachability must be calculated from scratch instead.
+        """
+        old_source = self.source
+        if (new_source not in self.reachable or new_source in self.blocked
+                or not can_advance(new_source) or not can_advance(old_source)):
+            return False
+
+        visited = {new_source}
+        to_check = [new_source]
+        while to_check:
+            for target in digraph.successors(to_check.pop()):
+                if target == old_source:
+                    self.source = new_source
+                    return True
+
+                if target not in visited and target not in self.blocked:
+                    visited.add(target)
+                    to_check.append(target)
+
+        return False
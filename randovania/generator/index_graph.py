@@ -0,0 +1,165 @@
+import collections
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Deque
+
+from randovania.game_description.requirements import Requirement
+
+
+class IndexGraph:
+    """
+    A directed graph over node indices, with a Requirement for each edge.
+
+    Nodes are indices into `WorldList.all_nodes`, so everything is stored in lists sized by the total number of
+    nodes in the game. The successors of each node are shared between copies and only copied when one of the
+    graphs modifies them, making `copy` about as expensive as copying a couple of flat lists.
+    """
+    _present: bytearray
+    _successors: List[Optional[Dict[int, Requirement]]]
+    _owned: bytearray
+    _node_count: int
+
+    def __init__(self, size: int):
+        self._present = bytearray(size)
+        self._successors = [None] * size
+        self._owned = bytearray(size)
+        self._node_count = 0
+
+    def copy(self) -> "IndexGraph":
+        result = IndexGraph.__new__(IndexGraph)
+        result._present = bytearray(self._present)
+        result._successors = list(self._successors)
+        result._node_count = self._node_count
+
+        # Now both graphs share every successors dict, so neither can change these in place anymore
+        self._owned = bytearray(len(self._owned))
+        result._owned = bytearray(len(self._owned))
+        return result
+
+    def __contains__(self, node: int) -> bool:
+        return bool(self._present[node])
+
+    def __iter__(self) -> Iterator[int]:
+        for node, present in enumerate(self._present):
+            if present:
+                yield node
+
+    def __len__(self) -> int:
+        return self._node_count
+
+    def add_node(self, node: int):
+        if not self._present[node]:
+            self._present[node] = 1
+            self._node_count += 1
+
+    def _writable_successors(self, node: int) -> Dict[int, Requirement]:
+        successors = self._successors[node]
+        if successors is None:
+            successors = {}
+        elif not self._owned[node]:
+            successors = dict(successors)
+        else:
+            return successors
+
+        self._successors[node] = successors
+        self._owned[node] = 1
+        return successors
+
+    def add_edge(self, source: int, target: int, requirement: Requirement):
+        self.add_node(source)
+        self.add_node(target)
+        self._writable_successors(source)[target] = requirement
+
+    def remove_edge(self, source: int, target: int):
+        del self._writable_successors(source)[target]
+
+    def has_edge(self, source: int, target: int) -> bool:
+        successors = self._successors[source]
+        return successors is not None and target in successors
+
+    def successors(self, node: int) -> Iterator[int]:
+        successors = self._successors[node]
+        if successors is not None:
+            yield from successors
+
+    def edges_with_requirement(self) -> Iterator[Tuple[int, int, Requirement]]:
+        for source, successors in enumerate(self._successors):
+            if successors is not None:
+                for target, requirement in successors.items():
+                    yield source, target, requirement
+
+    def strongly_connected_component(self, node: int) -> Set[int]:
+        """
+        Calculates the strongly connected component that contains the given node, using an iterative version of
+        Tarjan's algorithm limited to the nodes reachable from it.
+        """
+        index_of: Dict[int, int] = {node: 0}
+        low_link: Dict[int, int] = {node: 0}
+        stack: List[int] = [node]
+        on_stack: Set[int] = {node}
+        work: List[Tuple[int, Iterator[int]]] = [(node, self.successors(node))]
+
+        while work:
+            current, successors = work[-1]
+            for target in successors:
+                if target not in index_of:
+                    index_of[target] = low_link[target] = len(index_of)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, self.successors(target)))
+                    break
+                elif target in on_stack:
+                    low_link[current] = min(low_link[current], index_of[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[current])
+
+                if low_link[current] == index_of[current]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.add(member)
+                        if member == current:
+                            break
+                    if node in component:
+                        return component
+
+        raise RuntimeError(f"Node {node} not in any strongly connected component")
+
+    def shortest_paths(self, source: int) -> Dict[int, List[int]]:
+        """
+        Calculates a path with the fewest edges from source to every node reachable from it.
+        """
+        paths = {source: [source]}
+        to_check: Deque[int] = collections.deque([source])
+        while to_check:
+            node = to_check.popleft()
+            for target in self.successors(node):
+                if target not in paths:
+                    paths[target] = paths[node] + [target]
+                    to_check.append(target)
+        return paths
+
+    def zero_one_shortest_costs(self, source: int, weight: Callable[[int], int]) -> Dict[int, int]:
+        """
+        Calculates the shortest distance from source to every node reachable from it, where the cost of entering
+        each node is given by `weight` and must be either 0 or 1.
+        """
+        costs = {source: 0}
+        to_check: Deque[Tuple[int, int]] = collections.deque([(source, 0)])
+        while to_check:
+            node, cost = to_check.popleft()
+            if cost > costs[node]:
+                continue
+
+            for target in self.successors(node):
+                node_weight = weight(target)
+                new_cost = cost + node_weight
+                if new_cost < costs.get(target, new_cost + 1):
+                    costs[target] = new_cost
+                    if node_weight:
+                        to_check.append((target, new_cost))
+                    else:
+                        to_check.appendleft((target, new_cost))
+        return costs
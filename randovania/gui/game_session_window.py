@@ -11,7 +11,7 @@ from PySide2.QtWidgets import QMessageBox
 from asyncqt import asyncSlot, asyncClose
 
 from randovania.game_connection.game_connection import GameConnection
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.games.game import RandovaniaGame
 from randovania.generator import base_patches_factory
 from randovania.gui.dialog.echoes_user_preferences_dialog import EchoesUserPreferencesDialog
@@ -994,7 +994,7 @@ class GameSessionWindow(QtWidgets.QMainWindow, Ui_GameSessionWindow, BackgroundT
         shareable_hash = self._game_session.seed_hash
 
         configuration = self._game_session.presets[membership.row].get_preset().configuration
-        game = data_reader.decode_data(configuration.game_data)
+        game = default_database.decode_data_with_cache(configuration.game_data)
         game_specific = base_patches_factory.create_game_specific(configuration, game)
 
         input_file = dialog.input_file
@@ -1,13 +1,10 @@
-import datetime
 import functools
-import json
 from pathlib import Path
 from typing import Optional, Set
 
 import pypresence
 from PySide2.QtCore import Signal
 from PySide2.QtWidgets import QWidget
-from cryptography.fernet import Fernet
 
 import randovania
 from randovania.gui.lib import async_dialog
@@ -64,6 +61,10 @@ class QtNetworkClient(QWidget, NetworkClient):
         await super().on_game_session_updated(data)
         self.GameSessionUpdated.emit(self._current_game_session)
 
+    async def on_game_session_delta(self, data):
+        await super().on_game_session_delta(data)
+        self.GameSessionUpdated.emit(self._current_game_session)
+
     async def login_with_discord(self):
         if self.discord is None:
             raise RuntimeError("Missing Discord configuration for Randovania")
@@ -74,19 +75,6 @@ class QtNetworkClient(QWidget, NetworkClient):
         new_session = await self._emit_with_result("login_with_discord", authorize["data"]["code"])
         await self.on_user_session_updated(new_session)
 
-    async def login_as_guest(self, name: str = "Unknown"):
-        if "guest_secret" not in self.configuration:
-            raise RuntimeError("Missing guest configuration for Randovania")
-
-        fernet = Fernet(self.configuration["guest_secret"].encode("ascii"))
-        login_request = fernet.encrypt(json.dumps({
-            "name": name,
-            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        }).encode("utf-8"))
-
-        new_session = await self._emit_with_result("login_with_guest", login_request)
-        await self.on_user_session_updated(new_session)
-
     async def logout(self):
         self.session_data_path.unlink()
         self._current_user = None
@@ -137,6 +137,7 @@ class MainWindow(WindowManager, Ui_MainWindow):
         self.menu_action_edit_existing_database.triggered.connect(self._open_data_editor_prompt)
         self.menu_action_validate_seed_after.triggered.connect(self._on_validate_seed_change)
         self.menu_action_timeout_generation_after_a_time_limit.triggered.connect(self._on_generate_time_limit_change)
+        self.menu_action_generate_in_parallel.triggered.connect(self._on_generate_in_parallel_change)
         self.menu_action_dark_mode.triggered.connect(self._on_menu_action_dark_mode)
         self.menu_action_open_auto_tracker.triggered.connect(self._open_auto_tracker)
         self.menu_action_previously_generated_games.triggered.connect(self._on_menu_action_previously_generated_games)
@@ -373,6 +374,7 @@ class MainWindow(WindowManager, Ui_MainWindow):
         self.menu_action_validate_seed_after.setChecked(self._options.advanced_validate_seed_after)
         self.menu_action_timeout_generation_after_a_time_limit.setChecked(
             self._options.advanced_timeout_during_generation)
+        self.menu_action_generate_in_parallel.setChecked(self._options.advanced_generate_in_parallel)
         self.menu_action_dark_mode.setChecked(self._options.dark_mode)
 
         self.generate_seed_tab.on_options_changed(self._options)
@@ -528,6 +530,11 @@ class MainWindow(WindowManager, Ui_MainWindow):
         with self._options as options:
             options.advanced_timeout_during_generation = is_checked
 
+    def _on_generate_in_parallel_change(self):
+        is_checked = self.menu_action_generate_in_parallel.isChecked()
+        with self._options as options:
+            options.advanced_generate_in_parallel = is_checked
+
     def _on_menu_action_dark_mode(self):
         with self._options as options:
             options.dark_mode = self.menu_action_dark_mode.isChecked()
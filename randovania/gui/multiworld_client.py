@@ -60,6 +60,7 @@ class MultiworldClient(QObject):
     _data: Optional[Data] = None
     _received_messages: List[str]
     _received_pickups: List[PickupEntry]
+    _pickups_cursor: Optional[dict] = None
     _notify_task: Optional[asyncio.Task] = None
     _pid: Optional[pid.PidFile] = None
 
@@ -95,6 +96,7 @@ class MultiworldClient(QObject):
             self._pid.create()
 
         self._data = Data(persist_path)
+        self._pickups_cursor = None
         self.game_connection.set_location_collected_listener(self.on_location_collected)
         self.network_client.GameUpdateNotification.connect(self.on_network_game_updated)
 
@@ -163,11 +165,13 @@ class MultiworldClient(QObject):
     async def refresh_received_pickups(self):
         self.logger.debug(f"refresh_received_pickups: start")
         async with self._pickups_lock:
-            result = await self.network_client.game_session_request_pickups()
+            cursor, full, result = await self.network_client.game_session_request_new_pickups(self._pickups_cursor)
 
-            self._received_messages = []
-            self._received_pickups = []
-            self.logger.info(f"refresh_received_pickups: received {len(result)} items")
+            if full:
+                self._received_messages = []
+                self._received_pickups = []
+            self._pickups_cursor = cursor
+            self.logger.info(f"refresh_received_pickups: received {len(result)} {'' if full else 'new '}items")
 
             for message, data in result:
                 self._received_messages.append(message)
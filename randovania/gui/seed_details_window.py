@@ -8,7 +8,7 @@ from PySide2.QtWidgets import QRadioButton, QGroupBox, QHBoxLayout, QLabel, QPus
     QApplication, QDialog, QAction, QMenu
 from asyncqt import asyncSlot
 
-from randovania.game_description import data_reader, default_database
+from randovania.game_description import default_database
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import PickupNode
 from randovania.games.game import RandovaniaGame
@@ -348,7 +348,7 @@ class SeedDetailsWindow(CloseEventWidget, Ui_SeedDetailsWindow, BackgroundTaskMi
                 pickup.pickup.name
                 for pickup in patches.pickup_assignment.values()
             }
-            game_description = data_reader.decode_data(preset.configuration.game_data)
+            game_description = default_database.decode_data_with_cache(preset.configuration.game_data)
             self._create_pickup_spoilers(game_description)
             starting_area = game_description.world_list.area_by_area_location(patches.starting_location)
 
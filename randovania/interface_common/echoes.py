@@ -1,18 +1,28 @@
 import multiprocessing
+import signal
 import traceback
 from typing import Callable, Union
 
 from randovania.generator import generator
+from randovania.generator.filler import parallel_evaluation
 from randovania.layout.layout_description import LayoutDescription
 from randovania.layout.permalink import Permalink
 from randovania.resolver import debug
 
 
+def _stop_generation(signum, frame):
+    # Generation runs in a thread that can't be interrupted, so stop the evaluation workers it started from here
+    parallel_evaluation.close_all_evaluators()
+    raise SystemExit(1)
+
+
 def _generate_layout_worker(output_pipe,
                             permalink: Permalink,
                             validate_after_generation: bool,
                             timeout_during_generation: bool,
+                            evaluation_workers: int,
                             debug_level: int):
+    signal.signal(signal.SIGTERM, _stop_generation)
     try:
         def status_update(message: str):
             output_pipe.send(message)
@@ -25,6 +35,7 @@ def _generate_layout_worker(output_pipe,
         layout_description = generator.generate_description(permalink,
                                                             status_update=status_update,
                                                             validate_after_generation=validate_after_generation,
+                                                            evaluation_workers=evaluation_workers,
                                                             **extra_args)
         output_pipe.send(layout_description)
     except Exception as e:
@@ -36,6 +47,7 @@ def generate_layout(permalink: Permalink,
                     status_update: Callable[[str], None],
                     validate_after_generation: bool,
                     timeout_during_generation: bool,
+                    evaluation_workers: int = 0,
                     ) -> LayoutDescription:
     receiving_pipe, output_pipe = multiprocessing.Pipe(False)
 
@@ -45,7 +57,8 @@ def generate_layout(permalink: Permalink,
 
     process = multiprocessing.Process(
         target=_generate_layout_worker,
-        args=(output_pipe, permalink, validate_after_generation, timeout_during_generation, debug_level)
+        args=(output_pipe, permalink, validate_after_generation, timeout_during_generation, evaluation_workers,
+              debug_level)
     )
     process.start()
     try:
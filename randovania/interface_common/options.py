@@ -49,6 +49,7 @@ _SERIALIZER_FOR_FIELD = {
     "last_changelog_displayed": Serializer(identity, str),
     "advanced_validate_seed_after": Serializer(identity, bool),
     "advanced_timeout_during_generation": Serializer(identity, bool),
+    "advanced_generate_in_parallel": Serializer(identity, bool),
     "auto_save_spoiler": Serializer(identity, bool),
     "dark_mode": Serializer(identity, bool),
     "output_directory": Serializer(str, Path),
@@ -88,6 +89,7 @@ class Options:
     _last_changelog_displayed: str
     _advanced_validate_seed_after: Optional[bool] = None
     _advanced_timeout_during_generation: Optional[bool] = None
+    _advanced_generate_in_parallel: Optional[bool] = None
     _auto_save_spoiler: Optional[bool] = None
     _dark_mode: Optional[bool] = None
     _output_directory: Optional[Path] = None
@@ -219,6 +221,7 @@ class Options:
         self._check_editable_and_mark_dirty()
         self._advanced_validate_seed_after = None
         self._advanced_timeout_during_generation = None
+        self._advanced_generate_in_parallel = None
         self._auto_save_spoiler = None
         self._cosmetic_patches = None
         self._displayed_alerts = None
@@ -364,6 +367,14 @@ class Options:
     def advanced_timeout_during_generation(self, value: bool):
         self._edit_field("advanced_timeout_during_generation", value)
 
+    @property
+    def advanced_generate_in_parallel(self) -> bool:
+        return _return_with_default(self._advanced_generate_in_parallel, lambda: False)
+
+    @advanced_generate_in_parallel.setter
+    def advanced_generate_in_parallel(self, value: bool):
+        self._edit_field("advanced_generate_in_parallel", value)
+
     ######
 
     def _check_editable_and_mark_dirty(self):
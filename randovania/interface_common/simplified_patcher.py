@@ -1,3 +1,4 @@
+import multiprocessing
 import shutil
 from pathlib import Path
 
@@ -50,6 +51,12 @@ def unpack_iso(input_iso: Path,
     )
 
 
+def _evaluation_workers(options: Options) -> int:
+    if options.advanced_generate_in_parallel:
+        return max(multiprocessing.cpu_count() - 1, 1)
+    return 0
+
+
 def generate_layout(options: Options,
                     permalink: Permalink,
                     progress_update: ProgressUpdateCallable,
@@ -66,6 +73,7 @@ def generate_layout(options: Options,
         status_update=ConstantPercentageCallback(progress_update, -1),
         validate_after_generation=options.advanced_validate_seed_after,
         timeout_during_generation=options.advanced_timeout_during_generation,
+        evaluation_workers=_evaluation_workers(options),
     )
 
 
@@ -3,7 +3,7 @@ import dataclasses
 import re
 from typing import Dict, List, DefaultDict
 
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.area import Area
 from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.assignment import PickupAssignment, PickupTarget
@@ -105,7 +105,7 @@ def serialize_single(player_index: int, num_players: int, patches: GamePatches,
     :param game_data:
     :return:
     """
-    game = data_reader.decode_data(game_data)
+    game = default_database.decode_data_with_cache(game_data)
     world_list = game.world_list
 
     result = {
@@ -257,7 +257,7 @@ def decode(game_modifications: List[dict],
            layout_configurations: Dict[int, EchoesConfiguration],
            ) -> Dict[int, GamePatches]:
 
-    all_games = {index: data_reader.decode_data(configuration.game_data)
+    all_games = {index: default_database.decode_data_with_cache(configuration.game_data)
                  for index, configuration in layout_configurations.items()}
     all_pools = {index: pool_creator.calculate_pool_results(configuration, all_games[index].resource_database)
                  for index, configuration in layout_configurations.items()}
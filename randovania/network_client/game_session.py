@@ -76,6 +76,8 @@ class GameSessionEntry:
     permalink: Optional[str]
     state: GameSessionState
     generation_in_progress: Optional[int]
+    snapshot: Optional[str] = None
+    version: Optional[int] = None
 
     @property
     def num_admins(self) -> int:
@@ -106,8 +108,53 @@ class GameSessionEntry:
             permalink=data["permalink"],
             state=GameSessionState(data["state"]),
             generation_in_progress=data["generation_in_progress"],
+            snapshot=data.get("snapshot"),
+            version=data.get("version"),
         )
 
+    def can_apply_delta(self, delta: dict) -> bool:
+        """
+        Checks if the given delta is the version that follows this entry.
+        """
+        return (self.version is not None and delta["id"] == self.id and delta["snapshot"] == self.snapshot
+                and delta["version"] == self.version + 1)
+
+    def apply_delta(self, delta: dict) -> "GameSessionEntry":
+        """
+        Creates the entry of the version from the given delta, which must be the one that follows this entry.
+        """
+        if not self.can_apply_delta(delta):
+            raise ValueError(f"Delta for version {delta['version']} can't be applied to version {self.version}")
+
+        changes = delta["changes"]
+        fields = {}
+        for field in ("name", "seed_hash", "word_hash", "spoiler", "permalink", "generation_in_progress"):
+            if field in changes:
+                fields[field] = changes[field]
+        if "state" in changes:
+            fields["state"] = GameSessionState(changes["state"])
+        if "presets" in changes:
+            fields["presets"] = [VersionedPreset(preset_json) for preset_json in changes["presets"]]
+
+        if delta["players"] or delta["removed_players"]:
+            players = dict(self.players)
+            for user_id in delta["removed_players"]:
+                players.pop(user_id, None)
+            for player_json in delta["players"]:
+                player_entry = PlayerSessionEntry.from_json(player_json)
+                players[player_entry.id] = player_entry
+            fields["players"] = players
+
+        if "actions" in changes:
+            actions = [GameSessionAction.from_json(item) for item in changes["actions"]]
+        else:
+            actions = list(self.actions)
+        if "actions" in changes or delta["new_actions"]:
+            actions.extend(GameSessionAction.from_json(item) for item in delta["new_actions"])
+            fields["actions"] = actions
+
+        return dataclasses.replace(self, version=delta["version"], **fields)
+
 
 @dataclasses.dataclass(frozen=True)
 class User:
@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import datetime
 import hashlib
 import json
 import logging
@@ -12,6 +13,7 @@ import aiohttp.client_exceptions
 import engineio
 import socketio
 import socketio.exceptions
+from cryptography.fernet import Fernet
 
 import randovania
 from randovania.game_connection.backend_choice import GameBackendChoice
@@ -74,6 +76,7 @@ class NetworkClient:
         self.sio.on('disconnect', self.on_disconnect)
         self.sio.on('user_session_update', self.on_user_session_updated)
         self.sio.on('game_session_update', self.on_game_session_updated)
+        self.sio.on('game_session_delta', self.on_game_session_delta)
         self.sio.on('game_has_update', self.on_game_update_notification)
 
     @property
@@ -213,6 +216,21 @@ class NetworkClient:
         self._current_game_session = GameSessionEntry.from_json(data)
         self.logger.debug(f"on_game_session_updated - {self._current_game_session.id}")
 
+    async def on_game_session_delta(self, data):
+        current = self._current_game_session
+        if current is None or current.id != data["id"]:
+            return
+
+        if current.can_apply_delta(data):
+            self._current_game_session = current.apply_delta(data)
+            self.logger.debug(f"on_game_session_delta - {current.id}, version {data['version']}")
+
+        elif current.snapshot != data["snapshot"] or current.version is None or current.version < data["version"]:
+            self.logger.info(f"on_game_session_delta - {current.id}, missing version before {data['version']}. "
+                             f"Requesting the full session.")
+            self._current_game_session = GameSessionEntry.from_json(
+                await self._emit_with_result("game_session_request_update", current.id))
+
     async def on_game_update_notification(self, details):
         pass
 
@@ -248,6 +266,33 @@ class NetworkClient:
             if item is not None
         ]
 
+    async def game_session_request_new_pickups(self, cursor: Optional[dict],
+                                               ) -> Tuple[Optional[dict], bool, List[Tuple[str, bytes]]]:
+        """
+        Requests the pickups received after the given cursor, or all of them if it's None.
+        :return: The cursor for the next request, if the result has all pickups and the pickups.
+        """
+        data = await self._emit_with_result("game_session_request_new_pickups",
+                                            (self._current_game_session.id, cursor))
+        return data["cursor"], data["full"], [
+            (item["message"], base64.b85decode(item["pickup"]))
+            for item in data["pickups"]
+            if item is not None
+        ]
+
+    async def login_as_guest(self, name: str = "Unknown"):
+        if "guest_secret" not in self.configuration:
+            raise RuntimeError("Missing guest configuration for Randovania")
+
+        fernet = Fernet(self.configuration["guest_secret"].encode("ascii"))
+        login_request = fernet.encrypt(json.dumps({
+            "name": name,
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }).encode("utf-8"))
+
+        new_session = await self._emit_with_result("login_with_guest", login_request)
+        await self.on_user_session_updated(new_session)
+
     async def get_game_session_list(self) -> List[GameSessionListEntry]:
         return [
             GameSessionListEntry.from_json(item)
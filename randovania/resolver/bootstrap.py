@@ -112,23 +112,23 @@ def calculate_starting_state(game: GameDescription, patches: GamePatches) -> "St
     if initial_game_state is not None:
         add_resource_gain_to_current_resources(initial_game_state, initial_resources)
 
-    starting_state = State(
+    energy = 99 + (100 * initial_resources.get(game.resource_database.energy_tank, 0))
+
+    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
+    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
+    for resource in keys_to_remove:
+        del initial_resources[resource]
+
+    return State(
         initial_resources,
         (),
-        99 + (100 * initial_resources.get(game.resource_database.energy_tank, 0)),
+        energy,
         starting_node,
         patches,
         None,
         game.resource_database
     )
 
-    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
-    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
-    for resource in keys_to_remove:
-        del initial_resources[resource]
-
-    return starting_state
-
 
 def version_resources_for_game(resource_database: ResourceDatabase) -> CurrentResources:
     # All version differences are patched out from the game
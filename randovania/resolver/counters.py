@@ -0,0 +1,24 @@
+"""
+Counts how many times expensive operations happened, for benchmarking.
+Only operations in the current process are counted.
+"""
+import collections
+import typing
+
+RESOLVER_REACH = "resolver_reach"
+GENERATOR_REACH = "generator_reach"
+RETCON_STEP = "retcon_step"
+
+_counters: typing.Counter[str] = collections.Counter()
+
+
+def increment(name: str):
+    _counters[name] += 1
+
+
+def reset():
+    _counters.clear()
+
+
+def snapshot() -> typing.Dict[str, int]:
+    return dict(_counters)
@@ -1,4 +1,5 @@
-from typing import Dict
+import collections
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple, Any
 
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import Node
@@ -12,11 +13,55 @@ class Logic:
     game: GameDescription
     configuration: EchoesConfiguration
     additional_requirements: Dict[Node, RequirementSet]
+    reach_cache_size: int
+    _reach_cache: "collections.OrderedDict[Hashable, Tuple[Any, Tuple[Node, ...]]]"
+    _reach_cache_keys_by_node: Dict[Node, Set[Hashable]]
 
-    def __init__(self, game: GameDescription, configuration: EchoesConfiguration):
+    def __init__(self, game: GameDescription, configuration: EchoesConfiguration, reach_cache_size: int = 512):
         self.game = game
         self.configuration = configuration
         self.additional_requirements = {}
+        self.reach_cache_size = reach_cache_size
+        self._reach_cache = collections.OrderedDict()
+        self._reach_cache_keys_by_node = collections.defaultdict(set)
 
     def get_additional_requirements(self, node: Node) -> RequirementSet:
         return self.additional_requirements.get(node, RequirementSet.trivial())
+
+    def set_additional_requirements(self, node: Node, requirements: RequirementSet):
+        """
+        Changes the additional requirements of the given node, discarding every cached reach that used them.
+        """
+        self.additional_requirements[node] = requirements
+        for key in self._reach_cache_keys_by_node.pop(node, ()):
+            self._discard_cached_reach(key)
+
+    def get_cached_reach(self, key: Hashable) -> Optional[Any]:
+        entry = self._reach_cache.get(key)
+        if entry is None:
+            return None
+        self._reach_cache.move_to_end(key)
+        return entry[0]
+
+    def add_cached_reach(self, key: Hashable, reach: Any, dependencies: Iterable[Node]):
+        """
+        Stores a reach, to be used until the additional requirements of any of the given nodes change.
+        """
+        if self.reach_cache_size <= 0:
+            return
+
+        dependencies = tuple(dependencies)
+        self._reach_cache[key] = (reach, dependencies)
+        for node in dependencies:
+            self._reach_cache_keys_by_node[node].add(key)
+
+        while len(self._reach_cache) > self.reach_cache_size:
+            self._discard_cached_reach(next(iter(self._reach_cache)))
+
+    def _discard_cached_reach(self, key: Hashable):
+        entry = self._reach_cache.pop(key, None)
+        if entry is not None:
+            for node in entry[1]:
+                keys = self._reach_cache_keys_by_node.get(node)
+                if keys is not None:
+                    keys.discard(key)
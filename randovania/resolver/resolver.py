@@ -1,8 +1,8 @@
-from typing import Optional, Tuple, Callable, FrozenSet
+from typing import Optional, Tuple, Callable, FrozenSet, Dict, Hashable, Iterator, List, Union
 
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.game_patches import GamePatches
-from randovania.game_description.node import PickupNode, ResourceNode, EventNode
+from randovania.game_description.node import PickupNode, ResourceNode, EventNode, Node
 from randovania.game_description.requirements import RequirementSet, RequirementList
 from randovania.game_description.resources.resource_info import ResourceInfo
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
@@ -77,24 +77,53 @@ def _should_check_if_action_is_safe(state: State,
     return False
 
 
-def _inner_advance_depth(state: State,
-                         logic: Logic,
-                         status_update: Callable[[str], None],
-                         *,
-                         reach: Optional[ResolverReach] = None,
-                         ) -> Tuple[Optional[State], bool]:
+class _AdvanceFrame:
     """
-
-    :param state:
-    :param logic:
-    :param status_update:
-    :param reach: A precalculated reach for the given state
-    :return:
+    A state being explored by `_inner_advance_depth`, in place of a recursive call.
+    Either it's waiting on the result of a single safe action, or it's trying each satisfiable action in order.
     """
+    state: State
+    reach: ResolverReach
+    safe_action: Optional[Tuple[State, ResolverReach]]
+    satisfiable_actions: Optional[Iterator[Tuple[ResourceNode, int]]]
+    has_action: bool
 
+    def __init__(self, state: State, reach: ResolverReach,
+                 safe_action: Optional[Tuple[State, ResolverReach]] = None,
+                 satisfiable_actions: Optional[Iterator[Tuple[ResourceNode, int]]] = None):
+        self.state = state
+        self.reach = reach
+        self.safe_action = safe_action
+        self.satisfiable_actions = satisfiable_actions
+        self.has_action = False
+
+
+AdvanceResult = Tuple[Optional[State], bool]
+RefutedStates = Dict[Tuple[Node, Hashable], Tuple[int, bool]]
+
+
+def _refuted_key(state: State) -> Tuple[Node, Hashable]:
+    return state.node, state.resources.canonical_key()
+
+
+def _begin_advance(state: State,
+                   logic: Logic,
+                   status_update: Callable[[str], None],
+                   reach: Optional[ResolverReach],
+                   refuted_states: RefutedStates,
+                   ) -> Union[AdvanceResult, _AdvanceFrame]:
+    """
+    Starts exploring the given state. Returns the result right away when there's nothing to explore.
+    """
     if logic.game.victory_condition.satisfied(state.resources, state.energy):
         return state, True
 
+    # A state with the same resources at the same node was already a dead end with at least as much energy,
+    # so exploring it again would only try the same actions in a different order
+    refuted = refuted_states.get(_refuted_key(state))
+    if refuted is not None and state.energy <= refuted[0]:
+        return None, refuted[1]
+
     if reach is None:
         reach = ResolverReach.calculate_reach(logic, state)
 
@@ -109,45 +138,105 @@ def _inner_advance_depth(state: State,
 
             # If we can go back to where we were, it's a simple safe node
             if state.node in potential_reach.nodes:
-                new_result = _inner_advance_depth(state=potential_state,
-                                                  logic=logic,
-                                                  status_update=status_update,
-                                                  reach=potential_reach)
+                return _AdvanceFrame(state, reach, safe_action=(potential_state, potential_reach))
+
+    debug.log_checking_satisfiable_actions()
+    return _AdvanceFrame(state, reach,
+                         satisfiable_actions=reach.satisfiable_actions(state, logic.game.victory_condition))
 
-                if not new_result[1]:
-                    debug.log_rollback(state, True, True)
 
-                # If a safe node was a dead end, we're certainly a dead end as well
-                return new_result
+def _add_refuted_state(refuted_states: RefutedStates, state: State, has_action: bool):
+    key = _refuted_key(state)
+    previous = refuted_states.get(key)
+    if previous is None or previous[0] < state.energy:
+        refuted_states[key] = state.energy, has_action
 
-    debug.log_checking_satisfiable_actions()
-    has_action = False
-    for action, energy in reach.satisfiable_actions(state, logic.game.victory_condition):
-        new_result = _inner_advance_depth(
-            state=state.act_on_node(action, path=reach.path_to_node[action], new_energy=energy),
-            logic=logic,
-            status_update=status_update)
-
-        # We got a positive result. Send it back up
-        if new_result[0] is not None:
-            return new_result
-        else:
-            has_action = True
 
-    debug.log_rollback(state, has_action, False)
+def _finish_advance(frame: _AdvanceFrame, logic: Logic) -> AdvanceResult:
+    """
+    All satisfiable actions of the frame were dead ends, so figure out what would be needed to get out of it.
+    """
+    state, reach = frame.state, frame.reach
+
+    debug.log_rollback(state, frame.has_action, False)
     additional_requirements = reach.satisfiable_as_requirement_set
 
-    if has_action:
+    if frame.has_action:
         additional = set()
         for resource_node in reach.collectable_resource_nodes(state):
             additional |= logic.get_additional_requirements(resource_node).alternatives
 
         additional_requirements = additional_requirements.union(RequirementSet(additional))
 
-    logic.additional_requirements[state.node] = _simplify_additional_requirement_set(additional_requirements,
-                                                                                     state,
-                                                                                     logic.game.dangerous_resources)
-    return None, has_action
+    logic.set_additional_requirements(state.node, _simplify_additional_requirement_set(additional_requirements,
+                                                                                       state,
+                                                                                       logic.game.dangerous_resources))
+    return None, frame.has_action
+
+
+def _inner_advance_depth(state: State,
+                         logic: Logic,
+                         status_update: Callable[[str], None],
+                         *,
+                         reach: Optional[ResolverReach] = None,
+                         ) -> AdvanceResult:
+    """
+    Searches for a sequence of actions that leads to victory with a depth-first search, using an explicit stack
+    instead of recursion. Dead ends are remembered, so the same resources at the same node aren't explored again.
+    :param state:
+    :param logic:
+    :param status_update:
+    :param reach: A precalculated reach for the given state
+    :return:
+    """
+    stack: List[_AdvanceFrame] = []
+    refuted_states: RefutedStates = {}
+
+    # Make sure the layout includes every resource of the game, so the same resources always have the same key
+    _ = logic.game.resource_layout
+
+    to_begin: Optional[Tuple[State, Optional[ResolverReach]]] = (state, reach)
+    result: Optional[AdvanceResult] = None
+
+    while True:
+        if to_begin is not None:
+            began = _begin_advance(to_begin[0], logic, status_update, to_begin[1], refuted_states)
+            to_begin = None
+            if isinstance(began, _AdvanceFrame):
+                stack.append(began)
+                to_begin = began.safe_action
+                continue
+            result = began
+
+        if not stack:
+            return result
+
+        frame = stack[-1]
+        if result is not None:
+            if frame.safe_action is not None:
+                if not result[1]:
+                    debug.log_rollback(frame.state, True, True)
+                    # If a safe node was a dead end, we're certainly a dead end as well
+                    _add_refuted_state(refuted_states, frame.state, result[1])
+                stack.pop()
+                continue
+
+            if result[0] is not None:
+                # We got a positive result. Send it back up
+                stack.pop()
+                continue
+
+            frame.has_action = True
+            result = None
+
+        action_and_energy = next(frame.satisfiable_actions, None)
+        if action_and_energy is not None:
+            action, energy = action_and_energy
+            to_begin = frame.state.act_on_node(action, path=frame.reach.path_to_node[action], new_energy=energy), None
+        else:
+            result = _finish_advance(frame, logic)
+            _add_refuted_state(refuted_states, frame.state, result[1])
+            stack.pop()
 
 
 def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None]) -> Optional[State]:
@@ -165,7 +254,7 @@ def resolve(configuration: EchoesConfiguration,
     if status_update is None:
         status_update = _quiet_print
 
-    game = data_reader.decode_data(configuration.game_data)
+    game = default_database.decode_data_with_cache(configuration.game_data)
     event_pickup.replace_with_event_pickups(game)
 
     new_game, starting_state = logic_bootstrap(configuration, game, patches)
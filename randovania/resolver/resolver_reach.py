@@ -1,12 +1,13 @@
 import math
 from collections import defaultdict
-from typing import Dict, Set, Iterator, Tuple, FrozenSet
+from typing import Dict, Set, Iterator, Tuple, FrozenSet, Optional
 
 from randovania.game_description.game_description import calculate_interesting_resources
+from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import ResourceNode, Node
 from randovania.game_description.requirements import RequirementList, RequirementSet, SatisfiableRequirements, \
     RequirementAnd, Requirement
-from randovania.resolver import debug
+from randovania.resolver import debug, counters
 from randovania.resolver.logic import Logic
 from randovania.resolver.state import State
 
@@ -18,6 +19,7 @@ class ResolverReach:
     _satisfiable_requirements: SatisfiableRequirements
     _safe_nodes: FrozenSet[Node]
     _logic: Logic
+    _patches: Optional[GamePatches] = None
 
     @property
     def nodes(self) -> Iterator[Node]:
@@ -46,7 +48,19 @@ class ResolverReach:
     def calculate_reach(cls,
                         logic: Logic,
                         initial_state: State) -> "ResolverReach":
-
+        """
+        Calculates the reach of the given state. Results are cached in the Logic until the additional requirements of
+        any node they depend on change.
+        """
+        # Make sure the layout includes every resource of the game before using it in the key
+        layout = logic.game.resource_layout
+        cache_key = (initial_state.node, initial_state.energy, id(initial_state.patches),
+                     initial_state.resources.canonical_key())
+        cached = logic.get_cached_reach(cache_key)
+        if cached is not None and cached._patches is initial_state.patches:
+            return cached
+
+        counters.increment(counters.RESOLVER_REACH)
         checked_nodes: Dict[Node, int] = {}
 
         # Keys: nodes to check
@@ -61,6 +75,8 @@ class ResolverReach:
         path_to_node: Dict[Node, Tuple[Node, ...]] = {}
         path_to_node[initial_state.node] = tuple()
 
+        quantities = layout.dense_quantities(initial_state.resources)
+
         while nodes_to_check:
             node = next(iter(nodes_to_check))
             energy = nodes_to_check.pop(node)
@@ -73,6 +89,9 @@ class ResolverReach:
                 reach_nodes[node] = energy
 
             requirement_to_leave = node.requirement_to_leave(initial_state.patches, initial_state.resources)
+            compiled_to_leave = requirement_to_leave.compiled(layout)
+            if len(quantities) < len(layout):
+                quantities = layout.dense_quantities(initial_state.resources)
 
             for target_node, requirement in logic.game.world_list.potential_nodes_from(node, initial_state.patches):
                 if target_node is None:
@@ -82,25 +101,35 @@ class ResolverReach:
                                                                                             math.inf) <= energy:
                     continue
 
-                if requirement_to_leave != Requirement.trivial():
-                    requirement = RequirementAnd([requirement, requirement_to_leave])
-
                 # Check if the normal requirements to reach that node is satisfied
-                satisfied = requirement.satisfied(initial_state.resources, energy)
+                compiled_requirement = requirement.compiled(layout)
+                if len(quantities) < len(layout):
+                    # Compiling added a resource outside the game, like the tracker's placeholder for unknown gates
+                    quantities = layout.dense_quantities(initial_state.resources)
+
+                satisfied = (compiled_requirement.satisfied(quantities, energy)
+                             and compiled_to_leave.satisfied(quantities, energy))
                 if satisfied:
                     # If it is, check if we additional requirements figured out by backtracking is satisfied
                     satisfied = logic.get_additional_requirements(node).satisfied(initial_state.resources,
                                                                                   energy)
 
                 if satisfied:
-                    nodes_to_check[target_node] = energy - requirement.damage(initial_state.resources)
+                    nodes_to_check[target_node] = (energy - compiled_requirement.damage(quantities)
+                                                   - compiled_to_leave.damage(quantities))
                     path_to_node[target_node] = path_to_node[node] + (node,)
 
                 elif target_node:
+                    if requirement_to_leave != Requirement.trivial():
+                        requirement = RequirementAnd([requirement, requirement_to_leave])
+
                     # If we can't go to this node, store the reason in order to build the satisfiable requirements.
                     # Note we ignore the 'additional requirements' here because it'll be added on the end.
                     requirements_by_node[target_node].update(requirement.as_set.alternatives)
 
+        dependencies = set(checked_nodes.keys())
+        dependencies.update(requirements_by_node.keys())
+
         # Discard satisfiable requirements of nodes reachable by other means
         for node in set(reach_nodes.keys()).intersection(requirements_by_node.keys()):
             requirements_by_node.pop(node)
@@ -112,9 +141,12 @@ class ResolverReach:
         else:
             satisfiable_requirements = frozenset()
 
-        return ResolverReach(reach_nodes, path_to_node,
-                             satisfiable_requirements,
-                             logic)
+        result = ResolverReach(reach_nodes, path_to_node,
+                               satisfiable_requirements,
+                               logic)
+        result._patches = initial_state.patches
+        logic.add_cached_reach(cache_key, result, dependencies)
+        return result
 
     def possible_actions(self,
                          state: State) -> Iterator[Tuple[ResourceNode, int]]:
@@ -1,4 +1,3 @@
-import copy
 from typing import Optional, Tuple, Iterator
 
 from randovania.game_description.game_patches import GamePatches
@@ -9,6 +8,8 @@ from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources, \
     add_resource_gain_to_current_resources, add_resources_into_another, convert_resource_gain_to_current_resources
+from randovania.game_description.resources.resource_type import ResourceType
+from randovania.game_description.resources.resource_vector import ResourceVector, resource_vector_for
 
 
 def _energy_tank_difference(new_resources: CurrentResources,
@@ -19,7 +20,7 @@ def _energy_tank_difference(new_resources: CurrentResources,
 
 
 class State:
-    resources: CurrentResources
+    resources: ResourceVector
     collected_resource_nodes: Tuple[ResourceNode, ...]
     energy: int
     node: Node
@@ -37,7 +38,7 @@ class State:
                  previous: Optional["State"],
                  resource_database: ResourceDatabase):
 
-        self.resources = resources
+        self.resources = resource_vector_for(resource_database, resources)
         self.collected_resource_nodes = collected_resource_nodes
         self.node = node
         self.patches = patches
@@ -52,7 +53,7 @@ class State:
         return self.resources.get(resource, 0) > 0
 
     def copy(self) -> "State":
-        return State(copy.copy(self.resources),
+        return State(self.resources.copy(),
                      self.collected_resource_nodes,
                      self.energy,
                      self.node,
@@ -62,14 +63,14 @@ class State:
 
     @property
     def collected_pickup_indices(self) -> Iterator[PickupIndex]:
-        for resource, count in self.resources.items():
-            if isinstance(resource, PickupIndex) and count > 0:
+        for resource, count in self.resources.resources_of_type(ResourceType.PICKUP_INDEX):
+            if count > 0:
                 yield resource
 
     @property
     def collected_scan_assets(self) -> Iterator[LogbookAsset]:
-        for resource, count in self.resources.items():
-            if isinstance(resource, LogbookAsset) and count > 0:
+        for resource, count in self.resources.resources_of_type(ResourceType.LOGBOOK_INDEX):
+            if count > 0:
                 yield resource
 
     def take_damage(self, damage: int) -> "State":
@@ -100,7 +101,7 @@ class State:
             raise ValueError(
                 "Trying to collect an uncollectable node'{}'".format(node))
 
-        new_resources = copy.copy(self.resources)
+        new_resources = self.resources.copy()
         add_resource_gain_to_current_resources(node.resource_gain_on_collect(self.patches, self.resources),
                                                new_resources)
 
@@ -120,7 +121,7 @@ class State:
         return new_state
 
     def assign_pickup_resources(self, pickup: PickupEntry) -> "State":
-        new_resources = copy.copy(self.resources)
+        new_resources = self.resources.copy()
         add_resource_gain_to_current_resources(pickup.resource_gain(self.resources), new_resources)
 
         energy = self.energy
@@ -143,7 +144,7 @@ class State:
         # Make sure there's no item percentage on starting items
         pickup_resources.pop(self.resource_database.item_percentage, None)
 
-        new_resources = copy.copy(self.resources)
+        new_resources = self.resources.copy()
         add_resources_into_another(new_resources, pickup_resources)
         new_patches = self.patches.assign_extra_initial_items(pickup_resources)
 
@@ -1,5 +1,4 @@
 import datetime
-import functools
 import json
 from typing import Iterator, List, Optional, Callable, Any
 
@@ -10,6 +9,7 @@ from randovania.layout.layout_description import LayoutDescription
 from randovania.layout.preset import Preset
 from randovania.layout.preset_migration import VersionedPreset
 from randovania.network_common.session_state import GameSessionState
+from randovania.server import session_cache
 
 db = peewee.SqliteDatabase(None, pragmas={'foreign_keys': 1})
 
@@ -52,7 +52,6 @@ class User(BaseModel):
         }
 
 
-@functools.lru_cache()
 def _decode_layout_description(s):
     return LayoutDescription.from_json_dict(json.loads(s))
 
@@ -85,12 +84,23 @@ class GameSession(BaseModel):
     @property
     def layout_description(self) -> Optional[LayoutDescription]:
         # FIXME: a server can have an invalid layout description. Likely from an old version!
-        return _decode_layout_description(self.layout_description_json) if self.layout_description_json else None
+        if not self.layout_description_json:
+            return None
+
+        return self.cache.get("layout_description",
+                              lambda: _decode_layout_description(self.layout_description_json))
 
     @layout_description.setter
     def layout_description(self, description: Optional[LayoutDescription]):
         self.layout_description_json = json.dumps(description.as_json) if description is not None else None
 
+    @property
+    def cache(self) -> session_cache.SessionCacheEntry:
+        """
+        Values derived from the current layout description, shared between requests.
+        """
+        return session_cache.cache.for_session(self.id, self.layout_description_json)
+
     @property
     def creation_datetime(self) -> datetime.datetime:
         return datetime.datetime.fromisoformat(self.creation_date)
@@ -106,70 +116,10 @@ class GameSession(BaseModel):
             "creation_date": self.creation_datetime.astimezone(datetime.timezone.utc).isoformat(),
         }
 
-    def create_session_entry(self):
-        description = self.layout_description
-
-        location_to_name = {
-            row: f"Player {row + 1}" for row in range(self.num_rows)
-        }
-        for membership in self.players:
-            if not membership.is_observer:
-                location_to_name[membership.row] = membership.effective_name
-
-        def _describe_action(action: GameSessionTeamAction) -> dict:
-            provider: int = action.provider_row
-            receiver: int = action.receiver_row
-            time = datetime.datetime.fromisoformat(action.time)
-            target = description.all_patches[provider].pickup_assignment[PickupIndex(action.provider_location_index)]
-
-            message = (f"{location_to_name[provider]} found {target.pickup.name} "
-                       f"for {location_to_name[receiver]}.")
-
-            return {
-                "message": message,
-                "time": time.astimezone(datetime.timezone.utc).isoformat(),
-            }
-
-        if description is not None:
-            game_details = {
-                "spoiler": description.permalink.spoiler,
-                "word_hash": description.shareable_word_hash,
-                "seed_hash": description.shareable_hash,
-                "permalink": description.permalink.as_base64_str,
-            }
-        else:
-            game_details = {
-                "spoiler": None,
-                "word_hash": None,
-                "seed_hash": None,
-                "permalink": None,
-            }
-
-        return {
-            "id": self.id,
-            "name": self.name,
-            "state": self.state.value,
-            "players": [
-                membership.as_json
-                for membership in self.players
-            ],
-            "presets": [
-                json.loads(preset.preset)
-                for preset in sorted(self.presets, key=lambda it: it.row)
-            ],
-            "actions": [
-                _describe_action(action)
-                for action in GameSessionTeamAction.select().where(GameSessionTeamAction.session == self
-                                                                   ).order_by(GameSessionTeamAction.time.asc())
-            ],
-            **game_details,
-            "generation_in_progress": (self.generation_in_progress.id
-                                       if self.generation_in_progress is not None else None),
-        }
-
     def reset_layout_description(self):
         self.layout_description_json = None
         self.save()
+        session_cache.cache.invalidate(self.id)
 
 
 class GameSessionPreset(BaseModel):
@@ -244,6 +194,10 @@ class GameSessionTeamAction(BaseModel):
 
     class Meta:
         primary_key = peewee.CompositeKey('session', 'provider_row', 'provider_location_index')
+        indexes = (
+            # For finding the pickups a player received since a given point
+            (('session', 'receiver_row', 'time'), False),
+        )
 
 
 all_classes = [User, GameSession, GameSessionPreset, GameSessionMembership, GameSessionTeamAction]
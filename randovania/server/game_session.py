@@ -3,7 +3,7 @@ import hashlib
 import json
 import logging
 import typing
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Iterable, Set, Dict
 
 import flask_socketio
 import peewee
@@ -26,10 +26,11 @@ from randovania.network_common.error import WrongPassword, \
     NotAuthorizedForAction, InvalidAction
 from randovania.network_common.pickup_serializer import BitPackPickupEntry
 from randovania.network_common.session_state import GameSessionState
-from randovania.server import database
+from randovania.server import database, session_cache, session_snapshot, self_update_coalescer
 from randovania.server.database import GameSession, GameSessionMembership, GameSessionTeamAction, \
     GameSessionPreset
 from randovania.server.lib import logger
+from randovania.server.self_update_coalescer import MembershipKey, SelfUpdate
 from randovania.server.server_app import ServerApp
 
 
@@ -56,7 +57,7 @@ def create_game_session(sio: ServerApp, session_name: str):
             row=0, admin=True, connection_state="Online, Unknown")
 
     sio.join_game_session(membership)
-    return new_session.create_session_entry()
+    return _create_session_entry(new_session)
 
 
 def join_game_session(sio: ServerApp, session_id: int, password: Optional[str]):
@@ -75,13 +76,14 @@ def join_game_session(sio: ServerApp, session_id: int, password: Optional[str]):
     _emit_session_update(session)
     sio.join_game_session(membership)
 
-    return session.create_session_entry()
+    return _create_session_entry(session)
 
 
 def disconnect_game_session(sio: ServerApp, session_id: int):
     current_user = sio.get_current_user()
     try:
         current_membership = GameSessionMembership.get_by_ids(current_user.id, session_id)
+        self_update_coalescer.coalescer.forget((session_id, current_user.id))
         current_membership.connection_state = "Offline"
         current_membership.save()
         _emit_session_update(current_membership.session)
@@ -131,13 +133,55 @@ def _get_preset(preset_json: dict) -> VersionedPreset:
         raise InvalidAction(f"invalid preset: {e}")
 
 
+def _update_session_snapshot(session: GameSession, create_entry: bool) -> Optional[dict]:
+    """
+    Updates the snapshot of the given session, sending what changed to its members.
+    :param session:
+    :param create_entry: If set, returns the full session entry instead of sending it when the snapshot is new.
+    Members with an older snapshot find out about it with the next delta.
+    :return: The full session entry, if create_entry is set.
+    """
+    snapshot = session_snapshot.for_session(session)
+    with snapshot.lock:
+        is_new = snapshot.version == 0
+        delta = snapshot.update(session)
+
+        if is_new:
+            if not create_entry:
+                flask_socketio.emit("game_session_update", snapshot.create_entry(session.id),
+                                    room=f"game-session-{session.id}", namespace="/")
+        elif delta is not None:
+            flask_socketio.emit("game_session_delta", delta, room=f"game-session-{session.id}", namespace="/")
+
+        if create_entry:
+            return snapshot.create_entry(session.id)
+
+
 def _emit_session_update(session: GameSession):
-    flask_socketio.emit("game_session_update", session.create_session_entry(), room=f"game-session-{session.id}")
+    _update_session_snapshot(session, False)
+
+
+def _create_session_entry(session: GameSession) -> dict:
+    return _update_session_snapshot(session, True)
+
+
+def _emit_session_deleted(session: GameSession):
+    """
+    Sends the final state of a deleted session in full, as its members can't request it anymore.
+    The cache entry of the session is only discarded afterwards, as the snapshot lives in it.
+    """
+    snapshot = session_snapshot.for_session(session)
+    with snapshot.lock:
+        snapshot.update(session)
+        entry = snapshot.create_entry(session.id)
+    session_cache.cache.invalidate(session.id)
+
+    flask_socketio.emit("game_session_update", entry, room=f"game-session-{session.id}", namespace="/")
 
 
 def game_session_request_update(sio: ServerApp, session_id):
     session: database.GameSession = database.GameSession.get_by_id(session_id)
-    return session.create_session_entry()
+    return _create_session_entry(session)
 
 
 def _create_row(sio: ServerApp, session: GameSession, preset_json: dict):
@@ -251,6 +295,8 @@ def _change_layout_description(sio: ServerApp, session: GameSession, description
         session.layout_description = description
         session.save()
 
+    session_cache.cache.invalidate(session.id)
+
 
 def _download_layout_description(sio: ServerApp, session: GameSession):
     try:
@@ -297,6 +343,7 @@ def _finish_session(sio: ServerApp, session: GameSession):
 
 
 def _reset_session(sio: ServerApp, session: GameSession):
+    session_cache.cache.invalidate(session.id)
     raise InvalidAction("Restart session is not yet implemented.")
 
 
@@ -349,6 +396,8 @@ def game_session_admin_session(sio: ServerApp, session_id: int, action: str, arg
     elif action == SessionAdminGlobalAction.DELETE_SESSION:
         logger().info(f"Session {session.id}: Deleting session.")
         session.delete_instance(recursive=True)
+        _emit_session_deleted(session)
+        return
 
     _emit_session_update(session)
 
@@ -371,10 +420,13 @@ def game_session_admin_player(sio: ServerApp, session_id: int, user_id: int, act
     membership = GameSessionMembership.get_by_ids(user_id, session_id)
 
     if action == SessionAdminUserAction.KICK:
+        self_update_coalescer.coalescer.forget((session_id, user_id))
         membership.delete_instance()
         if not list(session.players):
             session.delete_instance(recursive=True)
             logger().info(f"Session {session_id}. Kicking user {user_id} and deleting session.")
+            _emit_session_deleted(session)
+            return
         else:
             logger().info(f"Session {session_id}. Kicking user {user_id}.")
 
@@ -448,12 +500,50 @@ def game_session_admin_player(sio: ServerApp, session_id: int, user_id: int, act
     _emit_session_update(session)
 
 
-def _query_for_actions(membership: GameSessionMembership) -> peewee.ModelSelect:
-    return GameSessionTeamAction.select().where(
+def _query_for_actions(membership: GameSessionMembership, cursor: Optional[dict] = None) -> peewee.ModelSelect:
+    """
+    Selects the actions with pickups for the given member, in the order they happened.
+    :param membership:
+    :param cursor: If given, only actions after the one this cursor was created for are included.
+    :return:
+    """
+    conditions = [
         GameSessionTeamAction.provider_row != membership.row,
         GameSessionTeamAction.session == membership.session,
         GameSessionTeamAction.receiver_row == membership.row,
-    ).order_by(GameSessionTeamAction.time.asc())
+    ]
+    if cursor is not None:
+        time, provider_row, location = cursor["time"], cursor["provider_row"], cursor["location"]
+        conditions.append(
+            (GameSessionTeamAction.time > time)
+            | ((GameSessionTeamAction.time == time) & (
+                    (GameSessionTeamAction.provider_row > provider_row)
+                    | ((GameSessionTeamAction.provider_row == provider_row)
+                       & (GameSessionTeamAction.provider_location_index > location))
+            ))
+        )
+
+    # Ties in time are sorted by the rest of the primary key, so cursors always refer to the same position
+    return GameSessionTeamAction.select().where(*conditions).order_by(
+        GameSessionTeamAction.time.asc(),
+        GameSessionTeamAction.provider_row.asc(),
+        GameSessionTeamAction.provider_location_index.asc(),
+    )
+
+
+def _cursor_for_action(action: GameSessionTeamAction) -> dict:
+    return {
+        "time": str(action.time),
+        "provider_row": action.provider_row,
+        "location": action.provider_location_index,
+    }
+
+
+def _is_valid_cursor(cursor) -> bool:
+    return (isinstance(cursor, dict)
+            and isinstance(cursor.get("time"), str)
+            and isinstance(cursor.get("provider_row"), int)
+            and isinstance(cursor.get("location"), int))
 
 
 def _base64_encode_pickup(pickup: PickupEntry, resource_database: ResourceDatabase) -> str:
@@ -461,45 +551,63 @@ def _base64_encode_pickup(pickup: PickupEntry, resource_database: ResourceDataba
     return base64.b85encode(encoded_pickup).decode("utf-8")
 
 
-def _collect_location(session: GameSession, membership: GameSessionMembership,
-                      description: LayoutDescription,
-                      pickup_location: int) -> Optional[int]:
+def _collect_locations(session: GameSession, membership: GameSessionMembership,
+                       description: LayoutDescription,
+                       pickup_locations: Iterable[int]) -> Set[int]:
     """
-    Collects the pickup in the given location. Returns
+    Collects the pickups in the given locations, creating the actions for all new ones in a single transaction.
     :param session:
     :param membership:
     :param description:
-    :param pickup_location:
-    :return: The rewarded player if some player must be updated of the fact.
+    :param pickup_locations:
+    :return: The rewarded players that must be updated of the fact.
     """
     player_row: int = membership.row
-    pickup_target = _get_pickup_target(description, player_row, pickup_location)
 
-    def log(msg):
-        logger().info(f"Session {session.id}, Row {membership.row} found item at {pickup_location}. {msg}")
+    def log(location, msg):
+        logger().info(f"Session {session.id}, Row {membership.row} found item at {location}. {msg}")
 
-    if pickup_target is None:
-        log(f"It's an ETM.")
-        return None
+    targets = {}
+    for location in dict.fromkeys(pickup_locations):
+        pickup_target = _get_pickup_target(description, player_row, location)
+        if pickup_target is None:
+            log(location, f"It's an ETM.")
+        elif pickup_target.player == player_row:
+            log(location, f"It's a {pickup_target.pickup.name} for themselves.")
+        else:
+            targets[location] = pickup_target
 
-    if pickup_target.player == membership.row:
-        log(f"It's a {pickup_target.pickup.name} for themselves.")
-        return None
+    if not targets:
+        return set()
 
-    try:
-        GameSessionTeamAction.create(
-            session=session,
-            provider_row=membership.row,
-            provider_location_index=pickup_location,
-            receiver_row=pickup_target.player,
-        )
-    except peewee.IntegrityError:
-        # Already exists and it's for another player, no inventory update needed
-        log(f"It's a {pickup_target.pickup.name} for {pickup_target.player}, but it was already collected.")
-        return None
+    with database.db.atomic():
+        existing = {
+            action.provider_location_index
+            for action in GameSessionTeamAction.select(GameSessionTeamAction.provider_location_index).where(
+                GameSessionTeamAction.session == session,
+                GameSessionTeamAction.provider_row == player_row,
+                GameSessionTeamAction.provider_location_index.in_(list(targets.keys())),
+            )
+        }
+        new_rows = []
+        for location, pickup_target in targets.items():
+            if location in existing:
+                # Already exists and it's for another player, no inventory update needed
+                log(location, f"It's a {pickup_target.pickup.name} for {pickup_target.player}, "
+                              f"but it was already collected.")
+            else:
+                log(location, f"It's a {pickup_target.pickup.name} for {pickup_target.player}.")
+                new_rows.append({
+                    "session": session,
+                    "provider_row": player_row,
+                    "provider_location_index": location,
+                    "receiver_row": pickup_target.player,
+                })
+
+        if new_rows:
+            GameSessionTeamAction.insert_many(new_rows).on_conflict_ignore().execute()
 
-    log(f"It's a {pickup_target.pickup.name} for {pickup_target.player}.")
-    return pickup_target.player
+    return {row["receiver_row"] for row in new_rows}
 
 
 def game_session_collect_locations(sio: ServerApp, session_id: int, pickup_locations: Tuple[int, ...]):
@@ -515,27 +623,22 @@ def game_session_collect_locations(sio: ServerApp, session_id: int, pickup_locat
 
     description = session.layout_description
 
-    receiver_players = set()
-    for location in pickup_locations:
-        receiver_player = _collect_location(session, membership, description, location)
-        if receiver_player is not None:
-            receiver_players.add(receiver_player)
-
+    receiver_players = _collect_locations(session, membership, description, pickup_locations)
     if not receiver_players:
         return
 
-    for receiver_player in receiver_players:
-        try:
-            receiver_membership = GameSessionMembership.get_by_session_position(session, row=receiver_player)
-            flask_socketio.emit(
-                "game_has_update",
-                {
-                    "session": session_id,
-                    "row": receiver_player,
-                },
-                room=f"game-session-{receiver_membership.session.id}-{receiver_membership.user.id}")
-        except peewee.DoesNotExist:
-            pass
+    receiver_memberships = GameSessionMembership.select(GameSessionMembership.row, GameSessionMembership.user).where(
+        GameSessionMembership.session == session,
+        GameSessionMembership.row.in_(sorted(receiver_players)),
+    )
+    for receiver_membership in receiver_memberships:
+        flask_socketio.emit(
+            "game_has_update",
+            {
+                "session": session_id,
+                "row": receiver_membership.row,
+            },
+            room=f"game-session-{session_id}-{receiver_membership.user_id}")
     _emit_session_update(session)
 
 
@@ -549,18 +652,22 @@ def _get_pickup_target(description: LayoutDescription, provider: int, location:
     return pickup_assignment.get(PickupIndex(location))
 
 
-def game_session_request_pickups(sio: ServerApp, session_id: int):
-    current_user = sio.get_current_user()
-    your_membership = GameSessionMembership.get_by_ids(current_user.id, session_id)
-    session: GameSession = your_membership.session
-
+def _can_receive_pickups(session: GameSession, membership: GameSessionMembership) -> bool:
     if session.state == GameSessionState.SETUP:
-        logger().info(f"Session {session_id}, Row {your_membership.row} "
+        logger().info(f"Session {session.id}, Row {membership.row} "
                       f"requested pickups, but session is setup.")
-        return []
+        return False
+
+    if membership.is_observer:
+        logger().info(f"Session {session.id}, {membership.user.name} requested pickups, but is an observer.")
+        return False
+
+    return True
+
 
-    if your_membership.is_observer:
-        logger().info(f"Session {session_id}, {current_user.name} requested pickups, but is an observer.")
+def _describe_pickups(session: GameSession, your_membership: GameSessionMembership,
+                      actions: List[GameSessionTeamAction]) -> list:
+    if not actions:
         return []
 
     description = session.layout_description
@@ -569,10 +676,12 @@ def game_session_request_pickups(sio: ServerApp, session_id: int):
         for member in GameSessionMembership.non_observer_members(session)
     }
 
-    resource_database = _get_resource_database(description, your_membership.row)
+    cache = session.cache
+    receiver: int = your_membership.row
+    resource_database = cache.get(("resource_database", receiver),
+                                  lambda: _get_resource_database(description, receiver))
 
     result = []
-    actions: List[GameSessionTeamAction] = list(_query_for_actions(your_membership))
     for action in actions:
         pickup_target = _get_pickup_target(description, action.provider_row, action.provider_location_index)
 
@@ -583,19 +692,100 @@ def game_session_request_pickups(sio: ServerApp, session_id: int):
             name = row_to_member_name.get(action.provider_row, f"Player {action.provider_row + 1}")
             result.append({
                 "message": f"Received {pickup_target.pickup.name} from {name}",
-                "pickup": _base64_encode_pickup(pickup_target.pickup, resource_database),
+                "pickup": cache.get(("pickup", receiver, action.provider_row, action.provider_location_index),
+                                    lambda: _base64_encode_pickup(pickup_target.pickup, resource_database)),
             })
 
+    return result
+
+
+def game_session_request_pickups(sio: ServerApp, session_id: int):
+    """
+    Gets all pickups the current user received in the given session.
+    """
+    current_user = sio.get_current_user()
+    your_membership = GameSessionMembership.get_by_ids(current_user.id, session_id)
+    session: GameSession = your_membership.session
+
+    if not _can_receive_pickups(session, your_membership):
+        return []
+
+    result = _describe_pickups(session, your_membership, list(_query_for_actions(your_membership)))
+
     logger().info(f"Session {session_id}, Row {your_membership.row} "
                   f"requested pickups, returning {len(result)} elements.")
 
     return result
 
 
+def game_session_request_new_pickups(sio: ServerApp, session_id: int, cursor: Optional[dict]):
+    """
+    Gets the pickups the current user received in the given session after the given cursor, as well as a cursor for
+    the next request. When the cursor is None or invalid, all pickups are returned and `full` is set.
+    """
+    current_user = sio.get_current_user()
+    your_membership = GameSessionMembership.get_by_ids(current_user.id, session_id)
+    session: GameSession = your_membership.session
+
+    full = not _is_valid_cursor(cursor)
+    if full:
+        cursor = None
+
+    if not _can_receive_pickups(session, your_membership):
+        return {"cursor": cursor, "full": full, "pickups": []}
+
+    actions: List[GameSessionTeamAction] = list(_query_for_actions(your_membership, cursor))
+    result = _describe_pickups(session, your_membership, actions)
+    if actions:
+        cursor = _cursor_for_action(actions[-1])
+
+    logger().info(f"Session {session_id}, Row {your_membership.row} "
+                  f"requested {'all' if full else 'new'} pickups, returning {len(result)} elements.")
+
+    return {"cursor": cursor, "full": full, "pickups": result}
+
+
+def _persist_self_updates(updates: Dict[MembershipKey, SelfUpdate]):
+    """
+    Writes the given self-updates in a single transaction, then sends one update for each session.
+    """
+    if not updates:
+        return
+
+    with database.db.atomic():
+        for (session_id, user_id), update in updates.items():
+            GameSessionMembership.update(
+                connection_state=f"Online, {update.connection_state}",
+                inventory=update.inventory,
+            ).where(GameSessionMembership.session == session_id,
+                    GameSessionMembership.user == user_id).execute()
+
+    for session in GameSession.select().where(GameSession.id.in_(sorted({key[0] for key in updates}))):
+        _emit_session_update(session)
+
+
+def _flush_self_updates_forever(sio: ServerApp):
+    """
+    Periodically persists the self-updates that were throttled.
+    """
+    while True:
+        # Checking more often than the interval, so updates aren't delayed by much more than it
+        sio.sio.sleep(self_update_coalescer.coalescer.interval / 4)
+        with sio.app.app_context():
+            try:
+                _persist_self_updates(self_update_coalescer.coalescer.take_due())
+            except Exception:
+                logger().exception("Unable to persist self updates")
+
+
 def game_session_self_update(sio: ServerApp, session_id: int, inventory: str, game_connection_state: str):
     current_user = sio.get_current_user()
     membership = GameSessionMembership.get_by_ids(current_user.id, session_id)
 
+    if not self_update_coalescer.coalescer.submit((session_id, current_user.id),
+                                                  SelfUpdate(inventory, game_connection_state)):
+        return
+
     membership.connection_state = f"Online, {game_connection_state}"
     membership.inventory = inventory
     membership.save()
@@ -610,6 +800,7 @@ def report_user_disconnected(sio: ServerApp, user_id: int, log):
     sessions_to_update = []
 
     for membership in memberships:
+        self_update_coalescer.coalescer.forget((membership.session_id, user_id))
         if membership.connection_state != "Offline":
             membership.connection_state = "Offline"
             sessions_to_update.append(membership.session)
@@ -629,4 +820,8 @@ def setup_app(sio: ServerApp):
     sio.on("game_session_admin_player", game_session_admin_player)
     sio.on("game_session_collect_locations", game_session_collect_locations)
     sio.on("game_session_request_pickups", game_session_request_pickups)
+    sio.on("game_session_request_new_pickups", game_session_request_new_pickups)
     sio.on("game_session_self_update", game_session_self_update)
+
+    self_update_coalescer.coalescer.setup_metrics(sio.metrics.registry)
+    sio.sio.start_background_task(_flush_self_updates_forever, sio)
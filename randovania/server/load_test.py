@@ -0,0 +1,271 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Iterator
+
+from cryptography.fernet import Fernet
+
+from randovania.layout.layout_description import LayoutDescription
+from randovania.layout.preset_migration import VersionedPreset
+from randovania.network_client.network_client import NetworkClient
+from randovania.network_common.admin_actions import SessionAdminGlobalAction, SessionAdminUserAction
+
+CURRENT_REPORT_SCHEMA_VERSION = 1
+SERVER_START_TIMEOUT = 30
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadTestConfiguration:
+    num_sessions: int = 10
+    rounds: int = 20
+    locations_per_round: int = 3
+    seed: int = 0
+
+
+class LatencyRecorder:
+    """
+    Collects how long each request took, grouped by event.
+    """
+    latencies: Dict[str, List[float]]
+    errors: Dict[str, int]
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.defaultdict(int)
+
+    def record(self, event: str, seconds: float, failed: bool):
+        self.latencies[event].append(seconds)
+        if failed:
+            self.errors[event] += 1
+
+    def create_report(self, duration_seconds: float) -> dict:
+        total_events = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "schema_version": CURRENT_REPORT_SCHEMA_VERSION,
+            "duration_seconds": duration_seconds,
+            "total_events": total_events,
+            "events_per_second": total_events / duration_seconds if duration_seconds > 0 else 0.0,
+            "errors": sum(self.errors.values()),
+            "events": {
+                event: {
+                    "count": len(latencies),
+                    "errors": self.errors.get(event, 0),
+                    "p50_ms": percentile(latencies, 0.5) * 1000,
+                    "p99_ms": percentile(latencies, 0.99) * 1000,
+                    "max_ms": max(latencies) * 1000,
+                }
+                for event, latencies in sorted(self.latencies.items())
+            },
+        }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    The value that the given fraction of values is less than or equal to, using the nearest-rank method.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        "{:<36} {:>7} {:>7} {:>10} {:>10} {:>10}".format("Event", "Count", "Errors", "p50 (ms)", "p99 (ms)",
+                                                         "max (ms)"),
+    ]
+    for event, stats in report["events"].items():
+        lines.append("{:<36} {:>7} {:>7} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+            event, stats["count"], stats["errors"], stats["p50_ms"], stats["p99_ms"], stats["max_ms"],
+        ))
+    lines.append("{} events in {:.2f}s: {:.1f} events/s, {} errors".format(
+        report["total_events"], report["duration_seconds"], report["events_per_second"], report["errors"],
+    ))
+    return "\n".join(lines)
+
+
+class LoadTestClient(NetworkClient):
+    """
+    A NetworkClient that records how long each of its requests took.
+    """
+    recorder: LatencyRecorder
+
+    def __init__(self, user_data_dir: Path, configuration: dict, recorder: LatencyRecorder):
+        super().__init__(user_data_dir, configuration)
+        self.recorder = recorder
+
+    async def _emit_with_result(self, event, data=None, namespace=None):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await super()._emit_with_result(event, data, namespace)
+            failed = False
+            return result
+        finally:
+            self.recorder.record(event, time.perf_counter() - start, failed)
+
+
+def create_server_configuration(database_path: str) -> dict:
+    """
+    Creates a configuration for a server with new keys, that accepts guests and clients of any version.
+    """
+    return {
+        "discord_client_id": 0,
+        "guest_secret": Fernet.generate_key().decode("ascii"),
+        "server_config": {
+            "secret_key": Fernet.generate_key().decode("ascii"),
+            "discord_client_secret": "",
+            "fernet_key": Fernet.generate_key().decode("ascii"),
+            "database_path": database_path,
+            "client_version_checking": "ignore",
+        },
+    }
+
+
+def _wait_for_port(process: subprocess.Popen, port: int, timeout: float):
+    end = time.monotonic() + timeout
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > end:
+                raise RuntimeError(f"Server didn't start listening on port {port} after {timeout} seconds")
+            time.sleep(0.1)
+
+
+@contextlib.contextmanager
+def local_server(port: int, database_path: Optional[str] = None) -> Iterator[dict]:
+    """
+    Runs a server in another process for the duration of the context, using a new database.
+    :param port:
+    :param database_path: Where the server's SQLite database is. Defaults to a temporary file.
+    ":memory:" keeps it in memory.
+    :return: The client configuration for connecting to the server.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if database_path is None:
+            database_path = str(Path(temp_dir, "load_test.db"))
+
+        configuration = create_server_configuration(database_path)
+        configuration_path = Path(temp_dir, "configuration.json")
+        configuration_path.write_text(json.dumps(configuration))
+
+        process = subprocess.Popen([sys.executable, "-m", "randovania", "--configuration", str(configuration_path),
+                                    "multiworld", "server", "--host", "127.0.0.1", "--port", str(port)])
+        try:
+            _wait_for_port(process, port, SERVER_START_TIMEOUT)
+            yield {
+                "server_address": f"http://127.0.0.1:{port}",
+                "socketio_path": "/socket.io",
+                "guest_secret": configuration["guest_secret"],
+            }
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def generate_layout(player_count: int, seed: int) -> LayoutDescription:
+    """
+    Generates a multiworld layout with the default preset for all players.
+    """
+    from randovania.generator import generator
+    from randovania.interface_common.preset_manager import PresetManager
+    from randovania.layout.permalink import Permalink
+
+    preset = PresetManager(None).default_preset.get_preset()
+    permalink = Permalink(seed_number=seed, spoiler=True,
+                          presets={i: preset for i in range(player_count)})
+    return generator.generate_description(permalink=permalink, status_update=None,
+                                          validate_after_generation=False, timeout=None)
+
+
+async def _play(client: LoadTestClient, locations: List[int], configuration: LoadTestConfiguration):
+    session_id = client.current_game_session.id
+    cursor = None
+    received = 0
+
+    for round_number in range(configuration.rounds):
+        start = round_number * configuration.locations_per_round
+        collected = locations[start:start + configuration.locations_per_round]
+        if collected:
+            await client.game_session_collect_locations(tuple(collected))
+
+        cursor, full, pickups = await client.game_session_request_new_pickups(cursor)
+        received = len(pickups) if full else received + len(pickups)
+
+        inventory = json.dumps([{"index": i, "amount": 1, "capacity": 1} for i in range(received)])
+        await client._emit_with_result("game_session_self_update",
+                                       (session_id, inventory, f"In-Game, round {round_number}"))
+
+
+async def _run_session(index: int, clients: List[LoadTestClient], description: LayoutDescription,
+                       configuration: LoadTestConfiguration):
+    """
+    Runs the lifecycle of a session: the first client creates it and the others join, the layout is uploaded,
+    the session starts, then all players collect locations, request pickups and send self-updates.
+    """
+    admin = clients[0]
+    for i, client in enumerate(clients):
+        await client.connect_to_server()
+        await client.login_as_guest(f"Load Test {index}-{i}")
+
+    await admin.create_new_session(f"Load Test {index}")
+    for row in range(1, len(clients)):
+        preset = VersionedPreset.with_preset(description.permalink.get_preset(row))
+        await admin.session_admin_global(SessionAdminGlobalAction.CREATE_ROW, preset.as_json)
+
+    list_entry = next(entry for entry in await admin.get_game_session_list()
+                      if entry.id == admin.current_game_session.id)
+    for client in clients[1:]:
+        await client.join_game_session(list_entry, None)
+        await client.session_admin_player(client.current_user.id, SessionAdminUserAction.SWITCH_IS_OBSERVER, None)
+
+    await admin.session_admin_global(SessionAdminGlobalAction.UPDATE_LAYOUT_GENERATION, True)
+    await admin.session_admin_global(SessionAdminGlobalAction.CHANGE_LAYOUT_DESCRIPTION, description.as_json)
+    await admin.session_admin_global(SessionAdminGlobalAction.START_SESSION, None)
+
+    rng = random.Random(f"{configuration.seed}-{index}")
+    plays = []
+    # Rows are given in the order the players were included
+    for row, client in enumerate(clients):
+        locations = [pickup_index.index for pickup_index in description.all_patches[row].pickup_assignment.keys()]
+        rng.shuffle(locations)
+        plays.append(_play(client, locations, configuration))
+    await asyncio.gather(*plays)
+
+    for client in clients:
+        await client.disconnect_from_server()
+
+
+async def run_load_test(client_configuration: dict, description: LayoutDescription,
+                        configuration: LoadTestConfiguration, user_data_dir: Path) -> dict:
+    """
+    Runs the configured number of sessions at the same time, each with one client per player of the given layout.
+    :return: The latency of each event and overall throughput.
+    """
+    recorder = LatencyRecorder()
+    sessions = [
+        [
+            LoadTestClient(user_data_dir.joinpath(f"client-{index}-{player}"), client_configuration, recorder)
+            for player in range(description.permalink.player_count)
+        ]
+        for index in range(configuration.num_sessions)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _run_session(index, clients, description, configuration)
+        for index, clients in enumerate(sessions)
+    ])
+    return recorder.create_report(time.perf_counter() - start)
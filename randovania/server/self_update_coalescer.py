@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict, Tuple, Callable, Optional, NamedTuple
+
+import prometheus_client
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_MAX_AGE = 60 * 60
+
+MembershipKey = Tuple[int, int]
+
+
+class SelfUpdate(NamedTuple):
+    inventory: str
+    connection_state: str
+
+
+class _MembershipState:
+    last_persisted: Optional[SelfUpdate]
+    last_persisted_time: float
+    pending: Optional[SelfUpdate]
+
+    def __init__(self):
+        self.last_persisted = None
+        self.last_persisted_time = -float("inf")
+        self.pending = None
+
+
+class SelfUpdateCoalescer:
+    """
+    Limits how often the self-updates of each membership, identified by (session id, user id), are persisted.
+
+    The first update of a membership is persisted right away. Updates arriving less than `interval` seconds after
+    the last persisted one are kept as pending, with newer updates replacing it, until `take_due` returns them.
+    Updates equal to what was last persisted are dropped.
+    """
+    interval: float
+    max_age: float
+    _states: Dict[MembershipKey, _MembershipState]
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_age: float = DEFAULT_MAX_AGE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.max_age = max_age
+        self._clock = clock
+        self._states = {}
+        self._lock = threading.Lock()
+        self._merged_counter = None
+        self._dropped_counter = None
+        self._persisted_counter = None
+
+    def setup_metrics(self, registry):
+        """
+        Creates the counters for this coalescer. Calling it again does nothing, as the counters can only be
+        registered once.
+        """
+        if self._merged_counter is not None:
+            return
+
+        self._merged_counter = prometheus_client.Counter(
+            "self_updates_merged", "Self-updates replaced by a newer one before being persisted.",
+            registry=registry)
+        self._dropped_counter = prometheus_client.Counter(
+            "self_updates_dropped", "Self-updates not persisted as they didn't change anything.",
+            registry=registry)
+        self._persisted_counter = prometheus_client.Counter(
+            "self_updates_persisted", "Self-updates persisted to the database.",
+            registry=registry)
+
+    @staticmethod
+    def _increment(counter):
+        if counter is not None:
+            counter.inc()
+
+    def submit(self, key: MembershipKey, update: SelfUpdate) -> bool:
+        """
+        Registers a new update for the given membership.
+        :param key:
+        :param update:
+        :return: If the update should be persisted right away. Otherwise, it's returned by `take_due` later.
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _MembershipState()
+
+            if state.pending is not None:
+                self._increment(self._merged_counter)
+                state.pending = None
+
+            if update == state.last_persisted:
+                self._increment(self._dropped_counter)
+                return False
+
+            if now - state.last_persisted_time >= self.interval:
+                self._mark_persisted(state, update, now)
+                return True
+
+            state.pending = update
+            return False
+
+    def _mark_persisted(self, state: _MembershipState, update: SelfUpdate, now: float):
+        state.last_persisted = update
+        state.last_persisted_time = now
+        state.pending = None
+        self._increment(self._persisted_counter)
+
+    def take_due(self) -> Dict[MembershipKey, SelfUpdate]:
+        """
+        Gets all pending updates that can be persisted now, considering them persisted.
+        """
+        now = self._clock()
+        result = {}
+        with self._lock:
+            for key, state in list(self._states.items()):
+                if state.pending is not None:
+                    if now - state.last_persisted_time >= self.interval:
+                        result[key] = state.pending
+                        self._mark_persisted(state, state.pending, now)
+
+                elif now - state.last_persisted_time > self.max_age:
+                    del self._states[key]
+
+        return result
+
+    def forget(self, key: MembershipKey):
+        """
+        Discards what's known about the given membership, including any pending update.
+        Used when something else changes the membership, so the pending update doesn't overwrite it.
+        """
+        with self._lock:
+            self._states.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+coalescer = SelfUpdateCoalescer()
@@ -0,0 +1,98 @@
+import collections
+import threading
+import time
+from typing import Dict, Hashable, Callable, TypeVar, Optional
+
+T = TypeVar("T")
+
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_MAX_AGE = 60 * 60
+
+
+class SessionCacheEntry:
+    """
+    Values derived from the layout description of a session, like the decoded description or encoded pickups.
+    """
+    layout_description_json: Optional[str]
+    last_used: float
+    _values: Dict[Hashable, object]
+
+    def __init__(self, layout_description_json: Optional[str], now: float):
+        self.layout_description_json = layout_description_json
+        self.last_used = now
+        self._values = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Gets the value for the given key, creating it with factory if it's not cached yet.
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            result = factory()
+            self._values[key] = result
+            return result
+
+
+class SessionCache:
+    """
+    Keeps a SessionCacheEntry for the most recently used sessions, so requests don't decode the layout description
+    and re-encode pickups every time.
+
+    An entry is only used while the session has the same layout description it was created for. Entries unused for
+    longer than max_age are discarded, as are the least recently used ones when there's more than max_sessions.
+    """
+    max_sessions: int
+    max_age: float
+    _entries: "collections.OrderedDict[int, SessionCacheEntry]"
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, max_age: float = DEFAULT_MAX_AGE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.max_age = max_age
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def for_session(self, session_id: int, layout_description_json: Optional[str]) -> SessionCacheEntry:
+        now = self._clock()
+        with self._lock:
+            self._discard_old(now)
+
+            entry = self._entries.get(session_id)
+            if entry is None or entry.layout_description_json != layout_description_json:
+                entry = SessionCacheEntry(layout_description_json, now)
+                self._entries[session_id] = entry
+            else:
+                entry.last_used = now
+
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+            return entry
+
+    def invalidate(self, session_id: int):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _discard_old(self, now: float):
+        # Entries are ordered by last use, so the old ones are all at the start
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used <= self.max_age:
+                break
+            del self._entries[session_id]
+
+
+cache = SessionCache()
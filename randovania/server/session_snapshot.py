@@ -0,0 +1,211 @@
+import datetime
+import json
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.server.database import GameSession, GameSessionMembership, GameSessionPreset, \
+    GameSessionTeamAction, User
+
+
+def _game_details(session: GameSession) -> dict:
+    description = session.layout_description
+    if description is not None:
+        return {
+            "spoiler": description.permalink.spoiler,
+            "word_hash": description.shareable_word_hash,
+            "seed_hash": description.shareable_hash,
+            "permalink": description.permalink.as_base64_str,
+        }
+    else:
+        return {
+            "spoiler": None,
+            "word_hash": None,
+            "seed_hash": None,
+            "permalink": None,
+        }
+
+
+def _session_fields(session: GameSession) -> dict:
+    return {
+        "name": session.name,
+        "state": session.state.value,
+        "generation_in_progress": session.generation_in_progress_id,
+    }
+
+
+def _location_to_name(num_rows: int, memberships: List[GameSessionMembership]) -> Dict[int, str]:
+    location_to_name = {
+        row: f"Player {row + 1}" for row in range(num_rows)
+    }
+    for membership in memberships:
+        if not membership.is_observer:
+            location_to_name[membership.row] = membership.effective_name
+    return location_to_name
+
+
+def _action_key(action: GameSessionTeamAction) -> Tuple[str, int, int]:
+    return action.time, action.provider_row, action.provider_location_index
+
+
+class SessionSnapshot:
+    """
+    The session entry last sent to the members of a session, so later updates only need to send what changed.
+
+    Each update that changes something increments the version. Versions only make sense for the same snapshot, so
+    entries and deltas also include the snapshot id. A client that receives a delta for a different snapshot or that
+    skips a version should request the full entry instead.
+    """
+    snapshot_id: str
+    version: int
+    lock: threading.Lock
+    _fields: dict
+    _game_details: Optional[dict]
+    _players: Dict[int, dict]
+    _preset_strings: List[str]
+    _presets: List[dict]
+    _location_to_name: Dict[int, str]
+    _actions: List[dict]
+    _last_action: Optional[Tuple[str, int, int]]
+
+    def __init__(self):
+        self.snapshot_id = uuid.uuid4().hex
+        self.version = 0
+        self.lock = threading.Lock()
+        self._fields = {}
+        self._game_details = None
+        self._players = {}
+        self._preset_strings = []
+        self._presets = []
+        self._location_to_name = {}
+        self._actions = []
+        self._last_action = None
+
+    def _describe_action(self, session: GameSession, action: GameSessionTeamAction) -> dict:
+        provider: int = action.provider_row
+        receiver: int = action.receiver_row
+        time = datetime.datetime.fromisoformat(action.time)
+        target = session.layout_description.all_patches[provider].pickup_assignment[
+            PickupIndex(action.provider_location_index)]
+
+        message = (f"{self._location_to_name[provider]} found {target.pickup.name} "
+                   f"for {self._location_to_name[receiver]}.")
+
+        return {
+            "message": message,
+            "time": time.astimezone(datetime.timezone.utc).isoformat(),
+        }
+
+    def _query_actions(self, session: GameSession, after_last: bool) -> List[GameSessionTeamAction]:
+        query = GameSessionTeamAction.select().where(GameSessionTeamAction.session == session)
+        if after_last and self._last_action is not None:
+            time, provider_row, location = self._last_action
+            query = query.where(
+                (GameSessionTeamAction.time > time)
+                | ((GameSessionTeamAction.time == time) & (
+                        (GameSessionTeamAction.provider_row > provider_row)
+                        | ((GameSessionTeamAction.provider_row == provider_row)
+                           & (GameSessionTeamAction.provider_location_index > location))
+                ))
+            )
+        return list(query.order_by(GameSessionTeamAction.time.asc(),
+                                   GameSessionTeamAction.provider_row.asc(),
+                                   GameSessionTeamAction.provider_location_index.asc()))
+
+    def update(self, session: GameSession) -> Optional[dict]:
+        """
+        Brings the snapshot up to date with the given session. Only what's needed to find out what changed is read,
+        so presets are only parsed and actions only described when they're new.
+        Must be called with the lock held.
+        :param session:
+        :return: The delta to the previous version, or None if nothing changed.
+        """
+        memberships: List[GameSessionMembership] = list(
+            GameSessionMembership.select(GameSessionMembership, User).join(User).where(
+                GameSessionMembership.session == session
+            )
+        )
+        preset_strings = [
+            preset.preset
+            for preset in GameSessionPreset.select(GameSessionPreset.row, GameSessionPreset.preset).where(
+                GameSessionPreset.session == session
+            ).order_by(GameSessionPreset.row.asc())
+        ]
+
+        changes = {}
+        for key, value in _session_fields(session).items():
+            if key not in self._fields or self._fields[key] != value:
+                changes[key] = self._fields[key] = value
+
+        if self._game_details is None:
+            # The snapshot is discarded together with the rest of the cache when the layout description changes
+            self._game_details = _game_details(session)
+            changes.update(self._game_details)
+
+        if preset_strings != self._preset_strings:
+            self._presets = [
+                self._presets[row] if row < len(self._preset_strings) and self._preset_strings[row] == preset
+                else json.loads(preset)
+                for row, preset in enumerate(preset_strings)
+            ]
+            self._preset_strings = preset_strings
+            changes["presets"] = list(self._presets)
+
+        players_json = {membership.user_id: membership.as_json for membership in memberships}
+        changed_players = [player for user_id, player in players_json.items()
+                           if self._players.get(user_id) != player]
+        removed_players = [user_id for user_id in self._players if user_id not in players_json]
+        for user_id in removed_players:
+            del self._players[user_id]
+        for player in changed_players:
+            self._players[player["id"]] = player
+
+        new_actions = []
+        location_to_name = _location_to_name(len(preset_strings), memberships)
+        if location_to_name != self._location_to_name:
+            # Names are part of the messages, so all actions need to be described again
+            self._location_to_name = location_to_name
+            actions = self._query_actions(session, False)
+            self._actions = [self._describe_action(session, action) for action in actions]
+            self._last_action = _action_key(actions[-1]) if actions else None
+            changes["actions"] = list(self._actions)
+        else:
+            actions = self._query_actions(session, True)
+            if actions:
+                new_actions = [self._describe_action(session, action) for action in actions]
+                self._actions.extend(new_actions)
+                self._last_action = _action_key(actions[-1])
+
+        if not (changes or changed_players or removed_players or new_actions):
+            return None
+
+        self.version += 1
+        return {
+            "id": session.id,
+            "snapshot": self.snapshot_id,
+            "version": self.version,
+            "changes": changes,
+            "players": changed_players,
+            "removed_players": removed_players,
+            "new_actions": new_actions,
+        }
+
+    def create_entry(self, session_id: int) -> dict:
+        """
+        Creates the full session entry of the current version. Must be called with the lock held.
+        """
+        return {
+            "id": session_id,
+            **self._fields,
+            "players": list(self._players.values()),
+            "presets": list(self._presets),
+            "actions": list(self._actions),
+            **self._game_details,
+            "snapshot": self.snapshot_id,
+            "version": self.version,
+        }
+
+
+def for_session(session: GameSession) -> SessionSnapshot:
+    return session.cache.get("snapshot", SessionSnapshot)
@@ -19,6 +19,7 @@ def test_distribute_command_logic(no_retry: bool, preset_name: str, mocker, pres
     args.no_retry = no_retry
     args.preset_name = preset_name
     args.seed_number = 0
+    args.evaluation_workers = 0
     extra_args = {}
     if no_retry:
         extra_args["attempts"] = 0
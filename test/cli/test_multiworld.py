@@ -1,4 +1,6 @@
 import argparse
+import json
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
@@ -10,12 +12,37 @@ def test_server_command_logic(mocker):
     # Setup
     mock_create_app: MagicMock = mocker.patch("randovania.server.app.create_app")
 
+    args = argparse.Namespace(host="0.0.0.0", port=5000)
+
     # Run
-    multiworld.server_command_logic(None)
+    multiworld.server_command_logic(args)
 
     # Assert
     mock_create_app.assert_called_once_with()
-    mock_create_app.return_value.sio.sio.run(mock_create_app.return_value, host="0.0.0.0")
+    mock_create_app.return_value.sio.sio.run.assert_called_once_with(mock_create_app.return_value,
+                                                                     host="0.0.0.0", port=5000)
+
+
+def test_load_test_command_logic(mocker, tmp_path):
+    mock_from_file = mocker.patch("randovania.layout.layout_description.LayoutDescription.from_file")
+    mock_local_server = mocker.patch("randovania.server.load_test.local_server")
+    mock_run = mocker.patch("randovania.server.load_test.run_load_test", new_callable=MagicMock)
+    mock_asyncio_run = mocker.patch("asyncio.run", return_value={"events": {}, "total_events": 0,
+                                                                 "duration_seconds": 1.0, "events_per_second": 0.0,
+                                                                 "errors": 0})
+    args = argparse.Namespace(sessions=3, players=2, layout=Path("layout.rdvgame"), rounds=4, locations_per_round=5,
+                              seed=6, port=5050, database=":memory:", output=tmp_path.joinpath("report.json"))
+
+    # Run
+    multiworld.load_test_command_logic(args)
+
+    # Assert
+    mock_from_file.assert_called_once_with(Path("layout.rdvgame"))
+    mock_local_server.assert_called_once_with(5050, ":memory:")
+    mock_asyncio_run.assert_called_once_with(mock_run.return_value)
+    configuration = mock_run.call_args[0][2]
+    assert (configuration.num_sessions, configuration.rounds, configuration.locations_per_round) == (3, 4, 5)
+    assert json.loads(args.output.read_text()) == mock_asyncio_run.return_value
 
 
 def test_create_subparsers():
@@ -29,6 +29,12 @@ def echo_tool(request, test_files_dir) -> Path:
     return test_files_dir.joinpath("echo_tool.py")
 
 
+@pytest.fixture
+def run_benchmarks(request):
+    if not request.config.option.run_benchmarks:
+        pytest.skip()
+
+
 @pytest.fixture()
 def simple_data(test_files_dir: Path) -> dict:
     with test_files_dir.joinpath("small_game_data.json").open("r") as small_game_data:
@@ -111,6 +117,8 @@ def pytest_addoption(parser):
                      default=False, help="Skips running GUI tests")
     parser.addoption('--skip-echo-tool', action='store_true', dest="skip_echo_tool",
                      default=False, help="Skips running tests that uses the echo tool")
+    parser.addoption('--run-benchmarks', action='store_true', dest="run_benchmarks",
+                     default=False, help="Runs the generation and validation benchmarks")
 
 
 try:
@@ -2,7 +2,7 @@ import copy
 import struct
 
 import pytest
-from mock import AsyncMock, call
+from mock import AsyncMock, MagicMock, call
 
 from randovania.game_connection import connection_backend
 from randovania.game_connection.connection_backend import ConnectionBackend, MemoryOperation
@@ -126,10 +126,15 @@ async def test_send_message_on_cooldown(backend):
 async def test_get_inventory(backend):
     # Setup
     backend.patches = dol_patcher.ALL_VERSIONS_PATCHES[0]
-    backend._perform_memory_operations.return_value = [
-        struct.pack(">II", item.index, item.index)
-        for item in backend.game.resource_database.item
-    ]
+    player_state = bytearray(connection_backend._powerup_offset(1000))
+    for item in backend.game.resource_database.item:
+        offset = connection_backend._powerup_offset(item.index)
+        player_state[offset:offset + 8] = struct.pack(">II", item.index, item.index)
+
+    async def perform(ops):
+        return [bytes(player_state[op.offset:op.offset + op.read_byte_count]) for op in ops]
+
+    backend._perform_memory_operations.side_effect = perform
 
     # Run
     inventory = await backend._get_inventory()
@@ -139,6 +144,7 @@ async def test_get_inventory(backend):
         item: InventoryItem(item.index, item.index)
         for item in backend.game.resource_database.item
     }
+    backend._perform_memory_operations.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -294,13 +300,15 @@ async def test_update_inventory_with_change(backend, item):
 async def test_update_current_world_invalid(backend, query_result):
     # Setup
     backend.patches = dol_patcher.ALL_VERSIONS_PATCHES[0]
-    backend._perform_memory_operations = AsyncMock(return_value=[query_result])
+    backend._perform_memory_operations = AsyncMock(return_value=[query_result, None, None])
 
     # Run
     await backend._update_current_world()
 
     # Assert
     assert backend._world is None
+    assert backend._game_state_changed
+    assert backend._magic_item is None
 
 
 @pytest.mark.asyncio
@@ -308,13 +316,25 @@ async def test_update_current_world_present(backend):
     # Setup
     backend.patches = dol_patcher.ALL_VERSIONS_PATCHES[0]
     world = backend.game.world_list.worlds[0]
-    backend._perform_memory_operations = AsyncMock(return_value=[world.world_asset_id.to_bytes(4, "big")])
+    backend._perform_memory_operations = AsyncMock(return_value=[
+        world.world_asset_id.to_bytes(4, "big"),
+        struct.pack(">II", 0, 3),
+        struct.pack(">II", 10, 10),
+    ])
+
+    backend._clear_pointer_cache = MagicMock()
 
     # Run
     await backend._update_current_world()
+    first_changed = backend._game_state_changed
+    await backend._update_current_world()
 
     # Assert
     assert backend._world is world
+    backend._clear_pointer_cache.assert_called_once_with()
+    assert first_changed
+    assert not backend._game_state_changed
+    assert backend._magic_item == InventoryItem(0, 3)
 
 
 @pytest.mark.parametrize("has_light_suit", [False, True])
@@ -342,3 +362,132 @@ async def test_perform_write_inventory_dark_suit(backend, echoes_game_descriptio
         offset=84,
         write_bytes=b"\x00\x00\x00\x02" if has_light_suit else b"\x00\x00\x00\x01",
     )
+
+
+def test_memory_operation_plan_merges_reads():
+    ops = [
+        MemoryOperation(0x1000, offset=0x10, read_byte_count=8),
+        MemoryOperation(0x1000, offset=0x1c, read_byte_count=8),
+        MemoryOperation(0x2000, offset=0x14, read_byte_count=4),
+        MemoryOperation(0x1000, offset=0x0c, read_byte_count=8),
+        MemoryOperation(0x1000, offset=0x100, read_byte_count=4),
+        MemoryOperation(0x80001000, read_byte_count=4),
+        MemoryOperation(0x80001004, read_byte_count=4),
+    ]
+
+    # Run
+    plan = connection_backend.MemoryOperationPlan(ops)
+    result = plan.split_results([bytes(range(0x0c, 0x24)), b"ptr2", b"far!", b"abcdefgh"])
+
+    # Assert
+    assert plan.merged_ops == [
+        MemoryOperation(0x1000, offset=0x0c, read_byte_count=0x18),
+        ops[2],
+        ops[4],
+        MemoryOperation(0x80001000, read_byte_count=8),
+    ]
+    assert result == [
+        bytes(range(0x10, 0x18)),
+        bytes(range(0x1c, 0x24)),
+        b"ptr2",
+        bytes(range(0x0c, 0x14)),
+        b"far!",
+        b"abcd",
+        b"efgh",
+    ]
+
+
+def test_memory_operation_plan_limits():
+    ops = [
+        MemoryOperation(0x1000, offset=0, read_byte_count=8),
+        MemoryOperation(0x1000, offset=8, read_byte_count=8),
+        MemoryOperation(0x1000, offset=16, read_byte_count=8),
+        MemoryOperation(0x1000, offset=100, read_byte_count=8),
+    ]
+
+    # Run
+    plan = connection_backend.MemoryOperationPlan(ops, max_gap=0, max_read_size=16)
+    result = plan.split_results([None, b"C" * 8, b"D" * 8])
+
+    # Assert
+    assert plan.merged_ops == [
+        MemoryOperation(0x1000, offset=0, read_byte_count=16),
+        ops[2],
+        ops[3],
+    ]
+    assert result == [None, None, b"C" * 8, b"D" * 8]
+
+
+def test_memory_operation_plan_writes():
+    ops = [
+        MemoryOperation(0x1000, offset=0, read_byte_count=4),
+        MemoryOperation(0x1000, offset=0, write_bytes=b"AAAA"),
+        MemoryOperation(0x1000, offset=4, write_bytes=b"BBBB"),
+        MemoryOperation(0x1000, offset=12, write_bytes=b"CCCC"),
+        MemoryOperation(0x1000, offset=16, write_bytes=b"DDDD", read_byte_count=4),
+        MemoryOperation(0x1000, offset=4, read_byte_count=4),
+    ]
+
+    # Run
+    plan = connection_backend.MemoryOperationPlan(ops)
+    result = plan.split_results([b"0000", None, None, b"dddd", b"BBBB"])
+
+    # Assert
+    assert plan.merged_ops == [
+        ops[0],
+        MemoryOperation(0x1000, offset=0, write_bytes=b"AAAABBBB"),
+        ops[3],
+        ops[4],
+        ops[5],
+    ]
+    assert result == [b"0000", None, None, None, b"dddd", b"BBBB"]
+
+
+@pytest.mark.parametrize(["changed", "time_since_scan", "magic_item", "checking", "expect_scan", "expect_check"], [
+    (False, 0.0, InventoryItem(0, 0), True, False, False),
+    (True, 0.0, InventoryItem(0, 0), True, True, False),
+    (False, 9.5, InventoryItem(0, 0), True, True, False),
+    (False, 0.0, InventoryItem(2, 2), True, True, True),
+    (False, 0.0, InventoryItem(2, 2), False, False, False),
+    (False, 0.0, None, True, True, True),
+])
+@pytest.mark.asyncio
+async def test_interact_with_game(backend, changed, time_since_scan, magic_item, checking, expect_scan, expect_check):
+    # Setup
+    async def update_current_world():
+        backend._world = True
+        backend._game_state_changed = changed
+        backend._magic_item = magic_item
+
+    backend._update_current_world = update_current_world
+    backend._send_message_from_queue = AsyncMock()
+    backend._get_inventory = AsyncMock(return_value={})
+    backend._check_for_collected_index = AsyncMock()
+    backend._time_since_inventory_scan = time_since_scan
+    backend.checking_for_collected_index = checking
+
+    # Run
+    await backend._interact_with_game(1)
+
+    # Assert
+    backend._send_message_from_queue.assert_awaited_once_with(1)
+    if expect_scan:
+        backend._get_inventory.assert_awaited_once_with()
+        assert backend._time_since_inventory_scan == 0
+    else:
+        backend._get_inventory.assert_not_awaited()
+        assert backend._time_since_inventory_scan == time_since_scan + 1
+    if expect_check:
+        backend._check_for_collected_index.assert_awaited_once_with()
+    else:
+        backend._check_for_collected_index.assert_not_awaited()
+
+
+def test_needs_collected_index_check_permanent_pickups(backend):
+    backend._magic_item = InventoryItem(0, 1)
+
+    backend.set_permanent_pickups([MagicMock()])
+    assert not backend._needs_collected_index_check()
+
+    backend.set_permanent_pickups([MagicMock(), MagicMock()])
+    assert backend._needs_collected_index_check()
@@ -0,0 +1,25 @@
+from randovania.game_connection.connection_backend import MemoryOperation
+from randovania.game_connection.connection_statistics import ConnectionStatistics
+
+
+def test_record_and_rates():
+    now = 100.0
+    statistics = ConnectionStatistics(window=10.0, clock=lambda: now)
+
+    # Run
+    statistics.record([
+        MemoryOperation(0x1000, read_byte_count=8),
+        MemoryOperation(0x1000, offset=4, write_bytes=b"1234"),
+        MemoryOperation(0x2000, read_byte_count=4),
+    ], [b"A" * 8, None, None], requests=2)
+    now = 105.0
+    statistics.record([MemoryOperation(0x1000, read_byte_count=10)], [b"B" * 10])
+    rates_before = (statistics.requests_per_second, statistics.reads_per_second, statistics.bytes_per_second)
+    now = 112.0
+
+    # Assert
+    assert (statistics.requests, statistics.reads, statistics.writes) == (3, 3, 1)
+    assert (statistics.bytes_read, statistics.bytes_written) == (18, 4)
+    assert rates_before == (0.3, 0.3, 2.2)
+    assert (statistics.requests_per_second, statistics.reads_per_second, statistics.bytes_per_second) == (0.1, 0.1, 1.0)
+    assert str(statistics) == "0.1 requests/s, 0.1 reads/s, 1 bytes/s"
@@ -107,3 +107,91 @@ async def test_perform_memory_operations(backend: DolphinBackend):
         call(0x80002000, 10),
     ])
     backend.dolphin.write_bytes.assert_called_once_with(0x80003000 + 10, b"1" * 30)
+
+
+@pytest.mark.asyncio
+async def test_perform_memory_operations_pointer_cache(backend: DolphinBackend):
+    backend.dolphin.follow_pointers.side_effect = [0x80003000, 0x80004000]
+    backend.dolphin.read_bytes.return_value = b"A" * 4
+    op = MemoryOperation(0x80001000, offset=20, read_byte_count=4)
+
+    # Run
+    await backend._perform_memory_operations([op])
+    await backend._perform_memory_operations([op])
+    backend._clear_pointer_cache()
+    await backend._perform_memory_operations([op])
+
+    # Assert
+    assert backend.dolphin.follow_pointers.call_count == 2
+    backend.dolphin.read_bytes.assert_has_calls([
+        call(0x80003000 + 20, 4),
+        call(0x80003000 + 20, 4),
+        call(0x80004000 + 20, 4),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_perform_memory_operations_invalid_pointer_not_cached(backend: DolphinBackend):
+    backend.dolphin.follow_pointers.side_effect = [0x0, 0x80003000]
+    backend.dolphin.read_bytes.return_value = b"A" * 4
+    op = MemoryOperation(0x80001000, offset=20, read_byte_count=4)
+
+    # Run
+    first = await backend._perform_memory_operations([op])
+    second = await backend._perform_memory_operations([op])
+
+    # Assert
+    assert first == [None]
+    assert second == [b"A" * 4]
+    assert backend.dolphin.follow_pointers.call_count == 2
+    backend.dolphin.read_bytes.assert_called_once_with(0x80003000 + 20, 4)
+
+
+def test_ensure_hooked_clears_pointer_cache(backend: DolphinBackend):
+    backend._pointer_cache[0x80001000] = 0x80003000
+    backend.dolphin.is_hooked.return_value = False
+
+    # Run
+    backend._ensure_hooked()
+
+    # Assert
+    assert backend._pointer_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_perform_memory_operations_game_state_pointer_changed(backend: DolphinBackend):
+    # Setup
+    backend.patches = MagicMock()
+    backend.patches.game_state_pointer = 0x80001000
+    resolved = {0x80001000: 0x80003000, 0x80002000: 0x80004000}
+    backend.dolphin.follow_pointers.side_effect = lambda pointer, offsets: resolved[pointer]
+    backend.dolphin.read_bytes.return_value = b"A" * 4
+    ops = [
+        MemoryOperation(0x80001000, offset=4, read_byte_count=4),
+        MemoryOperation(0x80002000, offset=20, read_byte_count=4),
+    ]
+
+    # Run
+    await backend._perform_memory_operations(ops)
+    await backend._perform_memory_operations(ops)
+    # A save was loaded: the world is the same, but the game state and player state moved
+    resolved.update({0x80001000: 0x80005000, 0x80002000: 0x80006000})
+    await backend._perform_memory_operations(ops)
+
+    # Assert
+    backend.dolphin.follow_pointers.assert_has_calls([
+        call(0x80001000, [0]),
+        call(0x80002000, [0]),
+        call(0x80001000, [0]),
+        call(0x80001000, [0]),
+        call(0x80002000, [0]),
+    ])
+    assert backend.dolphin.follow_pointers.call_count == 5
+    backend.dolphin.read_bytes.assert_has_calls([
+        call(0x80003000 + 4, 4),
+        call(0x80004000 + 20, 4),
+        call(0x80003000 + 4, 4),
+        call(0x80004000 + 20, 4),
+        call(0x80005000 + 4, 4),
+        call(0x80006000 + 20, 4),
+    ])
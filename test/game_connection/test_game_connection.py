@@ -4,6 +4,7 @@ import pytest
 from mock import AsyncMock
 
 from randovania.game_connection.connection_backend import ConnectionBackend
+from randovania.game_connection.connection_base import GameConnectionStatus
 from randovania.game_connection.dolphin_backend import DolphinBackend
 from randovania.game_connection.game_connection import GameConnection
 
@@ -55,6 +56,30 @@ async def test_update(skip_qtbot, qapp):
     game_connection._notify_status.assert_called_once_with()
 
 
+@pytest.mark.asyncio
+async def test_update_backoff_while_disconnected(skip_qtbot, qapp):
+    # Setup
+    backend = MagicMock()
+    backend.update = AsyncMock()
+    backend.current_status = GameConnectionStatus.Disconnected
+
+    game_connection = GameConnection(backend)
+    game_connection._notify_status = MagicMock()
+
+    # Run
+    await game_connection._update()
+    first = game_connection._timer.interval()
+    await game_connection._update()
+    second = game_connection._timer.interval()
+    backend.current_status = GameConnectionStatus.InGame
+    await game_connection._update()
+    connected = game_connection._timer.interval()
+
+    # Assert
+    assert (first, second, connected) == (1000, 2000, 1000)
+    backend.update.assert_has_awaits([call(1.0), call(1.0), call(2.0)])
+
+
 def test_pretty_current_status(skip_qtbot):
     # Setup
     connection = GameConnection(DolphinBackend())
@@ -1,9 +1,12 @@
+import asyncio
+
 import pytest
 from mock import MagicMock, AsyncMock, call
 
+from randovania.game_connection import connection_backend
 from randovania.game_connection.connection_backend import MemoryOperation
 from randovania.game_connection.connection_base import GameConnectionStatus
-from randovania.game_connection.nintendont_backend import NintendontBackend, SocketHolder
+from randovania.game_connection.nintendont_backend import NintendontBackend, SocketHolder, RequestBatch
 
 
 @pytest.fixture(name="backend")
@@ -19,9 +22,9 @@ async def test_perform_memory_operations(backend: NintendontBackend):
     backend._socket.max_output = 100
     backend._socket.max_addresses = 8
     backend._socket.writer.drain = AsyncMock()
-    backend._socket.reader.read = AsyncMock(side_effect=[
-        b"\x03" + b"A" * 50 + b"B" * 30,
-        b"\x01" + b"C" * 50,
+    backend._socket.reader.readexactly = AsyncMock(side_effect=[
+        b"\x03", b"A" * 50 + b"B" * 30,
+        b"\x01", b"C" * 50,
     ])
 
     # Run
@@ -40,7 +43,7 @@ async def test_perform_memory_operations(backend: NintendontBackend):
         call(b'\x00\x03\x02\x01\x00\x00\x10\x00\x00\x00\x20\x00' + b'\x80\x32' + b'\x81\x0A' + b'\x81\x0A'),
     ])
     assert result == [b"A" * 50, b"B" * 30, b"C" * 50, None, None]
-    backend._socket.reader.read.assert_has_awaits([call(1024), call(1024)])
+    backend._socket.reader.readexactly.assert_has_awaits([call(1), call(80), call(1), call(50)])
 
 
 @pytest.mark.asyncio
@@ -50,7 +53,7 @@ async def test_perform_single_giant_memory_operation(backend: NintendontBackend)
     backend._socket.max_output = 100
     backend._socket.max_addresses = 8
     backend._socket.writer.drain = AsyncMock()
-    backend._socket.reader.read = AsyncMock(side_effect=[
+    backend._socket.reader.readexactly = AsyncMock(side_effect=[
         b"\x01",
         b"\x01",
     ])
@@ -67,15 +70,129 @@ async def test_perform_single_giant_memory_operation(backend: NintendontBackend)
         call(b'\x00\x01\x01\x01\x00\x00\x10\x64' + b'\x40\x64' + (b"1" * 100)),
     ])
     assert result is None
-    backend._socket.reader.read.assert_has_awaits([call(1024), call(1024)])
+    backend._socket.reader.readexactly.assert_has_awaits([call(1), call(1)])
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 2, 4])
+@pytest.mark.asyncio
+async def test_send_requests_pipelined(backend: NintendontBackend, max_in_flight):
+    backend.max_in_flight_requests = max_in_flight
+    backend._socket = MagicMock()
+    backend._socket.max_input = 120
+    backend._socket.max_output = 100
+    backend._socket.max_addresses = 8
+    backend._socket.writer.drain = AsyncMock()
+
+    events = []
+    responses = [b"\x01", b"A" * 60, b"\x01", b"B" * 60, b"\x01", b"C" * 60]
+
+    async def readexactly(size):
+        events.append(("read", size))
+        return responses.pop(0)
+
+    backend._socket.writer.write.side_effect = lambda data: events.append(("write", len(data)))
+    backend._socket.reader.readexactly = readexactly
+
+    # Run
+    result = await backend._perform_memory_operations([
+        MemoryOperation(0x1000, read_byte_count=60),
+        MemoryOperation(0x2000, read_byte_count=60),
+        MemoryOperation(0x3000, read_byte_count=60),
+    ])
+
+    # Assert
+    assert result == [b"A" * 60, b"B" * 60, b"C" * 60]
+    writes_before_first_read = events.index(("read", 1))
+    assert writes_before_first_read == min(max_in_flight, 3)
+    assert [event for event in events if event[0] == "read"] == [("read", 1), ("read", 60)] * 3
+
+
+@pytest.mark.asyncio
+async def test_send_requests_connection_closed(backend: NintendontBackend):
+    backend._socket = MagicMock()
+    backend._socket.max_input = 120
+    backend._socket.max_output = 100
+    backend._socket.max_addresses = 8
+    backend._socket.writer.drain = AsyncMock()
+    backend._socket.reader.readexactly = AsyncMock(side_effect=[
+        b"\x01", asyncio.IncompleteReadError(b"A" * 10, 60),
+    ])
+
+    # Run
+    with pytest.raises(RuntimeError, match="Unable to connect"):
+        await backend._perform_memory_operations([MemoryOperation(0x1000, read_byte_count=60)])
+
+    # Assert
+    assert backend._socket is None
+
+
+
+def test_prepare_requests_op_limit(backend: NintendontBackend):
+    backend._socket = MagicMock()
+    backend._socket.max_input = 10000
+    backend._socket.max_output = 10000
+    backend._socket.max_addresses = 8
+
+    # Run
+    requests = backend._prepare_requests_for([
+        MemoryOperation(0x1000, offset=i, write_bytes=b"1")
+        for i in range(600)
+    ])
 
+    # Assert
+    assert [len(request.ops) for request in requests] == [255, 255, 90]
+    assert [request.build_request_data()[1] for request in requests] == [255, 255, 90]
+
+
+@pytest.mark.parametrize("max_output", [100, 10000])
+def test_prepare_requests_for_planned_reads(backend: NintendontBackend, max_output):
+    backend._socket = MagicMock()
+    backend._socket.max_input = 10000
+    backend._socket.max_output = max_output
+    backend._socket.max_addresses = 8
+    ops = [
+        MemoryOperation(0x1000, offset=connection_backend._powerup_offset(i), read_byte_count=8)
+        for i in range(40)
+    ]
+
+    # Run
+    plan = connection_backend.MemoryOperationPlan(ops, max_read_size=backend._max_read_size)
+    requests = backend._prepare_requests_for(plan.merged_ops)
+
+    # Assert
+    assert all(op.read_byte_count <= min(max_output - 1, 255) for op in plan.merged_ops)
+    assert all(request.output_bytes <= max_output for request in requests)
+    assert sum(len(request.ops) for request in requests) == len(plan.merged_ops)
+
+
+@pytest.mark.parametrize("op", [
+    MemoryOperation(0x1000, read_byte_count=4),
+    MemoryOperation(0x1000, offset=2, read_byte_count=30),
+    MemoryOperation(0x2000, write_bytes=b"1" * 20),
+    MemoryOperation(0x3000, offset=-4, read_byte_count=8, write_bytes=b"2" * 8),
+])
+def test_can_add_op_matches_add_op(op):
+    holder = MagicMock()
+    holder.max_addresses = 3
+    holder.max_output = 40
+    holder.max_input = 50
+    batch = RequestBatch()
+    for existing in [MemoryOperation(0x1000, offset=0, read_byte_count=4)] * 7:
+        batch.add_op(existing)
+
+    # Run
+    can_add = batch.can_add_op(op, holder)
+    batch.add_op(op)
+
+    # Assert
+    assert can_add == batch.is_compatible_with(holder)
 
 
 @pytest.mark.asyncio
 async def test_connect(backend, mocker):
     reader, writer = MagicMock(), MagicMock()
     writer.drain = AsyncMock()
-    reader.read = AsyncMock(return_value=b'\x00\x00\x00\x02\x00\x00\x00x\x00\x00\x00\xfa\x00\x00\x00\x03')
+    reader.readexactly = AsyncMock(return_value=b'\x00\x00\x00\x02\x00\x00\x00x\x00\x00\x00\xfa\x00\x00\x00\x03')
     mock_open = mocker.patch("asyncio.open_connection", new_callable=AsyncMock, return_value=(reader, writer))
 
     # Run
@@ -84,6 +201,7 @@ async def test_connect(backend, mocker):
     # Assert
     mock_open.assert_awaited_once_with("localhost", backend._port)
     writer.drain.assert_awaited_once_with()
+    reader.readexactly.assert_awaited_once_with(16)
 
     socket: SocketHolder = backend._socket
     assert socket.reader is reader
@@ -0,0 +1,35 @@
+from randovania.game_connection.connection_base import GameConnectionStatus
+from randovania.game_connection.polling_scheduler import PollingScheduler
+
+
+def test_connected_uses_interval():
+    scheduler = PollingScheduler(interval=0.5)
+
+    assert scheduler.next_interval(GameConnectionStatus.InGame) == 0.5
+    assert scheduler.next_interval(GameConnectionStatus.TitleScreen) == 0.5
+
+
+def test_disconnected_backoff():
+    scheduler = PollingScheduler(interval=0.5, min_backoff=1, max_backoff=5)
+
+    # Run
+    intervals = [scheduler.next_interval(GameConnectionStatus.Disconnected) for _ in range(5)]
+    connected = scheduler.next_interval(GameConnectionStatus.TrackerOnly)
+    after_reconnect = scheduler.next_interval(GameConnectionStatus.Disconnected)
+
+    # Assert
+    assert intervals == [1, 2, 4, 5, 5]
+    assert connected == 0.5
+    assert after_reconnect == 1
+
+
+def test_reset():
+    scheduler = PollingScheduler(min_backoff=1, max_backoff=5)
+    scheduler.next_interval(GameConnectionStatus.Disconnected)
+    scheduler.next_interval(GameConnectionStatus.Disconnected)
+
+    # Run
+    scheduler.reset()
+
+    # Assert
+    assert scheduler.next_interval(GameConnectionStatus.Disconnected) == 1
@@ -0,0 +1,22 @@
+from randovania.game_description import default_database, data_reader
+from randovania.resolver import event_pickup
+
+
+def test_decode_data_with_cache_isolated_copies(corruption_game_data):
+    # Run
+    first = default_database.decode_data_with_cache(corruption_game_data)
+    event_pickup.replace_with_event_pickups(first)
+    first.patch_requirements({}, 2.0)
+    second = default_database.decode_data_with_cache(corruption_game_data)
+
+    # Assert
+    expected = data_reader.decode_data(corruption_game_data)
+    assert second.world_list.worlds == expected.world_list.worlds
+    assert first.world_list.worlds != expected.world_list.worlds
+    assert second.resource_database is first.resource_database
+
+    first_area = next(first.world_list.all_areas)
+    second_area = next(second.world_list.all_areas)
+    assert first_area.nodes is not second_area.nodes
+    assert first_area.connections is not second_area.connections
+    assert first_area.nodes[0] is second_area.nodes[0]
@@ -1,3 +1,4 @@
+from random import Random
 from typing import Tuple
 from unittest.mock import MagicMock
 
@@ -5,9 +6,12 @@ import pytest
 
 from randovania.game_description import data_reader
 from randovania.game_description.requirements import ResourceRequirement, RequirementList, RequirementSet, \
-    RequirementAnd, RequirementOr, Requirement, MAX_DAMAGE, RequirementTemplate
+    RequirementAnd, RequirementOr, Requirement, MAX_DAMAGE, RequirementTemplate, \
+    RequirementInterner
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
+from randovania.games.game import RandovaniaGame
+from randovania.games.prime import default_data
 
 
 @pytest.fixture(name="database")
@@ -94,6 +98,43 @@ def test_prevent_redundant():
     assert the_set.alternatives == frozenset([RequirementList([id_req_a])])
 
 
+def test_prevent_redundant_matches_pairwise_check():
+    rng = Random(5000)
+    requirements = [_req(name) for name in "ABCDEF"]
+
+    for _ in range(50):
+        alternatives = {
+            RequirementList(rng.sample(requirements, rng.randint(0, 4)))
+            for _ in range(rng.randint(2, 10))
+        }
+
+        the_set = RequirementSet(alternatives)
+
+        assert the_set.alternatives == frozenset(
+            alternative
+            for alternative in alternatives
+            if not any(other < alternative for other in alternatives)
+        )
+
+
+def test_as_set_and_simplify_are_memoized():
+    id_req_a = _req("A")
+    id_req_b = _req("B")
+    the_req = RequirementOr([
+        RequirementAnd([id_req_a, Requirement.trivial()]),
+        RequirementAnd([id_req_b, ResourceRequirement(id_req_a.resource, 1, True)]),
+    ])
+
+    assert the_req.as_set is the_req.as_set
+    assert the_req.simplify() is the_req.simplify()
+    assert id_req_a.as_set is id_req_a.as_set
+    assert the_req.as_set.dangerous_resources == frozenset([id_req_a.resource])
+    assert the_req.as_set == RequirementSet([
+        RequirementList([id_req_a]),
+        RequirementList([id_req_b, ResourceRequirement(id_req_a.resource, 1, True)]),
+    ])
+
+
 def test_trivial_merge():
     trivial = RequirementSet.trivial()
     impossible = RequirementSet.impossible()
@@ -462,3 +503,75 @@ def test_requirement_damage(damage, items, requirement, echoes_resource_database
     }
 
     assert req.damage(resources) == damage
+
+
+@pytest.mark.parametrize("damage_multiplier", [None, 1.5])
+@pytest.mark.parametrize("game_enum", list(RandovaniaGame))
+def test_compiled_requirement_matches_tree(game_enum, damage_multiplier):
+    game = data_reader.decode_data(default_data.read_json_then_binary(game_enum)[1])
+    if damage_multiplier is not None:
+        game.patch_requirements({}, damage_multiplier)
+    layout = game.resource_layout
+
+    requirements = {
+        requirement
+        for area in game.world_list.all_areas
+        for connections in area.connections.values()
+        for requirement in connections.values()
+    }
+    requirements.update(
+        dock_weakness.requirement
+        for list_by_type in game.dock_weakness_database
+        for dock_weakness in list_by_type
+    )
+
+    rng = Random(1000)
+    for _ in range(20):
+        resources = {
+            resource: rng.randint(0, 2)
+            for resource in layout.resources
+            if rng.random() < 0.5
+        }
+        quantities = layout.dense_quantities(resources)
+        energy = rng.randint(1, 1000)
+
+        for requirement in requirements:
+            compiled = requirement.compiled(layout)
+            assert compiled.satisfied(quantities, energy) == requirement.satisfied(resources, energy), requirement
+            assert compiled.damage(quantities) == requirement.damage(resources), requirement
+
+
+def test_read_requirement_with_interner(echoes_resource_database):
+    # Setup
+    interner = RequirementInterner()
+    data = {"type": "or", "data": [
+        {"type": "and", "data": [_json_req(50), _json_req(1, resource_type=0)]},
+        {"type": "and", "data": [_json_req(1, resource_type=0), _json_req(50)]},
+    ]}
+
+    # Run
+    first = data_reader.read_requirement(data, echoes_resource_database, interner)
+    second = data_reader.read_requirement(data, echoes_resource_database, interner)
+    trivial = data_reader.read_requirement({"type": "and", "data": []}, echoes_resource_database, interner)
+
+    # Assert
+    assert first is second
+    assert first.items[0] is not first.items[1]
+    assert first.items[0].items[0] is first.items[1].items[1]
+    assert trivial is Requirement.trivial()
+
+
+def test_patch_requirements_shares_results():
+    game = data_reader.decode_data(default_data.read_json_then_binary(RandovaniaGame.PRIME1)[1])
+    connections = [
+        (connection, target)
+        for area in game.world_list.all_areas
+        for connection in area.connections.values()
+        for target in connection
+    ]
+    game.patch_requirements({}, 1.0)
+
+    patched = {}
+    for connection, target in connections:
+        requirement = connection[target]
+        assert patched.setdefault(requirement, requirement) is requirement
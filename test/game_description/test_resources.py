@@ -6,6 +6,8 @@ from randovania.game_description.resources.pickup_entry import ConditionalResour
 from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_info import add_resource_gain_to_current_resources, \
     add_resources_into_another, convert_resource_gain_to_current_resources
+from randovania.game_description.resources.resource_type import ResourceType
+from randovania.game_description.resources.resource_vector import ResourceVectorLayout, ResourceVector
 
 
 @pytest.mark.parametrize(["a", "b", "result"], [
@@ -63,3 +65,28 @@ def test_convert_resource_gain_to_current_resources(resource_gain, expected):
 
     # Assert
     assert result == expected
+
+
+def test_resource_vector_behaves_like_dict():
+    # Setup
+    item_a = ItemResourceInfo(1, "A", "A", 10, None)
+    item_b = ItemResourceInfo(2, "B", "B", 10, None)
+    layout = ResourceVectorLayout([item_b, item_a])
+    vector = ResourceVector(layout, {item_a: 2, "flag": 1})
+
+    # Run
+    copy = vector.copy()
+    copy[item_b] = 0
+    copy[PickupIndex(5)] = 1
+    del copy[item_a]
+
+    # Assert
+    assert layout.resources == [item_a, item_b, PickupIndex(5)]
+    assert vector == {item_a: 2, "flag": 1}
+    assert copy == {item_b: 0, PickupIndex(5): 1, "flag": 1}
+    assert copy.get(item_a) is None
+    assert item_b in copy
+    assert len(copy) == 3
+    assert list(copy.resources_of_type(ResourceType.PICKUP_INDEX)) == [(PickupIndex(5), 1)]
+    assert list(vector.dense_quantities()) == [2, 0, 0]
+    assert set(copy.changed_resources(vector)) == {item_a, item_b, PickupIndex(5)}
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from randovania import get_data_path
+from randovania.game_description import data_reader
+from randovania.games.game import RandovaniaGame
+from randovania.games.prime import compiled_data, default_data
+
+
+def _read_json(game: RandovaniaGame) -> dict:
+    with get_data_path().joinpath("json_data", f"{game.value}.json").open() as data_file:
+        return json.load(data_file)
+
+
+@pytest.mark.parametrize("game", [RandovaniaGame.PRIME1, RandovaniaGame.PRIME3])
+def test_round_trip_default_data(tmp_path, game):
+    # Setup
+    data = _read_json(game)
+    path = tmp_path.joinpath("database.rdvdb")
+
+    # Run
+    compiled_data.encode_file_path(data, path)
+    decoded = compiled_data.decode_file_path(path)
+
+    # Assert
+    assert decoded == data
+
+
+def test_requirements_are_shared():
+    # Setup
+    requirement = {"type": "and", "data": [
+        {"type": "resource", "data": {"type": 0, "index": 1, "amount": 1, "negate": False}},
+        {"type": "template", "data": "Shoot Beam"},
+    ]}
+    data = {
+        "victory_condition": requirement,
+        "other": [json.loads(json.dumps(requirement))],
+        "worlds": [],
+    }
+
+    # Run
+    database = compiled_data.CompiledDatabase(compiled_data.encode(data))
+    decoded = database.as_dict()
+
+    # Assert
+    assert decoded == data
+    assert decoded["victory_condition"] is decoded["other"][0]
+    assert len(database._requirements) == 3
+
+
+def test_areas_decoded_on_demand():
+    # Setup
+    data = _read_json(RandovaniaGame.PRIME1)
+    database = compiled_data.CompiledDatabase(compiled_data.encode(data))
+    world = data["worlds"][0]
+
+    # Run
+    resource_database = database.resource_database_data()
+    area_index = database.find_area(world["name"], world["areas"][1]["name"])
+    connected = database.connected_areas(area_index)
+
+    # Assert
+    assert resource_database == data["resource_database"]
+    assert area_index == 1
+    assert {database.area_entries[i].name for i in connected} - {world["areas"][1]["name"]}
+    assert sum(area is not None for area in database._areas) == 1
+
+    game = data_reader.decode_data(database.data_with_areas(connected))
+    assert len(list(game.world_list.all_areas)) == len(connected)
+    with pytest.raises(KeyError):
+        database.find_area(world["name"], "Unknown Area")
+
+
+def test_invalid_magic():
+    with pytest.raises(ValueError, match="not a compiled game database"):
+        compiled_data.CompiledDatabase(b"\x00" * 64)
+
+
+def test_read_compiled_database_prefers_json(tmp_path, mocker):
+    # Setup
+    mocker.patch("randovania.games.prime.default_data.get_data_path", return_value=tmp_path)
+    tmp_path.joinpath("binary_data").mkdir()
+    tmp_path.joinpath("json_data").mkdir()
+    compiled_data.encode_file_path({"worlds": []}, default_data.compiled_path(RandovaniaGame.PRIME1))
+    default_data.read_compiled_database.cache_clear()
+
+    # Run
+    compiled = default_data.read_compiled_database(RandovaniaGame.PRIME1)
+    tmp_path.joinpath("json_data", "prime3.json").write_text("{}")
+    compiled_data.encode_file_path({"worlds": []}, default_data.compiled_path(RandovaniaGame.PRIME3))
+    with_json = default_data.read_compiled_database(RandovaniaGame.PRIME3)
+    default_data.read_compiled_database.cache_clear()
+
+    # Assert
+    assert compiled.as_dict() == {"worlds": []}
+    assert with_json is None
@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from randovania.generator.filler import parallel_evaluation
+from randovania.generator.filler.parallel_evaluation import ParallelActionEvaluator
+
+
+def test_evaluation_worker_stops_when_parent_is_gone():
+    # Setup
+    connection = MagicMock()
+    connection.recv.side_effect = EOFError()
+    parent_connection = MagicMock()
+
+    # Run
+    parallel_evaluation._evaluation_worker(connection, [], [parent_connection])
+
+    # Assert
+    parent_connection.close.assert_called_once_with()
+    connection.send.assert_not_called()
+
+
+def test_close_all_evaluators():
+    # Setup
+    evaluator = ParallelActionEvaluator([], 2)
+    processes = [process for process, _ in evaluator._workers]
+
+    # Run
+    parallel_evaluation.close_all_evaluators()
+
+    # Assert
+    assert evaluator._workers == []
+    assert not any(process.is_alive() for process in processes)
+    assert list(parallel_evaluation._open_evaluators) == []
@@ -163,3 +163,19 @@ def test_add_relative_hint(echoes_game_description, empty_patches, location_prec
     # Assert
     pair = PrecisionPair(location_precision, target_precision, data)
     assert result == Hint(HintType.LOCATION, pair, PickupIndex(1))
+
+
+def test_run_filler_parallel_evaluation_matches_serial(preset_manager):
+    configuration = preset_manager.preset_for_name("Corruption Preset").get_preset().configuration
+
+    def run(evaluation_workers: int):
+        rng = Random(1)
+        player_pools = {0: create_player_pool(rng, configuration, 0)}
+        return runner.run_filler(rng, player_pools, MagicMock(), evaluation_workers).action_log
+
+    # Run
+    serial = run(0)
+    parallel = run(2)
+
+    # Assert
+    assert parallel == serial
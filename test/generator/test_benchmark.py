@@ -0,0 +1,101 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from randovania.generator import benchmark
+from randovania.interface_common.preset_manager import read_preset_list
+from randovania.layout.preset_migration import VersionedPreset
+from randovania.resolver import counters
+
+
+def _result(**kwargs) -> benchmark.BenchmarkResult:
+    values = dict(
+        preset_name="Preset", seed_number=1000, permalink="abc",
+        generation_seconds=10.0, resolve_seconds=5.0, peak_rss_kb=100000,
+        generation_reach_computations=50, resolve_reach_computations=200, retcon_steps=30,
+    )
+    values.update(kwargs)
+    return benchmark.BenchmarkResult(**values)
+
+
+def test_report_round_trip(tmp_path):
+    results = [_result(), _result(seed_number=1001, resolve_seconds=None, error="Timeout")]
+    path = tmp_path.joinpath("report.json")
+
+    # Run
+    benchmark.write_report(path, results)
+
+    # Assert
+    assert benchmark.read_report_file(path) == results
+
+
+def test_read_report_unknown_version():
+    with pytest.raises(ValueError):
+        benchmark.read_report({"schema_version": benchmark.CURRENT_REPORT_SCHEMA_VERSION + 1, "results": []})
+
+
+@pytest.mark.parametrize(["result", "expected"], [
+    (_result(), []),
+    (_result(generation_seconds=12.0), []),
+    (_result(generation_seconds=13.0), ["Preset (seed 1000): generation_seconds is 13.0, baseline was 10.0"]),
+    (_result(resolve_reach_computations=300, retcon_steps=40), [
+        "Preset (seed 1000): resolve_reach_computations is 300, baseline was 200",
+        "Preset (seed 1000): retcon_steps is 40, baseline was 30",
+    ]),
+    (_result(error="Timeout", generation_seconds=None), ["Preset (seed 1000): failed with Timeout"]),
+    (_result(seed_number=2000, generation_seconds=100.0), []),
+])
+def test_compare_results(result, expected):
+    assert benchmark.compare_results([result], [_result()], threshold=0.25) == expected
+
+
+@patch("randovania.generator.benchmark._peak_rss_kb", autospec=True)
+@patch("randovania.resolver.resolver.resolve", autospec=True)
+@patch("randovania.generator.generator.generate_description", autospec=True)
+def test_run_benchmark_case(mock_generate_description: MagicMock, mock_resolve: MagicMock,
+                            mock_peak_rss_kb: MagicMock):
+    # Setup
+    case = MagicMock()
+    case.preset_name = "Preset"
+    case.permalink.seed_number = 1000
+
+    def generate(**kwargs):
+        counters.increment(counters.GENERATOR_REACH)
+        counters.increment(counters.RETCON_STEP)
+        counters.increment(counters.RETCON_STEP)
+        return MagicMock()
+
+    def resolve(**kwargs):
+        counters.increment(counters.RESOLVER_REACH)
+        return None
+
+    mock_generate_description.side_effect = generate
+    mock_resolve.side_effect = resolve
+
+    # Run
+    result = benchmark.run_benchmark_case(case, 60)
+
+    # Assert
+    mock_generate_description.assert_called_once_with(permalink=case.permalink, status_update=None,
+                                                      validate_after_generation=False, timeout=60)
+    assert result.generation_reach_computations == 1
+    assert result.resolve_reach_computations == 1
+    assert result.retcon_steps == 2
+    assert result.peak_rss_kb == mock_peak_rss_kb.return_value
+    assert result.error == "Generated seed was considered impossible by the solver"
+
+
+@pytest.mark.skip_generation_tests
+@pytest.mark.parametrize("seed_number", benchmark.DEFAULT_SEED_NUMBERS)
+@pytest.mark.parametrize("preset_path", read_preset_list(), ids=lambda path: path.stem)
+def test_benchmark_corpus(run_benchmarks, record_property, preset_path, seed_number):
+    preset_name = VersionedPreset.from_file_sync(preset_path).name
+    case = benchmark.benchmark_corpus([preset_name], [seed_number])[0]
+
+    # Run
+    result = benchmark.run_benchmark_case(case, timeout=600)
+
+    # Assert
+    for field, value in result.as_json.items():
+        record_property(field, value)
+    assert result.error is None
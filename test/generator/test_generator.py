@@ -42,7 +42,7 @@ def test_create_patches(mock_random: MagicMock,
         call(player_pools[i].pickups, player_pools[i].game)
         for i in range(num_players)
     ])
-    mock_run_filler.assert_called_once_with(rng, {i: player_pools[i] for i in range(num_players)}, status_update)
+    mock_run_filler.assert_called_once_with(rng, {i: player_pools[i] for i in range(num_players)}, status_update, 0)
     mock_distribute_remaining_items.assert_called_once_with(rng, mock_run_filler.return_value.player_results)
 
     assert result == LayoutDescription(
@@ -10,7 +10,7 @@ from randovania.game_description.dock import DockWeaknessDatabase
 from randovania.game_description.echoes_game_specific import EchoesGameSpecific
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import ResourceNode, GenericNode, TranslatorGateNode
-from randovania.game_description.requirements import Requirement
+from randovania.game_description.requirements import Requirement, ResourceRequirement
 from randovania.game_description.resources.pickup_index import PickupIndex
 from randovania.game_description.resources.resource_info import add_resources_into_another
 from randovania.game_description.resources.resource_type import ResourceType
@@ -21,7 +21,8 @@ from randovania.games.game import RandovaniaGame
 from randovania.generator import base_patches_factory, generator
 from randovania.generator.generator_reach import GeneratorReach, filter_pickup_nodes, \
     reach_with_all_safe_resources, get_collectable_resource_nodes_of_reach, \
-    advance_reach_with_possible_unsafe_resources, collectable_resource_nodes
+    advance_reach_with_possible_unsafe_resources, collectable_resource_nodes, advance_to_with_reach_copy, \
+    advance_to_with_reach_transaction
 from randovania.generator.item_pool import pool_creator
 from randovania.layout.permalink import Permalink
 from randovania.layout.preset import Preset
@@ -203,3 +204,118 @@ def test_reach_size_from_start_echoes(echoes_game_description, default_layout_co
     # Assert
     assert len(list(reach.nodes)) >= nodes
     assert len(list(reach.safe_nodes)) >= safe_nodes
+
+
+@pytest.mark.parametrize("preset_name", ["Starter Preset", "Corruption Preset"])
+def test_incremental_reachability_matches_reference(preset_manager, preset_name):
+    game, initial_state, permalink = run_bootstrap(preset_manager.preset_for_name(preset_name).get_preset())
+    for trick in game.resource_database.trick:
+        initial_state.resources[trick] = LayoutTrickLevel.HYPERMODE.as_number
+
+    reach = GeneratorReach.reach_from_state(game, initial_state, incremental=True)
+    reference = GeneratorReach.reach_from_state(game, initial_state, incremental=False)
+
+    def assert_same_reachability():
+        assert set(reach.connected_nodes) == set(reference.connected_nodes)
+        for node in game.world_list.all_nodes:
+            assert reach.is_reachable_node(node) == reference.is_reachable_node(node)
+
+    assert_same_reachability()
+    for _ in range(50):
+        actions = get_collectable_resource_nodes_of_reach(reference)
+        if not actions:
+            break
+        reach.act_on(actions[0])
+        reference.act_on(actions[0])
+        assert_same_reachability()
+
+
+def test_advance_to_checks_unreachable_paths_affected_by_change(corruption_game_description):
+    # Setup
+    resource_database = corruption_game_description.resource_database
+    damage = resource_database.get_by_type_and_index(ResourceType.DAMAGE, 1)
+    item = resource_database.get_item(1)
+
+    node_a = GenericNode("Node A", True, None, 0)
+    node_b = GenericNode("Node B", True, None, 1)
+    node_c = GenericNode("Node C", True, None, 2)
+
+    world_list = WorldList([
+        World("Test World", "Test Dark World", 1, [
+            Area("Test Area A", False, 10, 0, True, [node_a, node_b, node_c],
+                 {
+                     node_a: {
+                         node_b: ResourceRequirement(damage, 50, False),
+                         node_c: ResourceRequirement(item, 1, False),
+                     },
+                     node_b: {},
+                     node_c: {},
+                 }
+                 )
+        ])
+    ])
+    game = GameDescription(RandovaniaGame.PRIME3, DockWeaknessDatabase([], [], [], []),
+                           resource_database, corruption_game_description.game_specific, Requirement.impossible(),
+                           None, {}, world_list)
+    initial_state = State({}, (), 10, node_a, game.create_game_patches(), None, resource_database)
+    reach = GeneratorReach.reach_from_state(game, initial_state)
+    assert set(reach.nodes) == {node_a}
+
+    # Run
+    reach.advance_to(reach.state.heal())
+    nodes_after_heal = set(reach.nodes)
+
+    new_state = reach.state.copy()
+    new_state.previous_state = reach.state
+    new_state.resources[item] = 1
+    reach.advance_to(new_state)
+
+    # Assert
+    assert nodes_after_heal == {node_a, node_b}
+    assert set(reach.nodes) == {node_a, node_b, node_c}
+
+
+def test_transaction_rollback(preset_manager):
+    game, initial_state, permalink = run_bootstrap(preset_manager.preset_for_name("Corruption Preset").get_preset())
+    for trick in game.resource_database.trick:
+        initial_state.resources[trick] = LayoutTrickLevel.HYPERMODE.as_number
+
+    pool_results = pool_creator.calculate_pool_results(permalink.get_preset(0).configuration,
+                                                       game.resource_database)
+    for pickup in pool_results.pickups:
+        add_pickup_to_state(initial_state, pickup)
+
+    reach = reach_with_all_safe_resources(game, initial_state)
+
+    def describe():
+        return (
+            reach.state,
+            reach.nodes,
+            set(reach.safe_nodes),
+            set(reach.connected_nodes),
+            [node for node in game.world_list.all_nodes if reach.is_reachable_node(node)],
+            reach.unreachable_nodes_with_requirements(),
+        )
+
+    for _ in range(10):
+        actions = get_collectable_resource_nodes_of_reach(reach)
+        before = describe()
+
+        for action in actions:
+            expected = advance_to_with_reach_copy(reach, reach.state.act_on_node(action))
+
+            with advance_to_with_reach_transaction(reach, reach.state.act_on_node(action)) as potential_reach:
+                assert potential_reach.nodes == expected.nodes
+                assert set(potential_reach.safe_nodes) == set(expected.safe_nodes)
+                assert potential_reach.state.resources == expected.state.resources
+
+                for nested_action in get_collectable_resource_nodes_of_reach(potential_reach):
+                    with potential_reach.transaction():
+                        potential_reach.act_on(nested_action)
+                    assert potential_reach.nodes == expected.nodes
+
+            assert describe() == before
+
+        if not actions:
+            break
+        reach.act_on(actions[0])
@@ -0,0 +1,84 @@
+from random import Random
+
+import networkx
+import pytest
+
+from randovania.game_description.requirements import Requirement
+from randovania.generator.index_graph import IndexGraph
+
+
+def _random_graphs(seed: int, size: int = 60, edges: int = 150):
+    rng = Random(seed)
+    graph = IndexGraph(size)
+    reference = networkx.DiGraph()
+    for _ in range(edges):
+        source, target = rng.randrange(size), rng.randrange(size)
+        graph.add_edge(source, target, Requirement.trivial())
+        reference.add_edge(source, target)
+    return graph, reference
+
+
+def test_copy_on_write():
+    # Setup
+    graph = IndexGraph(5)
+    graph.add_edge(0, 1, Requirement.trivial())
+    graph.add_edge(1, 2, Requirement.impossible())
+
+    # Run
+    copy = graph.copy()
+    copy.add_edge(2, 3, Requirement.trivial())
+    copy.remove_edge(0, 1)
+    graph.add_edge(0, 4, Requirement.trivial())
+
+    # Assert
+    assert list(graph) == [0, 1, 2, 4]
+    assert list(copy) == [0, 1, 2, 3]
+    assert set(graph.edges_with_requirement()) == {
+        (0, 1, Requirement.trivial()),
+        (0, 4, Requirement.trivial()),
+        (1, 2, Requirement.impossible()),
+    }
+    assert set(copy.edges_with_requirement()) == {
+        (1, 2, Requirement.impossible()),
+        (2, 3, Requirement.trivial()),
+    }
+    assert 4 not in copy
+    assert not copy.has_edge(0, 1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_strongly_connected_component(seed):
+    graph, reference = _random_graphs(seed)
+
+    for component in networkx.strongly_connected_components(reference):
+        for node in component:
+            assert graph.strongly_connected_component(node) == component
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_shortest_paths(seed):
+    graph, reference = _random_graphs(seed)
+    source = next(iter(reference))
+
+    paths = graph.shortest_paths(source)
+
+    expected = networkx.single_source_shortest_path_length(reference, source)
+    assert {node: len(path) - 1 for node, path in paths.items()} == expected
+    for path in paths.values():
+        assert all(graph.has_edge(a, b) for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_zero_one_shortest_costs(seed):
+    graph, reference = _random_graphs(seed)
+    source = next(iter(reference))
+    blocked = set(Random(seed).sample(list(reference), 20))
+
+    def weight(target: int) -> int:
+        return 1 if target in blocked else 0
+
+    costs = graph.zero_one_shortest_costs(source, weight)
+
+    expected = networkx.single_source_dijkstra_path_length(reference, source,
+                                                           weight=lambda s, t, attr: weight(t))
+    assert costs == expected
@@ -75,7 +75,7 @@ async def test_refresh_received_pickups(client):
         ("Message C", b"bytesC"),
     ]
 
-    client.network_client.game_session_request_pickups = AsyncMock(return_value=results)
+    client.network_client.game_session_request_new_pickups = AsyncMock(return_value=({"c": 1}, True, results))
 
     pickups = [MagicMock(), MagicMock(), MagicMock()]
     client._decode_pickup = MagicMock(side_effect=pickups)
@@ -84,11 +84,32 @@ async def test_refresh_received_pickups(client):
     await client.refresh_received_pickups()
 
     # Assert
+    client.network_client.game_session_request_new_pickups.assert_awaited_once_with(None)
     assert client._received_messages == ["Message A", "Message B", "Message C"]
     assert client._received_pickups == pickups
+    assert client._pickups_cursor == {"c": 1}
     client._decode_pickup.assert_has_calls([call(b"bytesA"), call(b"bytesB"), call(b"bytesC")])
 
 
+@pytest.mark.asyncio
+async def test_refresh_received_pickups_incremental(client):
+    client._received_messages = ["Message A"]
+    client._received_pickups = ["Pickup A"]
+    client._pickups_cursor = {"c": 1}
+    client.network_client.game_session_request_new_pickups = AsyncMock(
+        return_value=({"c": 2}, False, [("Message B", b"bytesB")]))
+    client._decode_pickup = MagicMock(return_value="Pickup B")
+
+    # Run
+    await client.refresh_received_pickups()
+
+    # Assert
+    client.network_client.game_session_request_new_pickups.assert_awaited_once_with({"c": 1})
+    assert client._received_messages == ["Message A", "Message B"]
+    assert client._received_pickups == ["Pickup A", "Pickup B"]
+    assert client._pickups_cursor == {"c": 2}
+
+
 @pytest.mark.asyncio
 async def test_on_game_updated(client, tmpdir):
     client.refresh_received_pickups = AsyncMock()
@@ -154,7 +175,7 @@ async def test_notify_collect_locations(client, tmpdir):
 async def test_lock_file_on_init(skip_qtbot, tmpdir):
     # Setup
     network_client = MagicMock()
-    network_client.game_session_request_pickups = AsyncMock(return_value=[])
+    network_client.game_session_request_new_pickups = AsyncMock(return_value=(None, True, []))
     network_client.session_self_update = AsyncMock()
     game_connection = MagicMock()
     game_connection.backend.lock_identifier = str(tmpdir.join("my-lock"))
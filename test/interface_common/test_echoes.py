@@ -0,0 +1,16 @@
+import signal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from randovania.interface_common import echoes
+
+
+@patch("randovania.generator.filler.parallel_evaluation.close_all_evaluators", autospec=True)
+def test_stop_generation(mock_close_all_evaluators: MagicMock):
+    # Run
+    with pytest.raises(SystemExit):
+        echoes._stop_generation(signal.SIGTERM, None)
+
+    # Assert
+    mock_close_all_evaluators.assert_called_once_with()
@@ -58,14 +58,20 @@ def test_unpack_iso(mock_delete_files_location: MagicMock,
     )
 
 
+@pytest.mark.parametrize(("in_parallel", "expected_workers"), [(False, 0), (True, 3)])
+@patch("randovania.interface_common.simplified_patcher.multiprocessing.cpu_count", return_value=4, autospec=True)
 @patch("randovania.interface_common.simplified_patcher.ConstantPercentageCallback",
        autospec=False)  # TODO: pytest-qt bug
 @patch("randovania.interface_common.echoes.generate_layout", autospec=True)
 def test_generate_layout(mock_generate_layout: MagicMock,
                          mock_constant_percentage_callback: MagicMock,
+                         mock_cpu_count: MagicMock,
+                         in_parallel: bool,
+                         expected_workers: int,
                          ):
     # Setup
     options: Options = MagicMock()
+    options.advanced_generate_in_parallel = in_parallel
     permalink: Permalink = MagicMock()
     progress_update = MagicMock()
 
@@ -79,6 +85,7 @@ def test_generate_layout(mock_generate_layout: MagicMock,
         status_update=mock_constant_percentage_callback.return_value,
         validate_after_generation=options.advanced_validate_seed_after,
         timeout_during_generation=options.advanced_timeout_during_generation,
+        evaluation_workers=expected_workers,
     )
 
 
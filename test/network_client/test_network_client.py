@@ -1,6 +1,8 @@
+import json
 from pathlib import Path
 
 import pytest
+from cryptography.fernet import Fernet
 from mock import MagicMock, AsyncMock, call
 
 import randovania
@@ -116,3 +118,90 @@ async def test_leave_game_session(client: NetworkClient, permanent: bool):
 
     assert client._current_game_session is None
     assert client._last_self_update is None
+
+
+def _session_entry_json(version: int) -> dict:
+    return {
+        "id": 1234,
+        "name": "The Session",
+        "state": "in-progress",
+        "players": [{"id": 10, "name": "A", "row": 0, "admin": True, "inventory": None, "connection_state": "Online"}],
+        "presets": [],
+        "actions": [{"message": "Found", "time": "2020-05-02T10:20:00+00:00"}],
+        "spoiler": True,
+        "word_hash": "Words",
+        "seed_hash": "ABCDEFG",
+        "permalink": "<permalink>",
+        "generation_in_progress": None,
+        "snapshot": "abc",
+        "version": version,
+    }
+
+
+@pytest.mark.asyncio
+async def test_on_game_session_delta_apply(client: NetworkClient):
+    client._emit_with_result = AsyncMock()
+    await client.on_game_session_updated(_session_entry_json(1))
+
+    # Run
+    await client.on_game_session_delta({
+        "id": 1234,
+        "snapshot": "abc",
+        "version": 2,
+        "changes": {"name": "New Name"},
+        "players": [{"id": 11, "name": "B", "row": 1, "admin": False, "inventory": None, "connection_state": "Game"}],
+        "removed_players": [10],
+        "new_actions": [{"message": "Found Again", "time": "2020-05-02T10:30:00+00:00"}],
+    })
+
+    # Assert
+    client._emit_with_result.assert_not_awaited()
+    session = client.current_game_session
+    assert session.version == 2
+    assert session.name == "New Name"
+    assert list(session.players.keys()) == [11]
+    assert [action.message for action in session.actions] == ["Found", "Found Again"]
+
+
+@pytest.mark.parametrize(("snapshot", "version", "requests_full"), [
+    ("abc", 1, False),
+    ("abc", 3, True),
+    ("other", 2, True),
+])
+@pytest.mark.asyncio
+async def test_on_game_session_delta_not_next_version(client: NetworkClient, snapshot, version, requests_full):
+    client._emit_with_result = AsyncMock(return_value=_session_entry_json(3))
+    await client.on_game_session_updated(_session_entry_json(1))
+    initial_session = client.current_game_session
+
+    # Run
+    await client.on_game_session_delta({
+        "id": 1234, "snapshot": snapshot, "version": version, "changes": {"name": "New Name"},
+        "players": [], "removed_players": [], "new_actions": [],
+    })
+
+    # Assert
+    if requests_full:
+        client._emit_with_result.assert_awaited_once_with("game_session_request_update", 1234)
+        assert client.current_game_session.version == 3
+    else:
+        client._emit_with_result.assert_not_awaited()
+        assert client.current_game_session is initial_session
+
+
+@pytest.mark.asyncio
+async def test_login_as_guest(tmpdir):
+    secret = Fernet.generate_key()
+    client = NetworkClient(Path(tmpdir), {"server_address": "http://localhost:5000",
+                                          "guest_secret": secret.decode("ascii")})
+    client._emit_with_result = AsyncMock()
+    client.on_user_session_updated = AsyncMock()
+
+    # Run
+    await client.login_as_guest("Someone")
+
+    # Assert
+    event, login_request = client._emit_with_result.call_args[0]
+    assert event == "login_with_guest"
+    assert json.loads(Fernet(secret).decrypt(login_request))["name"] == "Someone"
+    client.on_user_session_updated.assert_awaited_once_with(client._emit_with_result.return_value)
@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+
 import pytest
 
 from randovania.layout.layout_description import LayoutDescription
@@ -19,3 +21,22 @@ def test_resolver_with_log_file(test_files_dir):
 
     # Assert
     assert final_state_by_resolve is not None
+
+
+@pytest.mark.parametrize("energy", [50, 100])
+def test_begin_advance_skips_refuted_state(energy):
+    # Setup
+    state = MagicMock(energy=energy)
+    logic = MagicMock()
+    logic.game.victory_condition.satisfied.return_value = False
+    refuted_states = {(state.node, state.resources.canonical_key.return_value): (80, True)}
+
+    # Run
+    result = resolver._begin_advance(state, logic, MagicMock(), None, refuted_states)
+
+    # Assert
+    if energy <= 80:
+        assert result == (None, True)
+        state.act_on_node.assert_not_called()
+    else:
+        assert isinstance(result, resolver._AdvanceFrame)
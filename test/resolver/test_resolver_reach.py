@@ -1,6 +1,12 @@
 from unittest.mock import MagicMock, PropertyMock
 
+import pytest
+
 from randovania.game_description.node import EventNode
+from randovania.game_description.requirements import RequirementSet, ResourceRequirement
+from randovania.game_description.resources.item_resource_info import ItemResourceInfo
+from randovania.resolver import bootstrap
+from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 
 
@@ -51,3 +57,44 @@ def test_possible_actions_with_event():
     event.can_collect.assert_called_once_with(state.patches, state.resources)
     logic.get_additional_requirements.assert_called_once_with(event)
     logic.get_additional_requirements.return_value.satisfied.assert_called_once_with(state.resources, 1)
+
+
+def test_calculate_reach_cached_until_additional_requirements_change(corruption_game_description):
+    # Setup
+    game = corruption_game_description
+    logic = Logic(game, MagicMock())
+    state = bootstrap.calculate_starting_state(game, game.create_game_patches())
+
+    # Run
+    first_reach = ResolverReach.calculate_reach(logic, state)
+    same_reach = ResolverReach.calculate_reach(logic, state.copy())
+    logic.set_additional_requirements(game.world_list.all_nodes[-1], RequirementSet.impossible())
+    unrelated_reach = ResolverReach.calculate_reach(logic, state)
+    logic.set_additional_requirements(state.node, RequirementSet.impossible())
+    new_reach = ResolverReach.calculate_reach(logic, state)
+
+    # Assert
+    assert game.world_list.all_nodes[-1] not in first_reach.nodes
+    assert same_reach is first_reach
+    assert unrelated_reach is first_reach
+    assert new_reach is not first_reach
+    assert list(new_reach.nodes) == []
+
+
+@pytest.mark.parametrize("negate", [False, True])
+def test_calculate_reach_resource_outside_database(corruption_game_description, negate):
+    # Setup
+    game = corruption_game_description
+    logic = Logic(game, MagicMock())
+    state = bootstrap.calculate_starting_state(game, game.create_game_patches())
+    area = game.world_list.nodes_to_area(state.node)
+    target = next(iter(area.connections[state.node]))
+
+    undefined = ItemResourceInfo(-1, "Undefined", "Undefined", 0, None)
+    area.connections[state.node][target] = ResourceRequirement(undefined, 1, negate)
+
+    # Run
+    reach = ResolverReach.calculate_reach(logic, state)
+
+    # Assert
+    assert (target in reach.nodes) == negate
@@ -3,12 +3,14 @@ import flask
 import pytest
 from peewee import SqliteDatabase
 
-from randovania.server import database
+from randovania.server import database, session_cache, self_update_coalescer
 
 
 @pytest.fixture()
 def clean_database():
     old_db = database.db
+    session_cache.cache.clear()
+    self_update_coalescer.coalescer.clear()
     try:
         test_db = SqliteDatabase(':memory:')
         database.db = test_db
@@ -2,7 +2,7 @@ import contextlib
 import dataclasses
 import datetime
 import json
-from unittest.mock import MagicMock, PropertyMock, patch, call
+from unittest.mock import MagicMock, PropertyMock, patch, call, ANY
 
 import peewee
 import pytest
@@ -16,7 +16,8 @@ from randovania.layout.preset_migration import VersionedPreset
 from randovania.network_common.admin_actions import SessionAdminUserAction, SessionAdminGlobalAction
 from randovania.network_common.error import InvalidAction
 from randovania.network_common.session_state import GameSessionState
-from randovania.server import game_session, database
+from randovania.server import game_session, database, session_cache
+from randovania.server.self_update_coalescer import SelfUpdateCoalescer, SelfUpdate
 
 
 @pytest.fixture(name="mock_emit_session_update")
@@ -24,8 +25,15 @@ def _mock_emit_session_update(mocker) -> MagicMock:
     return mocker.patch("randovania.server.game_session._emit_session_update", autospec=True)
 
 
-def test_setup_app():
-    game_session.setup_app(MagicMock())
+def test_setup_app(mocker):
+    mock_coalescer = mocker.patch("randovania.server.self_update_coalescer.coalescer")
+    sio = MagicMock()
+
+    # Run
+    game_session.setup_app(sio)
+
+    # Assert
+    mock_coalescer.setup_metrics.assert_called_once_with(sio.metrics.registry)
 
 
 def test_game_session_defaults_to_now(clean_database):
@@ -83,6 +91,8 @@ def test_create_game_session(clean_database, preset_manager):
         'word_hash': None,
         'permalink': None,
         'generation_in_progress': None,
+        'snapshot': ANY,
+        'version': 1,
     }
 
 
@@ -121,6 +131,8 @@ def test_join_game_session(mock_emit_session_update: MagicMock,
         'word_hash': None,
         'permalink': None,
         'generation_in_progress': None,
+        'snapshot': ANY,
+        'version': 1,
     }
 
 
@@ -204,6 +216,78 @@ def test_game_session_request_pickups_one_action(mock_session_description: Prope
     assert result == [{'message': 'Received A from Other Name', 'pickup': '0oLFk0Du'}]
 
 
+@patch("randovania.server.game_session._base64_encode_pickup", autospec=True)
+@patch("randovania.server.game_session._get_pickup_target", autospec=True)
+@patch("randovania.server.game_session._get_resource_database", autospec=True)
+@patch("randovania.server.database.GameSession.layout_description", new_callable=PropertyMock)
+def test_game_session_request_pickups_uses_cache(mock_session_description: PropertyMock,
+                                                 mock_get_resource_database: MagicMock,
+                                                 mock_get_pickup_target: MagicMock,
+                                                 mock_encode_pickup: MagicMock,
+                                                 flask_app, two_player_session):
+    # Setup
+    sio = MagicMock()
+    sio.get_current_user.return_value = database.User.get_by_id(1234)
+    mock_get_pickup_target.return_value.pickup.name = "A"
+    mock_encode_pickup.return_value = "encoded"
+
+    # Run
+    first = game_session.game_session_request_pickups(sio, 1)
+    second = game_session.game_session_request_pickups(sio, 1)
+    two_player_session.reset_layout_description()
+    game_session.game_session_request_pickups(sio, 1)
+
+    # Assert
+    assert first == second == [{'message': 'Received A from Other Name', 'pickup': 'encoded'}]
+    assert mock_get_resource_database.call_count == 2
+    assert mock_encode_pickup.call_count == 2
+
+
+@patch("randovania.server.game_session._base64_encode_pickup", autospec=True)
+@patch("randovania.server.game_session._get_pickup_target", autospec=True)
+@patch("randovania.server.game_session._get_resource_database", autospec=True)
+@patch("randovania.server.database.GameSession.layout_description", new_callable=PropertyMock)
+def test_game_session_request_new_pickups(mock_session_description: PropertyMock,
+                                          mock_get_resource_database: MagicMock,
+                                          mock_get_pickup_target: MagicMock,
+                                          mock_encode_pickup: MagicMock,
+                                          flask_app, two_player_session):
+    # Setup
+    sio = MagicMock()
+    sio.get_current_user.return_value = database.User.get_by_id(1234)
+    mock_get_pickup_target.side_effect = lambda description, provider, location: PickupTarget(
+        MagicMock(), 0) if location != 3 else None
+    mock_encode_pickup.side_effect = lambda pickup, db: f"pickup {len(mock_encode_pickup.mock_calls)}"
+
+    def create_action(location: int, time: str):
+        database.GameSessionTeamAction.create(session=two_player_session, provider_row=1,
+                                              provider_location_index=location, receiver_row=0,
+                                              time=time)
+
+    database.GameSessionTeamAction.update(time="2020-05-02 10:00:00+00:00").execute()
+    create_action(5, "2020-05-02 10:20:00+00:00")
+    create_action(4, "2020-05-02 10:20:00+00:00")
+
+    # Run
+    first = game_session.game_session_request_new_pickups(sio, 1, None)
+    empty = game_session.game_session_request_new_pickups(sio, 1, first["cursor"])
+    create_action(3, "2030-05-02 10:20:00+00:00")
+    create_action(2, "2030-05-02 10:20:01+00:00")
+    second = game_session.game_session_request_new_pickups(sio, 1, first["cursor"])
+    invalid = game_session.game_session_request_new_pickups(sio, 1, {"time": 5})
+
+    # Assert
+    assert first["full"]
+    assert [pickup["pickup"] for pickup in first["pickups"]] == ["pickup 1", "pickup 2", "pickup 3"]
+    assert first["cursor"] == {"time": "2020-05-02 10:20:00+00:00", "provider_row": 1, "location": 5}
+    assert empty == {"cursor": first["cursor"], "full": False, "pickups": []}
+    assert not second["full"]
+    assert [pickup and pickup["pickup"] for pickup in second["pickups"]] == [None, "pickup 4"]
+    assert second["cursor"] == {"time": "2030-05-02 10:20:01+00:00", "provider_row": 1, "location": 2}
+    assert invalid["full"]
+    assert len(invalid["pickups"]) == 5
+
+
 @patch("flask_socketio.emit", autospec=True)
 @patch("randovania.server.game_session._get_pickup_target", autospec=True)
 @patch("randovania.server.game_session._get_resource_database", autospec=True)
@@ -305,6 +389,36 @@ def test_game_session_collect_pickup_other(flask_app, two_player_session, echoes
         mock_emit_session_update.assert_called_once_with(database.GameSession.get(id=1))
 
 
+def test_game_session_collect_locations_batch(flask_app, two_player_session, mock_emit_session_update, mocker):
+    mock_emit: MagicMock = mocker.patch("flask_socketio.emit", autospec=True)
+    mock_get_pickup_target: MagicMock = mocker.patch("randovania.server.game_session._get_pickup_target", autospec=True)
+    mocker.patch("randovania.server.database.GameSession.layout_description", new_callable=PropertyMock)
+
+    sio = MagicMock()
+    sio.get_current_user.return_value = database.User.get_by_id(1234)
+    # 0: ETM, 1: for themselves, 2 and 3: for player 1, 4: for a row nobody is in
+    targets = {1: 0, 2: 1, 3: 1, 4: 5}
+    mock_get_pickup_target.side_effect = lambda description, provider, location: (
+        PickupTarget(MagicMock(), targets[location]) if location in targets else None
+    )
+    database.GameSessionTeamAction.create(session=two_player_session, provider_row=0,
+                                          provider_location_index=3, receiver_row=1)
+
+    # Run
+    with flask_app.test_request_context():
+        game_session.game_session_collect_locations(sio, 1, (0, 1, 2, 2, 3, 4))
+
+    # Assert
+    assert mock_get_pickup_target.call_count == 5
+    actions = database.GameSessionTeamAction.select().where(database.GameSessionTeamAction.provider_row == 0)
+    assert sorted((action.provider_location_index, action.receiver_row) for action in actions) == [
+        (2, 1), (3, 1), (4, 5),
+    ]
+    mock_emit.assert_called_once_with("game_has_update", {"session": 1, "row": 1, },
+                                      room=f"game-session-1-1235")
+    mock_emit_session_update.assert_called_once_with(database.GameSession.get(id=1))
+
+
 @pytest.mark.parametrize("is_observer", [False, True])
 def test_game_session_admin_player_switch_is_observer(clean_database, flask_app, mock_emit_session_update, is_observer):
     user1 = database.User.create(id=1234, name="The Name")
@@ -377,8 +491,10 @@ def test_game_session_admin_kick_last(clean_database, flask_app, mocker):
     mock_emit.assert_called_once_with(
         'game_session_update',
         {'id': 1, 'name': 'My Room', 'state': 'setup', 'players': [], 'presets': [], 'actions': [],
-         'spoiler': None, 'word_hash': None, 'seed_hash': None, 'permalink': None, 'generation_in_progress': None},
-        room='game-session-1')
+         'spoiler': None, 'word_hash': None, 'seed_hash': None, 'permalink': None, 'generation_in_progress': None,
+         'snapshot': ANY, 'version': 2},
+        room='game-session-1', namespace='/')
+    assert len(session_cache.cache) == 0
 
 
 @pytest.mark.parametrize("offset", [-1, 1])
@@ -438,7 +554,9 @@ def test_game_session_admin_player_patcher_file(mock_layout_description: Propert
     assert result is mock_create_patcher_file.return_value
 
 
-def test_game_session_admin_session_delete_session(mock_emit_session_update: MagicMock, flask_app, clean_database):
+def test_game_session_admin_session_delete_session(mock_emit_session_update: MagicMock, flask_app, clean_database,
+                                                   mocker):
+    mock_emit = mocker.patch("flask_socketio.emit")
     user1 = database.User.create(id=1234, name="The Name")
     session = database.GameSession.create(id=1, name="Debug", state=GameSessionState.SETUP, creator=user1)
     database.GameSessionMembership.create(user=user1, session=session, row=None, admin=True)
@@ -450,8 +568,15 @@ def test_game_session_admin_session_delete_session(mock_emit_session_update: Mag
         game_session.game_session_admin_session(sio, 1, SessionAdminGlobalAction.DELETE_SESSION.value, None)
 
     # Assert
-    mock_emit_session_update.assert_called_once_with(session)
+    mock_emit_session_update.assert_not_called()
+    mock_emit.assert_called_once_with(
+        'game_session_update',
+        {'id': 1, 'name': 'Debug', 'state': 'setup', 'players': [], 'presets': [], 'actions': [],
+         'spoiler': None, 'word_hash': None, 'seed_hash': None, 'permalink': None, 'generation_in_progress': None,
+         'snapshot': ANY, 'version': 1},
+        room='game-session-1', namespace='/')
     assert list(database.GameSession.select()) == []
+    assert len(session_cache.cache) == 0
 
 
 def test_game_session_admin_session_create_row(mock_emit_session_update: MagicMock,
@@ -871,4 +996,47 @@ def test_game_session_request_update(clean_database, mocker, flask_app):
         "seed_hash": "ABCDEFG",
         "permalink": "<permalink>",
         "generation_in_progress": None,
+        "snapshot": ANY,
+        "version": 1,
     }
+
+
+def test_game_session_self_update_throttled(clean_database, flask_app, mock_emit_session_update, mocker):
+    mocker.patch("randovania.server.self_update_coalescer.coalescer",
+                 SelfUpdateCoalescer(interval=2.0, clock=MagicMock(return_value=100.0)))
+    user1 = database.User.create(id=1234, name="The Name")
+    session = database.GameSession.create(id=1, name="Debug", state=GameSessionState.IN_PROGRESS, creator=user1)
+    database.GameSessionMembership.create(user=user1, session=session, row=0, admin=True,
+                                          connection_state="Online, Unknown")
+    sio = MagicMock()
+    sio.get_current_user.return_value = user1
+
+    # Run
+    with flask_app.test_request_context():
+        game_session.game_session_self_update(sio, 1, "inventory", "Game")
+        game_session.game_session_self_update(sio, 1, "new inventory", "Game")
+
+    # Assert
+    membership = database.GameSessionMembership.get_by_ids(1234, 1)
+    assert membership.inventory == "inventory"
+    assert membership.connection_state == "Online, Game"
+    mock_emit_session_update.assert_called_once_with(session)
+
+
+def test_persist_self_updates(clean_database, flask_app, mock_emit_session_update):
+    user1 = database.User.create(id=1234, name="The Name")
+    user2 = database.User.create(id=1235, name="Other")
+    session = database.GameSession.create(id=1, name="Debug", state=GameSessionState.IN_PROGRESS, creator=user1)
+    database.GameSessionMembership.create(user=user1, session=session, row=0, admin=True)
+    database.GameSessionMembership.create(user=user2, session=session, row=1, admin=False)
+
+    # Run
+    game_session._persist_self_updates({
+        (1, 1234): SelfUpdate("first", "Game"),
+        (1, 1235): SelfUpdate("second", "Menu"),
+    })
+
+    # Assert
+    assert database.GameSessionMembership.get_by_ids(1234, 1).inventory == "first"
+    assert database.GameSessionMembership.get_by_ids(1235, 1).connection_state == "Online, Menu"
+    mock_emit_session_update.assert_called_once_with(session)
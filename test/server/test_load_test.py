@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from mock import AsyncMock
+
+from randovania.network_client.network_client import NetworkClient
+from randovania.server import load_test
+
+
+def test_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert load_test.percentile(values, 0.5) == 3.0
+    assert load_test.percentile(values, 0.99) == 5.0
+    assert load_test.percentile(values, 0.0) == 1.0
+
+
+def test_create_report():
+    recorder = load_test.LatencyRecorder()
+    recorder.record("b", 0.002, False)
+    recorder.record("a", 0.001, False)
+    recorder.record("a", 0.003, True)
+
+    report = recorder.create_report(2.0)
+
+    assert report["total_events"] == 3
+    assert report["events_per_second"] == 1.5
+    assert report["errors"] == 1
+    assert list(report["events"].keys()) == ["a", "b"]
+    assert report["events"]["a"] == {"count": 2, "errors": 1, "p50_ms": 1.0, "p99_ms": 3.0, "max_ms": 3.0}
+    assert "3 events in 2.00s: 1.5 events/s, 1 errors" in load_test.format_report(report)
+
+
+@pytest.mark.parametrize("fails", [False, True])
+@pytest.mark.asyncio
+async def test_client_records_latency(tmpdir, mocker, fails):
+    mock_emit = mocker.patch.object(NetworkClient, "_emit_with_result", new_callable=AsyncMock,
+                                    side_effect=RuntimeError("failed") if fails else None)
+    recorder = load_test.LatencyRecorder()
+    client = load_test.LoadTestClient(Path(tmpdir), {"server_address": "http://localhost:5000"}, recorder)
+
+    # Run
+    if fails:
+        with pytest.raises(RuntimeError):
+            await client._emit_with_result("some_event", 1)
+    else:
+        assert await client._emit_with_result("some_event", 1) is mock_emit.return_value
+
+    # Assert
+    mock_emit.assert_awaited_once_with("some_event", 1, None)
+    assert len(recorder.latencies["some_event"]) == 1
+    assert recorder.errors.get("some_event", 0) == int(fails)
+
+
+def test_create_server_configuration():
+    configuration = load_test.create_server_configuration(":memory:")
+
+    assert configuration["server_config"]["database_path"] == ":memory:"
+    assert configuration["server_config"]["client_version_checking"] == "ignore"
+    assert configuration["guest_secret"] != configuration["server_config"]["fernet_key"]
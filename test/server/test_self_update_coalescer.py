@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+
+import prometheus_client
+
+from randovania.server.self_update_coalescer import SelfUpdateCoalescer, SelfUpdate
+
+
+def _coalescer():
+    clock = MagicMock(return_value=100.0)
+    coalescer = SelfUpdateCoalescer(interval=2.0, max_age=10.0, clock=clock)
+    coalescer.setup_metrics(None)
+    return coalescer, clock
+
+
+def test_first_update_persisted_right_away():
+    coalescer, clock = _coalescer()
+
+    assert coalescer.submit((1, 10), SelfUpdate("inv", "state"))
+    assert coalescer.submit((1, 20), SelfUpdate("inv", "state"))
+    assert coalescer.take_due() == {}
+    assert coalescer._persisted_counter._value.get() == 2
+
+
+def test_updates_merged_until_due():
+    coalescer, clock = _coalescer()
+    coalescer.submit((1, 10), SelfUpdate("a", "state"))
+
+    clock.return_value = 101.0
+    assert not coalescer.submit((1, 10), SelfUpdate("b", "state"))
+    assert not coalescer.submit((1, 10), SelfUpdate("c", "state"))
+    first_take = coalescer.take_due()
+
+    clock.return_value = 102.5
+    second_take = coalescer.take_due()
+
+    assert first_take == {}
+    assert second_take == {(1, 10): SelfUpdate("c", "state")}
+    assert coalescer.take_due() == {}
+    assert coalescer._merged_counter._value.get() == 1
+
+
+def test_unchanged_update_dropped():
+    coalescer, clock = _coalescer()
+    coalescer.submit((1, 10), SelfUpdate("a", "state"))
+    clock.return_value = 101.0
+    coalescer.submit((1, 10), SelfUpdate("b", "state"))
+
+    clock.return_value = 110.0
+    assert not coalescer.submit((1, 10), SelfUpdate("a", "state"))
+
+    assert coalescer.take_due() == {}
+    assert coalescer._dropped_counter._value.get() == 1
+    assert coalescer._merged_counter._value.get() == 1
+
+
+def test_forget_and_max_age():
+    coalescer, clock = _coalescer()
+    coalescer.submit((1, 10), SelfUpdate("a", "state"))
+    coalescer.submit((1, 20), SelfUpdate("a", "state"))
+    clock.return_value = 101.0
+    coalescer.submit((1, 10), SelfUpdate("b", "state"))
+
+    coalescer.forget((1, 10))
+    clock.return_value = 120.0
+
+    assert coalescer.take_due() == {}
+    assert coalescer._states == {}
+
+
+def test_setup_metrics_only_once():
+    registry = prometheus_client.CollectorRegistry()
+    coalescer = SelfUpdateCoalescer()
+
+    # Run
+    coalescer.setup_metrics(registry)
+    counter = coalescer._merged_counter
+    coalescer.setup_metrics(registry)
+
+    # Assert
+    assert coalescer._merged_counter is counter
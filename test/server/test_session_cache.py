@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+from randovania.server.session_cache import SessionCache
+
+
+def test_entry_values_created_once():
+    cache = SessionCache()
+    factory = MagicMock()
+
+    first = cache.for_session(1, "layout").get("key", factory)
+    second = cache.for_session(1, "layout").get("key", factory)
+
+    assert first is second
+    factory.assert_called_once_with()
+
+
+def test_new_entry_for_different_layout():
+    cache = SessionCache()
+    cache.for_session(1, "layout").get("key", lambda: 1)
+
+    entry = cache.for_session(1, "other layout")
+
+    assert entry.get("key", lambda: 2) == 2
+    assert len(cache) == 1
+
+
+def test_invalidate():
+    cache = SessionCache()
+    cache.for_session(1, "layout").get("key", lambda: 1)
+    cache.for_session(2, "layout").get("key", lambda: 1)
+
+    cache.invalidate(1)
+    cache.invalidate(3)
+
+    assert len(cache) == 1
+    assert len(cache.for_session(1, "layout")) == 0
+    assert len(cache.for_session(2, "layout")) == 1
+
+
+def test_evict_least_recently_used():
+    cache = SessionCache(max_sessions=2)
+    for session_id in (1, 2):
+        cache.for_session(session_id, "layout").get("key", lambda: session_id)
+
+    cache.for_session(1, "layout")
+    cache.for_session(3, "layout")
+
+    assert len(cache) == 2
+    assert len(cache.for_session(1, "layout")) == 1
+    assert len(cache.for_session(2, "layout")) == 0
+
+
+def test_evict_old():
+    now = [0.0]
+    cache = SessionCache(max_age=10, clock=lambda: now[0])
+    cache.for_session(1, "layout").get("key", lambda: 1)
+    cache.for_session(2, "layout").get("key", lambda: 1)
+
+    now[0] = 8
+    cache.for_session(2, "layout")
+    now[0] = 15
+    cache.for_session(3, "layout")
+
+    assert len(cache) == 2
+    assert len(cache.for_session(1, "layout")) == 0
+    assert len(cache.for_session(2, "layout")) == 1
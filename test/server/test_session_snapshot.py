@@ -0,0 +1,109 @@
+import datetime
+from unittest.mock import PropertyMock, MagicMock
+
+import pytest
+
+from randovania.network_common.session_state import GameSessionState
+from randovania.server import database, session_snapshot, game_session
+from randovania.server.session_snapshot import SessionSnapshot
+
+
+@pytest.fixture(name="session")
+def _session(clean_database, mocker):
+    mock_layout = mocker.patch("randovania.server.database.GameSession.layout_description", new_callable=PropertyMock)
+    target = mock_layout.return_value.all_patches.__getitem__.return_value.pickup_assignment.__getitem__.return_value
+    target.pickup.name = "The Pickup"
+
+    user1 = database.User.create(id=1234, name="The Name")
+    user2 = database.User.create(id=1235, name="Other")
+    session = database.GameSession.create(id=1, name="Debug", state=GameSessionState.IN_PROGRESS, creator=user1)
+    database.GameSessionPreset.create(session=session, row=0, preset="{}")
+    database.GameSessionPreset.create(session=session, row=1, preset="{}")
+    database.GameSessionMembership.create(user=user1, session=session, row=0, admin=True)
+    database.GameSessionMembership.create(user=user2, session=session, row=1, admin=False)
+    return session
+
+
+def _create_action(session, location: int, minute: int):
+    database.GameSessionTeamAction.create(session=session, provider_row=1, provider_location_index=location,
+                                          receiver_row=0,
+                                          time=datetime.datetime(2020, 5, 2, 10, minute, tzinfo=datetime.timezone.utc))
+
+
+def test_first_update(session):
+    snapshot = SessionSnapshot()
+
+    delta = snapshot.update(session)
+    entry = snapshot.create_entry(session.id)
+
+    assert delta["version"] == 1
+    assert delta["changes"]["name"] == "Debug"
+    assert delta["changes"]["presets"] == [{}, {}]
+    assert [player["id"] for player in delta["players"]] == [1234, 1235]
+    assert entry["version"] == 1
+    assert entry["snapshot"] == snapshot.snapshot_id
+    assert entry["players"] == delta["players"]
+
+
+def test_update_without_changes(session):
+    snapshot = SessionSnapshot()
+    snapshot.update(session)
+
+    assert snapshot.update(session) is None
+    assert snapshot.version == 1
+
+
+def test_update_player_and_preset(session):
+    snapshot = SessionSnapshot()
+    snapshot.update(session)
+
+    membership = database.GameSessionMembership.get_by_ids(1235, 1)
+    membership.connection_state = "Online, Game"
+    membership.save()
+    database.GameSessionPreset.update(preset='{"a": 1}').where(database.GameSessionPreset.row == 1).execute()
+    database.GameSessionMembership.get_by_ids(1234, 1).delete_instance()
+
+    delta = snapshot.update(session)
+
+    assert delta == {
+        "id": 1,
+        "snapshot": snapshot.snapshot_id,
+        "version": 2,
+        # The name of row 0 went back to the default, so the actions are described again
+        "changes": {"presets": [{}, {"a": 1}], "actions": []},
+        "players": [membership.as_json],
+        "removed_players": [1234],
+        "new_actions": [],
+    }
+    assert snapshot.create_entry(1)["players"] == [membership.as_json]
+
+
+def test_update_only_new_actions(session, mocker):
+    _create_action(session, 0, 20)
+    snapshot = SessionSnapshot()
+    snapshot.update(session)
+    mock_describe = mocker.patch.object(snapshot, "_describe_action", wraps=snapshot._describe_action)
+
+    _create_action(session, 1, 30)
+    delta = snapshot.update(session)
+
+    mock_describe.assert_called_once()
+    assert delta["changes"] == {}
+    assert delta["new_actions"] == [{"message": "Other found The Pickup for The Name.",
+                                     "time": "2020-05-02T10:30:00+00:00"}]
+    assert len(snapshot.create_entry(1)["actions"]) == 2
+
+
+def test_emit_session_update(session, flask_app, mocker):
+    mock_emit: MagicMock = mocker.patch("flask_socketio.emit", autospec=True)
+
+    game_session._emit_session_update(session)
+    snapshot = session_snapshot.for_session(session)
+    game_session._emit_session_update(session)
+    session.name = "New Name"
+    session.save()
+    game_session._emit_session_update(session)
+
+    assert [c[0][0] for c in mock_emit.call_args_list] == ["game_session_update", "game_session_delta"]
+    assert mock_emit.call_args_list[1][0][1]["changes"] == {"name": "New Name"}
+    assert snapshot.version == 2
@@ -0,0 +1,41 @@
+import argparse
+import timeit
+
+from randovania.game_connection.connection_backend import MemoryOperation
+from randovania.game_connection.nintendont_backend import NintendontBackend, SocketHolder
+
+
+def create_ops(num_ops: int, write_size: int):
+    ops = []
+    for i in range(num_ops):
+        if i % 2:
+            ops.append(MemoryOperation(0x80001000, offset=(i * 12) % 0x7000, read_byte_count=8))
+        else:
+            ops.append(MemoryOperation(0x80002000, offset=(i * write_size) % 0x7000, write_bytes=b"\x01" * write_size))
+    return ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures how long it takes to pack operations into requests "
+                                                 "for Nintendont.")
+    parser.add_argument("--ops", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--write-size", type=int, default=20)
+    parser.add_argument("--max-input", type=int, default=4096)
+    parser.add_argument("--max-output", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backend = NintendontBackend("localhost")
+    backend._socket = SocketHolder(reader=None, writer=None, api_version=1, max_input=args.max_input,
+                                   max_output=args.max_output, max_addresses=8)
+
+    for num_ops in args.ops:
+        ops = create_ops(num_ops, args.write_size)
+        requests = backend._prepare_requests_for(ops)
+        best = min(timeit.repeat(lambda: backend._prepare_requests_for(ops), number=1, repeat=args.repeat))
+        print(f"{num_ops:>7} ops into {len(requests):>5} requests: {best * 1000:10.3f} ms "
+              f"({best / num_ops * 1e6:.2f} us per op)")
+
+
+if __name__ == "__main__":
+    main()
@@ -81,9 +81,9 @@ async def main():
         shutil.rmtree(app_folder, ignore_errors=False)
 
     for game in iterate_enum(RandovaniaGame):
-        prime_database.export_as_binary(
+        prime_database.export_as_compiled(
             default_data.read_json_then_binary(game)[1],
-            _ROOT_FOLDER.joinpath("randovania", "data", "binary_data", f"{game.value}.bin"))
+            _ROOT_FOLDER.joinpath("randovania", "data", "binary_data", f"{game.value}.rdvdb"))
 
     if is_production():
         server_suffix = "randovania"